@@ -1,14 +1,23 @@
-from app.db.base import Base
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
 from app.db.database import engine
 
-print("Creating database tables...")
-Base.metadata.create_all(bind=engine)
-print("✓ All tables created successfully!")
-print("\nTables created:")
-print("- users")
-print("- trips")
-print("- cities")
-print("- activities")
-print("- itinerary_stops")
-print("- itinerary_activities")
-print("- budgets")
+# The schema is owned by the Alembic migrations in globetrotter-backend/alembic
+BACKEND = Path(__file__).resolve().parent / "globetrotter-backend"
+config = Config(str(BACKEND / "alembic.ini"))
+config.set_main_option("script_location", str(BACKEND / "alembic"))
+
+# A database made by the old create_all version of this script has the
+# baseline tables but no alembic_version: adopt it instead of recreating them
+tables = set(inspect(engine).get_table_names())
+if "users" in tables and "alembic_version" not in tables:
+    print("Existing tables found, stamping them as the 0001_baseline revision...")
+    command.stamp(config, "0001_baseline")
+
+print("Migrating database tables (alembic upgrade head)...")
+command.upgrade(config, "head")
+print("✓ Database is at the latest migration!")
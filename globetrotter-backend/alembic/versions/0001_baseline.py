@@ -0,0 +1,113 @@
+"""Baseline schema, as created by create_tables.py before migrations
+
+Databases created by the old create_all create_tables.py can be brought
+under Alembic with ``alembic stamp 0001_baseline`` followed by
+``alembic upgrade head``; create_tables.py now does both.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("profile_photo", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "cities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("country", sa.String(), nullable=False),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("cost_index", sa.Float(), nullable=True),
+        sa.Column("popularity", sa.Integer(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_cities_id", "cities", ["id"])
+    op.create_index("ix_cities_name", "cities", ["name"])
+
+    op.create_table(
+        "activities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("estimated_cost", sa.Float(), nullable=True),
+        sa.Column("duration_hours", sa.Float(), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_activities_id", "activities", ["id"])
+    op.create_index("ix_activities_name", "activities", ["name"])
+
+    op.create_table(
+        "trips",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("cover_photo", sa.String(), nullable=True),
+        sa.Column("is_public", sa.Integer(), nullable=True),
+        sa.Column("public_url", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("public_url"),
+    )
+    op.create_index("ix_trips_id", "trips", ["id"])
+
+    op.create_table(
+        "itinerary_stops",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), nullable=False),
+        sa.Column("city_id", sa.Integer(), sa.ForeignKey("cities.id"), nullable=False),
+        sa.Column("arrival_date", sa.DateTime(), nullable=False),
+        sa.Column("departure_date", sa.DateTime(), nullable=False),
+        sa.Column("order_index", sa.Integer(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_itinerary_stops_id", "itinerary_stops", ["id"])
+
+    op.create_table(
+        "itinerary_activities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("stop_id", sa.Integer(), sa.ForeignKey("itinerary_stops.id"), nullable=False),
+        sa.Column("activity_id", sa.Integer(), sa.ForeignKey("activities.id"), nullable=False),
+        sa.Column("scheduled_time", sa.DateTime(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_itinerary_activities_id", "itinerary_activities", ["id"])
+
+    op.create_table(
+        "budgets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_index("ix_budgets_id", "budgets", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("budgets", "itinerary_activities", "itinerary_stops", "trips", "activities", "cities", "users"):
+        op.drop_table(table)
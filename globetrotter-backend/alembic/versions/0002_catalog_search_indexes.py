@@ -0,0 +1,30 @@
+"""Catalog search indexes: city name trigrams, activity keyset sort keys
+
+Revision ID: 0002_catalog_search_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002_catalog_search_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_cities_name_trgm", "cities", ["name"],
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        )
+    op.create_index("ix_activities_category_cost_id", "activities", ["category", "estimated_cost", "id"])
+    op.create_index("ix_activities_cost_id", "activities", ["estimated_cost", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_activities_cost_id", table_name="activities")
+    op.drop_index("ix_activities_category_cost_id", table_name="activities")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_cities_name_trgm", table_name="cities")
@@ -0,0 +1,31 @@
+"""Per-trip budget rollups, backfilled from existing budget lines
+
+Revision ID: 0003_trip_budget_rollups
+Revises: 0002_catalog_search_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_trip_budget_rollups"
+down_revision = "0002_catalog_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trip_budget_rollups",
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("line_count", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO trip_budget_rollups (trip_id, category, total, line_count) "
+        "SELECT trip_id, category, coalesce(sum(amount), 0), count(*) FROM budgets GROUP BY trip_id, category"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trip_budget_rollups")
@@ -0,0 +1,52 @@
+"""Replace itinerary_stops.order_index with sparse, unique order keys
+
+Existing stops keep their order: each gets 65536 (stop_order.KEY_GAP)
+times its rank within the trip by (order_index, id).
+
+Revision ID: 0004_stop_order_keys
+Revises: 0003_trip_budget_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_stop_order_keys"
+down_revision = "0003_trip_budget_rollups"
+branch_labels = None
+depends_on = None
+
+KEY_GAP = 65536
+
+
+def upgrade() -> None:
+    op.add_column("itinerary_stops", sa.Column("order_key", sa.BigInteger(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE itinerary_stops SET order_key = {KEY_GAP} * (
+            SELECT count(*) FROM itinerary_stops AS earlier
+            WHERE earlier.trip_id = itinerary_stops.trip_id
+              AND (coalesce(earlier.order_index, 0) < coalesce(itinerary_stops.order_index, 0)
+                   OR (coalesce(earlier.order_index, 0) = coalesce(itinerary_stops.order_index, 0)
+                       AND earlier.id <= itinerary_stops.id))
+        )
+        """
+    )
+    with op.batch_alter_table("itinerary_stops") as batch:
+        batch.alter_column("order_key", existing_type=sa.BigInteger(), nullable=False)
+        batch.drop_column("order_index")
+        batch.create_index("uq_itinerary_stops_trip_order_key", ["trip_id", "order_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.add_column("itinerary_stops", sa.Column("order_index", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE itinerary_stops SET order_index = (
+            SELECT count(*) FROM itinerary_stops AS earlier
+            WHERE earlier.trip_id = itinerary_stops.trip_id AND earlier.order_key < itinerary_stops.order_key
+        )
+        """
+    )
+    with op.batch_alter_table("itinerary_stops") as batch:
+        batch.drop_index("uq_itinerary_stops_trip_order_key")
+        batch.drop_column("order_key")
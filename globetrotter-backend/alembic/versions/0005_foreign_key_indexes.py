@@ -0,0 +1,33 @@
+"""Index the foreign keys the hot queries and cascades filter on
+
+itinerary_stops.trip_id is already covered by the leading column of
+uq_itinerary_stops_trip_order_key.
+
+Revision ID: 0005_foreign_key_indexes
+Revises: 0004_stop_order_keys
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0005_foreign_key_indexes"
+down_revision = "0004_stop_order_keys"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_trips_user_id", "trips", ["user_id"]),
+    ("ix_itinerary_stops_city_id", "itinerary_stops", ["city_id"]),
+    ("ix_itinerary_activities_stop_id", "itinerary_activities", ["stop_id"]),
+    ("ix_itinerary_activities_activity_id", "itinerary_activities", ["activity_id"]),
+    ("ix_budgets_trip_id_category", "budgets", ["trip_id", "category"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
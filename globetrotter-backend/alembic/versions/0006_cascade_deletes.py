@@ -0,0 +1,38 @@
+"""ON DELETE CASCADE from trips to stops, activities and budgets
+
+The baseline foreign keys were unnamed; the naming convention gives them
+PostgreSQL's default names so SQLite batch mode can find them too.
+
+Revision ID: 0006_cascade_deletes
+Revises: 0005_foreign_key_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0006_cascade_deletes"
+down_revision = "0005_foreign_key_indexes"
+branch_labels = None
+depends_on = None
+
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+FOREIGN_KEYS = [
+    ("itinerary_stops", "trip_id", "trips"),
+    ("itinerary_activities", "stop_id", "itinerary_stops"),
+    ("budgets", "trip_id", "trips"),
+]
+
+
+def _replace_foreign_keys(ondelete) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch:
+            batch.drop_constraint(name, type_="foreignkey")
+            batch.create_foreign_key(name, referred, [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
@@ -0,0 +1,26 @@
+"""Keyset pagination indexes for trip listing
+
+Both lead with user_id, so they replace ix_trips_user_id.
+
+Revision ID: 0007_trip_listing_indexes
+Revises: 0006_cascade_deletes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0007_trip_listing_indexes"
+down_revision = "0006_cascade_deletes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_trips_user_start_date_id", "trips", ["user_id", "start_date", "id"])
+    op.create_index("ix_trips_user_created_at_id", "trips", ["user_id", "created_at", "id"])
+    op.drop_index("ix_trips_user_id", table_name="trips")
+
+
+def downgrade() -> None:
+    op.create_index("ix_trips_user_id", "trips", ["user_id"])
+    op.drop_index("ix_trips_user_created_at_id", table_name="trips")
+    op.drop_index("ix_trips_user_start_date_id", table_name="trips")
@@ -0,0 +1,22 @@
+"""Per-trip version counter
+
+Revision ID: 0008_trip_version
+Revises: 0007_trip_listing_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_trip_version"
+down_revision = "0007_trip_listing_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("trips", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("trips") as batch:
+        batch.drop_column("version")
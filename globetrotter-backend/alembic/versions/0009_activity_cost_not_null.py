@@ -0,0 +1,28 @@
+"""activities.estimated_cost NOT NULL
+
+Activity search pages on (estimated_cost, id): a NULL cost can't be put in
+a keyset cursor, and the tuple comparison skips NULL rows altogether.
+Existing NULLs become 0, the column's default.
+
+Revision ID: 0009_activity_cost_not_null
+Revises: 0008_trip_version
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_activity_cost_not_null"
+down_revision = "0008_trip_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE activities SET estimated_cost = 0 WHERE estimated_cost IS NULL")
+    with op.batch_alter_table("activities") as batch:
+        batch.alter_column("estimated_cost", existing_type=sa.Float(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("activities") as batch:
+        batch.alter_column("estimated_cost", existing_type=sa.Float(), nullable=True)
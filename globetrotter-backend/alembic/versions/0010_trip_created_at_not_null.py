@@ -0,0 +1,28 @@
+"""trips.created_at NOT NULL
+
+Trip listing can sort and page on (created_at, id): a NULL created_at can't
+be put in a keyset cursor, and the tuple comparison skips NULL rows.
+Existing NULLs become the trip's start_date, the closest known time.
+
+Revision ID: 0010_trip_created_at_not_null
+Revises: 0009_activity_cost_not_null
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_trip_created_at_not_null"
+down_revision = "0009_activity_cost_not_null"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE trips SET created_at = start_date WHERE created_at IS NULL")
+    with op.batch_alter_table("trips") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("trips") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
@@ -1,40 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.db.database import get_db
 from app.models.activity import Activity
-from app.schemas.activity import Activity as ActivitySchema, ActivityCreate
+from app.schemas.activity import Activity as ActivitySchema, ActivityCreate, ActivitySuggestion, ActivitySearchPage
+from app.schemas.catalog_import import CatalogImportReport
+from app.services import catalog_import, autocomplete, activity_search, catalog_cache
+from app.services.catalog_cache import ACTIVITIES
+from app.core.deps import get_catalog_admin, Principal
+from app.core.instrumentation import InstrumentedRoute
+from app.core.responses import json_response
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.post("/", response_model=ActivitySchema)
 def create_activity(activity: ActivityCreate, db: Session = Depends(get_db)):
-    db_activity = Activity(**activity.dict())
+    # Nulls fall back to the column defaults; estimated_cost is NOT NULL
+    db_activity = Activity(**activity.dict(exclude_none=True))
     db.add(db_activity)
     db.commit()
     db.refresh(db_activity)
-    return db_activity
+    # A new activity can change any search result, so the whole catalog goes;
+    # this worker's index takes the activity in place, other workers rebuild
+    created = ActivitySchema.model_validate(db_activity).model_dump()
+    generation = catalog_cache.catalog.invalidate(ACTIVITIES)
+    autocomplete.index_activity(db_activity, generation)
+    catalog_cache.catalog.put(ACTIVITIES, ("id", db_activity.id), created)
+    return created
+
+@router.post("/import", response_model=CatalogImportReport)
+def import_activities(
+    file: UploadFile = File(..., description="CSV with a header row, or JSONL"),
+    format: Optional[Literal["csv", "jsonl"]] = Query(None, description="Defaults to the file extension"),
+    current_user: Principal = Depends(get_catalog_admin),
+    db: Session = Depends(get_db)
+):
+    # Upserts on (name, category); rows are streamed from the upload in chunks
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = catalog_import.import_catalog(
+            db.get_bind(), "activities", stream, format or catalog_import.format_from_filename(file.filename or "")
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8")
+    return report.as_dict()
+
+@router.get("/autocomplete", response_model=List[ActivitySuggestion])
+def autocomplete_activities(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    # Served from the in-memory prefix index; db is only used to (re)build it
+    autocomplete.ensure_current(db)
+    return autocomplete.activity_autocomplete.search(q, limit)
 
 @router.get("/", response_model=List[ActivitySchema])
 def search_activities(
+    response: Response,
     q: str = "",
     category: str = "",
     max_cost: float = None,
+    limit: int = Query(50, ge=1, le=activity_search.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    # The body stays a plain list; the cursor for the next page, if there is
+    # one, goes in the X-Next-Cursor header
+    filters = activity_search.ActivityFilters(q=q, category=category, max_cost=max_cost)
+
+    def load():
+        activities, next_cursor = activity_search.search_activities(db, filters, limit=limit, cursor=cursor)
+        return {
+            "items": [ActivitySchema.model_validate(activity).model_dump() for activity in activities],
+            "next_cursor": next_cursor,
+        }
+
+    try:
+        # Cached items are already validated dumps of the schema
+        page = catalog_cache.catalog.get_or_load(ACTIVITIES, ("page", q, category, max_cost, limit, cursor), load)
+    except activity_search.InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return json_response(page["items"], response)
+
+@router.get("/search", response_model=ActivitySearchPage)
+def faceted_search_activities(
+    q: str = "",
+    category: str = "",
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_duration: Optional[float] = None,
+    max_duration: Optional[float] = None,
+    sort: Literal["cost", "-cost"] = "cost",
+    limit: int = Query(20, ge=1, le=activity_search.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Activity)
-    if q:
-        query = query.filter(Activity.name.ilike(f"%{q}%"))
-    if category:
-        query = query.filter(Activity.category == category)
-    if max_cost:
-        query = query.filter(Activity.estimated_cost <= max_cost)
-    activities = query.limit(50).all()
-    return activities
+    filters = activity_search.ActivityFilters(
+        q=q,
+        category=category,
+        min_cost=min_cost,
+        max_cost=max_cost,
+        min_duration=min_duration,
+        max_duration=max_duration,
+    )
+
+    def load():
+        items, next_cursor = activity_search.search_activities(
+            db, filters, limit=limit, cursor=cursor, descending=sort == "-cost"
+        )
+        facets = activity_search.category_facets(db, filters)
+        return ActivitySearchPage(items=items, next_cursor=next_cursor, facets=facets).model_dump()
+
+    key = ("search", q, category, min_cost, max_cost, min_duration, max_duration, sort, limit, cursor)
+    try:
+        return json_response(catalog_cache.catalog.get_or_load(ACTIVITIES, key, load))
+    except activity_search.InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @router.get("/{activity_id}", response_model=ActivitySchema)
 def get_activity(activity_id: int, db: Session = Depends(get_db)):
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+    def load():
+        activity = db.query(Activity).filter(Activity.id == activity_id).first()
+        return ActivitySchema.model_validate(activity).model_dump() if activity else None
+
+    activity = catalog_cache.catalog.get_or_load(ACTIVITIES, ("id", activity_id), load)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     return activity
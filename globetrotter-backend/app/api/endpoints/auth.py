@@ -5,11 +5,24 @@ from datetime import timedelta
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema, Token
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    verify_password_bounded,
+    get_password_hash_bounded,
+    create_access_token,
+    PasswordHashingBusy,
+)
 from app.core.config import settings
-from app.core.deps import get_current_user
+from app.core.deps import get_current_principal, Principal
+from app.core.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry",
+        headers={"Retry-After": "1"},
+    )
 
 @router.post("/register", response_model=UserSchema)
 def register(user: UserCreate, db: Session = Depends(get_db)):
@@ -22,8 +35,13 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     if db_user:
         raise HTTPException(status_code=400, detail="Username already taken")
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user. Release the connection while hashing so slow argon2
+    # calls don't hold pool connections.
+    db.rollback()
+    try:
+        hashed_password = get_password_hash_bounded(user.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     db_user = User(
         email=user.email,
         username=user.username,
@@ -38,8 +56,14 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     # Authenticate user
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = db.query(User.email, User.hashed_password).filter(User.email == form_data.username).first()
+    # Release the connection before the slow argon2 verify
+    db.rollback()
+    try:
+        verified = user is not None and verify_password_bounded(form_data.password, user.hashed_password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -54,5 +78,5 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_principal)):
     return current_user
@@ -1,26 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import TypeAdapter
+from app.db.database import get_async_db
 from app.models.trip import Trip
 from app.models.budget import Budget
-from app.models.user import User
-from app.schemas.budget import BudgetCreate, Budget as BudgetSchema, BudgetSummary
-from app.core.deps import get_current_user
+from app.schemas.budget import BudgetCreate, Budget as BudgetSchema, BudgetSummary, UserBudgetSummary, TripCostEstimate
+from app.services import budget_summary, cost_estimate, trip_versions
+from app.core.deps import get_current_principal, Principal
+from app.core.etag import conditional_get, make_etag
+from app.core.responses import rows_response
+from app.core.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+budget_list = TypeAdapter(List[BudgetSchema])
+budget_columns = [Budget.__table__.c[name] for name in BudgetSchema.model_fields]
+
+@router.get("/summary", response_model=UserBudgetSummary)
+async def get_user_budget_summary(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # All of the user's trips, aggregated in a single GROUP BY query
+    breakdowns = await budget_summary.user_breakdowns(db, current_user.id)
+    return budget_summary.user_summary(breakdowns)
 
 @router.post("/{trip_id}", response_model=BudgetSchema)
-def add_budget(
+async def add_budget(
     trip_id: int,
     budget: BudgetCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify trip belongs to user
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    version = await trip_versions.bump(db, trip_id, current_user.id, if_match)
+    if version is None:
         raise HTTPException(status_code=404, detail="Trip not found")
     
     db_budget = Budget(
@@ -30,42 +48,56 @@ def add_budget(
         description=budget.description
     )
     db.add(db_budget)
-    db.commit()
-    db.refresh(db_budget)
+    await db.commit()
+    await db.refresh(db_budget)
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(version)
     return db_budget
 
-@router.get("/{trip_id}", response_model=List[BudgetSchema])
-def get_trip_budget(
+@router.get("/{trip_id}", response_model=List[BudgetSchema], responses={304: {"description": "Not modified"}})
+async def get_trip_budget(
     trip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    version = await trip_versions.current(db, trip_id, current_user.id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Trip not found")
-    
-    budgets = db.query(Budget).filter(Budget.trip_id == trip_id).all()
-    return budgets
+    not_modified = conditional_get(request, response, make_etag(version))
+    if not_modified:
+        return not_modified
+
+    rows = (await db.execute(select(*budget_columns).where(Budget.trip_id == trip_id))).all()
+    return rows_response(budget_list, rows, response)
 
-@router.get("/{trip_id}/summary", response_model=BudgetSummary)
-def get_budget_summary(
+@router.get("/{trip_id}/summary", response_model=BudgetSummary, responses={304: {"description": "Not modified"}})
+async def get_budget_summary(
     trip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+    version = await trip_versions.current(db, trip_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    not_modified = conditional_get(request, response, make_etag(version))
+    if not_modified:
+        return not_modified
+
+    breakdown = await budget_summary.trip_breakdown(db, trip_id)
+    return budget_summary.summary_from_breakdown(breakdown)
+
+@router.get("/{trip_id}/estimate", response_model=TripCostEstimate)
+async def get_trip_cost_estimate(
+    trip_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    trip = await db.scalar(select(Trip).where(Trip.id == trip_id, Trip.user_id == current_user.id))
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
-    budgets = db.query(Budget).filter(Budget.trip_id == trip_id).all()
-    
-    summary = {
-        "total_budget": sum(b.amount for b in budgets),
-        "transport": sum(b.amount for b in budgets if b.category == "transport"),
-        "stay": sum(b.amount for b in budgets if b.category == "stay"),
-        "activities": sum(b.amount for b in budgets if b.category == "activities"),
-        "meals": sum(b.amount for b in budgets if b.category == "meals"),
-        "other": sum(b.amount for b in budgets if b.category not in ["transport", "stay", "activities", "meals"])
-    }
-    
-    return summary
+    return await cost_estimate.estimate_trip_cost(db, trip_id, trip.version)
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.db.database import get_db
 from app.models.city import City
-from app.schemas.city import City as CitySchema, CityCreate
+from app.schemas.city import City as CitySchema, CityCreate, CitySuggestion
+from app.schemas.catalog_import import CatalogImportReport
+from app.services import catalog_import, city_search, autocomplete, catalog_cache
+from app.services.catalog_cache import CITIES
+from app.core.deps import get_catalog_admin, Principal
+from app.core.instrumentation import InstrumentedRoute
+from app.core.responses import json_response
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.post("/", response_model=CitySchema)
 def create_city(city: CityCreate, db: Session = Depends(get_db)):
@@ -13,21 +20,57 @@ def create_city(city: CityCreate, db: Session = Depends(get_db)):
     db.add(db_city)
     db.commit()
     db.refresh(db_city)
-    return db_city
+    # A new city can change any search result, so the whole catalog goes;
+    # this worker's indexes take the city in place, other workers rebuild
+    created = CitySchema.model_validate(db_city).model_dump()
+    generation = catalog_cache.catalog.invalidate(CITIES)
+    city_search.index_city(db_city, generation)
+    autocomplete.index_city(db_city, generation)
+    catalog_cache.catalog.put(CITIES, ("id", db_city.id), created)
+    return created
+
+@router.post("/import", response_model=CatalogImportReport)
+def import_cities(
+    file: UploadFile = File(..., description="CSV with a header row, or JSONL"),
+    format: Optional[Literal["csv", "jsonl"]] = Query(None, description="Defaults to the file extension"),
+    current_user: Principal = Depends(get_catalog_admin),
+    db: Session = Depends(get_db)
+):
+    # Upserts on (name, country); rows are streamed from the upload in chunks
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = catalog_import.import_catalog(
+            db.get_bind(), "cities", stream, format or catalog_import.format_from_filename(file.filename or "")
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8")
+    return report.as_dict()
+
+@router.get("/autocomplete", response_model=List[CitySuggestion])
+def autocomplete_cities(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    # Served from the in-memory prefix index; db is only used to (re)build it
+    autocomplete.ensure_current(db)
+    return autocomplete.city_autocomplete.search(q, limit)
 
 @router.get("/", response_model=List[CitySchema])
 def search_cities(q: str = "", country: str = "", db: Session = Depends(get_db)):
-    query = db.query(City)
-    if q:
-        query = query.filter(City.name.ilike(f"%{q}%"))
-    if country:
-        query = query.filter(City.country.ilike(f"%{country}%"))
-    cities = query.limit(50).all()
-    return cities
+    # Ranked by match quality, then popularity. Cached entries are already
+    # validated dumps of CitySchema, so they're encoded as they are
+    def load():
+        return [CitySchema.model_validate(city).model_dump() for city in city_search.search_cities(db, q, country, limit=50)]
+
+    if q.strip() and not city_search.index_is_current(db):
+        # Don't cache results from the old index under the new generation
+        return json_response(load())
+    return json_response(catalog_cache.catalog.get_or_load(CITIES, ("search", q, country), load))
 
 @router.get("/{city_id}", response_model=CitySchema)
 def get_city(city_id: int, db: Session = Depends(get_db)):
-    city = db.query(City).filter(City.id == city_id).first()
+    def load():
+        city = db.query(City).filter(City.id == city_id).first()
+        return CitySchema.model_validate(city).model_dump() if city else None
+
+    city = catalog_cache.catalog.get_or_load(CITIES, ("id", city_id), load)
     if not city:
         raise HTTPException(status_code=404, detail="City not found")
     return city
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from app.db.database import engine, async_engine
+from app.db.pool import pool_status
+from app.services import catalog_cache
+from app.core.instrumentation import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.get("/db")
+def get_db_pool_status():
+    # Per-process numbers: each uvicorn worker has its own pools
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+@router.get("/cache")
+def get_cache_stats():
+    # Per-process counters for the city/activity catalog cache
+    return {"catalog": catalog_cache.catalog.stats()}
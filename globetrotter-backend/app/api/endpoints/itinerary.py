@@ -1,76 +1,168 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
-from app.models.trip import Trip
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import TypeAdapter
+from app.db.database import get_async_db
 from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
-from app.models.user import User
+from app.models.city import City
+from app.models.activity import Activity
 from app.schemas.itinerary import (
     ItineraryStopCreate,
+    ItineraryStopUpdate,
     ItineraryStop as ItineraryStopSchema,
-    ItineraryActivityCreate
+    ItineraryActivityCreate,
+    ItineraryBatch,
 )
-from app.core.deps import get_current_user
+from app.core.deps import get_current_principal, Principal
+from app.core.etag import conditional_get, make_etag
+from app.services.itinerary_loader import load_trip_stops_async, load_trip_stop_rows_async, load_stop_async
+from app.services import catalog_cache, stop_order, trip_versions
+from app.services.itinerary_batch import InvalidBatch, apply_batch
+from app.core.instrumentation import InstrumentedRoute
+from app.core.responses import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+stop_list = TypeAdapter(List[ItineraryStopSchema])
 
 @router.post("/{trip_id}/stops", response_model=ItineraryStopSchema)
-def add_stop_to_trip(
+async def add_stop_to_trip(
     trip_id: int,
     stop: ItineraryStopCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    position: Optional[int] = Query(None, ge=0),
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Verify trip belongs to user
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
-        raise HTTPException(status_code=404, detail="Trip not found")
-    
-    # Get max order index
-    max_order = db.query(ItineraryStop).filter(ItineraryStop.trip_id == trip_id).count()
-    
-    db_stop = ItineraryStop(
-        trip_id=trip_id,
-        city_id=stop.city_id,
-        arrival_date=stop.arrival_date,
-        departure_date=stop.departure_date,
-        notes=stop.notes,
-        order_index=max_order
-    )
-    db.add(db_stop)
-    db.commit()
-    db.refresh(db_stop)
-    return db_stop
+    async def write():
+        # Verify trip belongs to user
+        version = await trip_versions.bump(db, trip_id, current_user.id, if_match)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        if await db.scalar(select(City.id).where(City.id == stop.city_id)) is None:
+            raise HTTPException(status_code=422, detail="City not found")
+
+        db_stop = ItineraryStop(
+            trip_id=trip_id,
+            city_id=stop.city_id,
+            arrival_date=stop.arrival_date,
+            departure_date=stop.departure_date,
+            notes=stop.notes,
+            order_key=await stop_order.key_at(db, trip_id, position)
+        )
+        db.add(db_stop)
+        await db.flush()
+        return db_stop.id, version
+
+    stop_id, version = await stop_order.commit_with_retry(db, write)
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(version)
+    return await load_stop_async(db, stop_id)
 
-@router.get("/{trip_id}/stops", response_model=List[ItineraryStopSchema])
-def get_trip_stops(
+@router.get("/{trip_id}/stops", response_model=List[ItineraryStopSchema], responses={304: {"description": "Not modified"}})
+async def get_trip_stops(
     trip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify trip belongs to user
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    version = await trip_versions.current(db, trip_id, current_user.id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Trip not found")
-    
-    stops = db.query(ItineraryStop).filter(ItineraryStop.trip_id == trip_id).order_by(ItineraryStop.order_index).all()
-    return stops
+    # Stops embed city and activity rows, which change without a trip write
+    not_modified = conditional_get(request, response, make_etag(version, *catalog_cache.generations()))
+    if not_modified:
+        return not_modified
+
+    # Built from plain rows rather than the ORM tree, and encoded in one pass
+    stops = await load_trip_stop_rows_async(db, trip_id)
+    return rows_response(stop_list, stops, response)
+
+@router.post("/{trip_id}/batch", response_model=List[ItineraryStopSchema])
+async def batch_update_itinerary(
+    trip_id: int,
+    batch: ItineraryBatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Ownership is checked once for the whole batch, which commits as one transaction
+    async def write():
+        version = await trip_versions.bump(db, trip_id, current_user.id, if_match)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        await apply_batch(db, trip_id, batch)
+        return version
+
+    try:
+        version = await stop_order.commit_with_retry(db, write)
+    except InvalidBatch as exc:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(version)
+    return await load_trip_stops_async(db, trip_id)
+
+@router.put("/stops/{stop_id}", response_model=ItineraryStopSchema)
+async def update_stop(
+    stop_id: int,
+    changes: ItineraryStopUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def write():
+        trip_id = await db.scalar(select(ItineraryStop.trip_id).where(ItineraryStop.id == stop_id))
+        if trip_id is None:
+            raise HTTPException(status_code=404, detail="Stop not found")
+        version = await trip_versions.bump(db, trip_id, current_user.id, if_match)
+        if version is None:
+            raise HTTPException(status_code=403, detail="Unauthorized")
+
+        values = changes.model_dump(exclude_unset=True)
+        position = values.pop("order_index", None)
+        if position is not None:
+            # Moving a stop rewrites only its own key
+            values["order_key"] = await stop_order.key_at(db, trip_id, position, exclude_id=stop_id)
+        if values:
+            await db.execute(
+                update(ItineraryStop)
+                .where(ItineraryStop.id == stop_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        return trip_id, version
+
+    trip_id, version = await stop_order.commit_with_retry(db, write)
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(version)
+    return await load_stop_async(db, stop_id)
 
 @router.post("/stops/{stop_id}/activities")
-def add_activity_to_stop(
+async def add_activity_to_stop(
     stop_id: int,
     activity: ItineraryActivityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify stop exists and belongs to user's trip
-    stop = db.query(ItineraryStop).filter(ItineraryStop.id == stop_id).first()
+    stop = await db.scalar(select(ItineraryStop).where(ItineraryStop.id == stop_id))
     if not stop:
         raise HTTPException(status_code=404, detail="Stop not found")
     
-    trip = db.query(Trip).filter(Trip.id == stop.trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    version = await trip_versions.bump(db, stop.trip_id, current_user.id, if_match)
+    if version is None:
         raise HTTPException(status_code=403, detail="Unauthorized")
+    if await db.scalar(select(Activity.id).where(Activity.id == activity.activity_id)) is None:
+        raise HTTPException(status_code=422, detail="Activity not found")
     
     db_activity = ItineraryActivity(
         stop_id=stop_id,
@@ -79,24 +171,31 @@ def add_activity_to_stop(
         notes=activity.notes
     )
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await db.commit()
+    await db.refresh(db_activity)
+    trip_versions.changed(stop.trip_id)
+    response.headers["ETag"] = make_etag(version)
     return db_activity
 
 @router.delete("/stops/{stop_id}")
-def delete_stop(
+async def delete_stop(
     stop_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    stop = db.query(ItineraryStop).filter(ItineraryStop.id == stop_id).first()
+    stop = await db.scalar(select(ItineraryStop).where(ItineraryStop.id == stop_id))
     if not stop:
         raise HTTPException(status_code=404, detail="Stop not found")
     
-    trip = db.query(Trip).filter(Trip.id == stop.trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    trip_id = stop.trip_id
+    version = await trip_versions.bump(db, trip_id, current_user.id, if_match)
+    if version is None:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    db.delete(stop)
-    db.commit()
+    await db.delete(stop)
+    await db.commit()
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(version)
     return {"message": "Stop deleted successfully"}
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.core.config import settings
+from app.core.etag import make_etag, if_none_match
+from app.schemas.trip import SharedTrip
+from app.services import catalog_cache, shared_trip
+from app.core.instrumentation import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.get("/{public_url}", response_model=SharedTrip, responses={304: {"description": "Not modified"}})
+async def get_shared_trip(
+    public_url: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # No authentication: anyone with the link can read a trip marked public
+    found = await shared_trip.resolve(db, public_url)
+    if not found:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    trip_id, version = found
+
+    # The body embeds city and activity rows, which change without a trip write
+    validators = (version, *catalog_cache.generations())
+    headers = {
+        "ETag": make_etag(*validators),
+        "Cache-Control": f"public, max-age={settings.SHARED_TRIP_MAX_AGE_SECONDS}",
+    }
+    if if_none_match(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    body = await shared_trip.render(db, trip_id, validators)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import TypeAdapter
 import secrets
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models.trip import Trip
-from app.models.user import User
-from app.schemas.trip import TripCreate, Trip as TripSchema, TripUpdate
-from app.core.deps import get_current_user
+from app.schemas.trip import TripCreate, Trip as TripSchema, TripUpdate, TripPage
+from app.core.deps import get_current_principal, Principal
+from app.core.etag import conditional_get, make_etag
+from app.core.responses import rows_response
+from app.services import trip_export, trip_listing, trip_versions
+from app.core.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+MAX_BULK_DELETE = 500
+
+# List routes select just the schema's columns and encode the rows directly
+trip_list = TypeAdapter(List[TripSchema])
+trip_columns = [Trip.__table__.c[name] for name in TripSchema.model_fields]
 
 @router.post("/", response_model=TripSchema)
-def create_trip(
+async def create_trip(
     trip: TripCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_trip = Trip(
         user_id=current_user.id,
@@ -26,58 +39,130 @@ def create_trip(
         public_url=secrets.token_urlsafe(16)
     )
     db.add(db_trip)
-    db.commit()
-    db.refresh(db_trip)
+    await db.commit()
+    await db.refresh(db_trip)
     return db_trip
 
 @router.get("/", response_model=List[TripSchema])
-def get_my_trips(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_trips(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(select(*trip_columns).where(Trip.user_id == current_user.id))).all()
+    return rows_response(trip_list, rows)
+
+@router.get("/page", response_model=TripPage)
+async def list_my_trips(
+    when: Optional[Literal["upcoming", "past"]] = None,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    sort: Literal["start_date", "-start_date", "created_at", "-created_at"] = "start_date",
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. name,start_date,end_date,cover_photo"),
+    limit: int = Query(20, ge=1, le=trip_listing.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trips = db.query(Trip).filter(Trip.user_id == current_user.id).all()
-    return trips
+    filters = trip_listing.TripFilters(when=when, starts_after=starts_after, starts_before=starts_before)
+    try:
+        items, next_cursor = await trip_listing.list_trips(
+            db, current_user.id, filters, trip_listing.parse_fields(fields), sort=sort, limit=limit, cursor=cursor
+        )
+    except (trip_listing.InvalidCursor, trip_listing.InvalidFields) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
 
-@router.get("/{trip_id}", response_model=TripSchema)
-def get_trip(
+@router.get("/export", response_class=StreamingResponse)
+async def export_my_trips(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Every trip with its stops, activities and budget lines, streamed with
+    # flat memory however many there are
+    return StreamingResponse(
+        trip_export.export(current_user.id, format),
+        media_type=trip_export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="trips.{format}"'},
+    )
+
+@router.get("/{trip_id}", response_model=TripSchema, responses={304: {"description": "Not modified"}})
+async def get_trip(
     trip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+    trip = await db.scalar(select(Trip).where(Trip.id == trip_id, Trip.user_id == current_user.id))
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    return trip
+    return conditional_get(request, response, make_etag(trip.version)) or trip
 
 @router.put("/{trip_id}", response_model=TripSchema)
-def update_trip(
+async def update_trip(
     trip_id: int,
     trip_update: TripUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    # Bumping first locks the row, so the fields below are applied to the
+    # latest copy and concurrent updates queue up instead of interleaving
+    if await trip_versions.bump(db, trip_id, current_user.id, if_match) is None:
         raise HTTPException(status_code=404, detail="Trip not found")
+    trip = await db.scalar(
+        select(Trip).where(Trip.id == trip_id).execution_options(populate_existing=True)
+    )
     
     update_data = trip_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(trip, field, value)
     
-    db.commit()
-    db.refresh(trip)
+    await db.commit()
+    await db.refresh(trip)
+    trip_versions.changed(trip_id)
+    response.headers["ETag"] = make_etag(trip.version)
     return trip
 
+@router.delete("/")
+async def delete_trips(
+    ids: List[int] = Query(..., description="Trips to delete; ones you don't own are ignored"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if len(ids) > MAX_BULK_DELETE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_DELETE} trips per request")
+    deleted = await _delete_owned_trips(db, current_user.id, ids)
+    return {"deleted": deleted}
+
 @router.delete("/{trip_id}")
-def delete_trip(
+async def delete_trip(
     trip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
-    if not trip:
+    # The version check and the delete commit together
+    if if_match and await trip_versions.bump(db, trip_id, current_user.id, if_match) is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if not await _delete_owned_trips(db, current_user.id, [trip_id]):
         raise HTTPException(status_code=404, detail="Trip not found")
-    
-    db.delete(trip)
-    db.commit()
     return {"message": "Trip deleted successfully"}
+
+async def _delete_owned_trips(db: AsyncSession, user_id: int, trip_ids: List[int]) -> List[int]:
+    # One DELETE; stops, their activities, budgets and rollups go with the
+    # trips through ON DELETE CASCADE instead of being loaded and deleted
+    # row by row by the ORM
+    deleted = (
+        await db.scalars(
+            delete(Trip)
+            .where(Trip.id.in_(trip_ids), Trip.user_id == user_id)
+            .returning(Trip.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    await db.commit()
+    for trip_id in deleted:
+        trip_versions.changed(trip_id)
+    return deleted
@@ -3,12 +3,13 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import User as UserSchema
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_current_principal, invalidate_principal, Principal
+from app.core.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/me", response_model=UserSchema)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: Principal = Depends(get_current_principal)):
     return current_user
 
 @router.put("/me", response_model=UserSchema)
@@ -25,4 +26,6 @@ def update_user(
     
     db.commit()
     db.refresh(current_user)
+    # Drop the cached snapshot so the next request sees the new profile
+    invalidate_principal(current_user.email)
     return current_user
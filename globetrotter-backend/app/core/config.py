@@ -6,6 +6,66 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+
+    # Connection pool, applied to both the sync and async engines (per
+    # uvicorn worker). Ignored for drivers that don't use a QueuePool.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
+    # Per-statement server timeout in milliseconds (Postgres only), 0 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # Authenticated-user cache used by get_current_principal
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Verified-JWT cache used by decode_access_token (0 disables it)
+    TOKEN_CACHE_SIZE: int = 10000
+    # "jose" (default) or "pyjwt"; pyjwt is optional and falls back to jose
+    # when it isn't installed
+    JWT_BACKEND: str = "jose"
+
+    # argon2 cost parameters (passlib defaults); memory cost is in KiB
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # Dedicated password-hashing pool. Requests beyond workers + queue limit
+    # are rejected with 503 instead of piling up in the request threadpool.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+
+    # Trip cost estimate: nightly stay cost at cost_index 100, and the
+    # per-trip result cache (keyed by trip version; the TTL bounds how long
+    # catalog cost changes take to show)
+    ESTIMATE_BASE_NIGHTLY_COST: float = 100.0
+    ESTIMATE_CACHE_SIZE: int = 10000
+    ESTIMATE_CACHE_TTL_SECONDS: int = 300
+
+    # Public shared-trip responses, cached per trip and revalidated by version
+    SHARED_TRIP_CACHE_SIZE: int = 10000
+    SHARED_TRIP_CACHE_TTL_SECONDS: int = 300
+    SHARED_TRIP_MAX_AGE_SECONDS: int = 60
+
+    # City/activity reads and searches. Each worker keeps an LRU; with a
+    # Redis URL (needs the optional redis package) workers also share
+    # entries and see each other's invalidations.
+    CATALOG_CACHE_SIZE: int = 20000
+    CATALOG_CACHE_TTL_SECONDS: int = 600
+    CATALOG_CACHE_REDIS_URL: str = ""
+    # In-process search/autocomplete indexes rebuild when the catalog's
+    # generation moves (see CATALOG_CACHE_REDIS_URL for other workers), and
+    # at least this often, for changes no shared generation records
+    CATALOG_INDEX_MAX_AGE_SECONDS: int = 300
+    # Comma-separated emails of the users allowed to bulk-import cities and
+    # activities (the imports overwrite existing rows); empty allows no one
+    CATALOG_ADMIN_EMAILS: str = ""
+
+    # Request instrumentation: statements at least this slow are logged to
+    # app.slow_queries; LOG_LEVEL applies to the app.* loggers
+    SLOW_QUERY_MS: float = 200
+    LOG_LEVEL: str = "INFO"
     
     class Config:
         env_file = ".env"
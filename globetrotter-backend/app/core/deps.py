@@ -1,36 +1,124 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from jose import JWTError
-from app.db.database import get_db
+from sqlalchemy import select
+from app.db.database import get_db, AsyncSessionLocal
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_access_token
 from app.models.user import User
 
 # Use HTTPBearer instead of OAuth2PasswordBearer
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user.
+
+    Exposes the same attributes as ``User`` minus the password hash, so it can
+    be returned through ``UserSchema`` and used for ``current_user.id`` checks.
+    """
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    profile_photo: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            profile_photo=user.profile_photo,
+            created_at=user.created_at,
+        )
+
+
+# Keyed by the token subject (the user's email)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def cache_principal(user: User) -> Principal:
+    principal = Principal.from_user(user)
+    principal_cache.set(principal.email, principal)
+    return principal
+
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.invalidate(email)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
+
+
+def _token_subject(credentials: HTTPAuthorizationCredentials) -> str:
+    payload = decode_access_token(credentials.credentials)
     if payload is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    return email
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Principal:
+    """Resolve the caller without holding a request-scoped DB session.
+
+    Cache hits skip the database entirely; misses open a short-lived async
+    session for the single users lookup. Being async, this never takes a
+    threadpool slot. Use it for routes that only need the caller's identity
+    (``current_user.id``) and ``get_current_user`` for routes that modify
+    the user row.
+    """
+    email = _token_subject(credentials)
+
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise _credentials_exception()
+        return cache_principal(user)
+
+
+async def get_catalog_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """The caller, if listed in CATALOG_ADMIN_EMAILS; catalog imports overwrite rows every user sees."""
+    admins = {email.strip().lower() for email in settings.CATALOG_ADMIN_EMAILS.split(",") if email.strip()}
+    if principal.email.lower() not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to import catalog data")
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    email = _token_subject(credentials)
+
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
+    cache_principal(user)
     return user
@@ -0,0 +1,39 @@
+from typing import List, Optional
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches ``etag`` (weak comparison, RFC 9110)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def parse_if_match(header: Optional[str]) -> Optional[List[str]]:
+    """Strong ETags listed in an If-Match header; None when there is no precondition.
+
+    "*" only requires that the resource exists, which the endpoints check
+    anyway, so it counts as no precondition. Weak tags never match.
+    """
+    if not header or header.strip() == "*":
+        return None
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return [candidate for candidate in candidates if candidate and not candidate.startswith("W/")]
+
+
+def conditional_get(
+    request: Request, response: Response, etag: str, cache_control: str = "private, no-cache"
+) -> Optional[Response]:
+    """Set validators on ``response``, or return a 304 if the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
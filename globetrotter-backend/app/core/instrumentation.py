@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import List, Optional, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, registry
+
+request_logger = logging.getLogger("app.requests")
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time from request to last response byte",
+    labels=("method", "route", "status"),
+))
+request_statements = registry.register(Histogram(
+    "http_request_db_statements", "SQL statements run per request",
+    labels=("method", "route"), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+))
+db_seconds = registry.register(Counter(
+    "http_request_db_seconds_total", "Time spent executing SQL", labels=("method", "route"),
+))
+serialization_seconds = registry.register(Counter(
+    "http_request_serialization_seconds_total", "Time from endpoint return to response start",
+    labels=("method", "route"),
+))
+slow_queries = registry.register(Counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS", labels=("route",),
+))
+
+
+@dataclass
+class RequestStats:
+    path: str
+    start: float
+    statements: int = 0
+    db_seconds: float = 0.0
+    endpoint_done: Optional[float] = None
+    serialization_seconds: float = 0.0
+    # (milliseconds, statement) of each slow query
+    slow_queries: List[Tuple[float, str]] = field(default_factory=list)
+
+    def server_timing(self, now: float) -> str:
+        return ", ".join((
+            f"app;dur={(now - self.start) * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries"',
+            f"serialize;dur={self.serialization_seconds * 1000:.1f}",
+        ))
+
+
+# Stats of the request being handled. Sync endpoints and the async engine's
+# greenlets see the same object, so engine events can add to it.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        if stats is not None:
+            stats.slow_queries.append((round(elapsed * 1000, 1), statement))
+        # Parameters are left out on purpose: they can hold user data
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "path": stats.path if stats is not None else None,
+            "duration_ms": round(elapsed * 1000, 1),
+            "statement": statement,
+        }))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every statement run on ``engine`` (a sync Engine)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _timed_endpoint(call):
+    def done():
+        stats = _current.get()
+        if stats is not None:
+            stats.endpoint_done = time.perf_counter()
+
+    if asyncio.iscoroutinefunction(call):
+        @wraps(call)
+        async def timed(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                done()
+    else:
+        @wraps(call)
+        def timed(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                done()
+    return timed
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that marks when its endpoint returns.
+
+    Whatever happens between that mark and the response start (response
+    model validation, JSON encoding, dependency teardown) is reported as
+    serialization time.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        # The request handler looks the call up on the dependant per request
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+
+
+class InstrumentationMiddleware:
+    """Per-request timing, SQL counts and slow queries.
+
+    Adds a Server-Timing header, logs one JSON line per request to
+    ``app.requests`` and feeds the /metrics histograms. Written as plain
+    ASGI rather than BaseHTTPMiddleware so streamed bodies aren't buffered
+    and the stats context reaches the endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(path=scope["path"], start=time.perf_counter())
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                if stats.endpoint_done is not None:
+                    stats.serialization_seconds = now - stats.endpoint_done
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(now))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, status, time.perf_counter() - stats.start)
+
+    @staticmethod
+    def _record(scope, stats: RequestStats, status: int, duration: float) -> None:
+        # Label by route template, not raw path, to keep the series bounded
+        route = scope.get("route")
+        route = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        request_duration.observe(duration, method, route, str(status))
+        request_statements.observe(stats.statements, method, route)
+        db_seconds.inc(method, route, amount=stats.db_seconds)
+        serialization_seconds.inc(method, route, amount=stats.serialization_seconds)
+        if stats.slow_queries:
+            slow_queries.inc(route, amount=len(stats.slow_queries))
+        request_logger.info(json.dumps({
+            "event": "request",
+            "method": method,
+            "path": stats.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "db_statements": stats.statements,
+            "db_ms": round(stats.db_seconds * 1000, 2),
+            "serialize_ms": round(stats.serialization_seconds * 1000, 2),
+            "slow_queries": [ms for ms, _ in stats.slow_queries],
+        }))
+
+
+def configure_logging() -> None:
+    # uvicorn only sets up its own loggers; give ours a plain line-per-record handler
+    for logger in (request_logger, slow_query_logger):
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.propagate = False
+        logger.setLevel(settings.LOG_LEVEL)
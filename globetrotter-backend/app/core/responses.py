@@ -0,0 +1,40 @@
+from typing import Any, Optional, Sequence
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used without it
+    orjson = None
+
+# The app's default response class
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def _with_headers(body: Response, response: Optional[Response]) -> Response:
+    # A returned Response bypasses FastAPI's merge of the injected one, so
+    # carry its headers (ETag, Cache-Control) over by hand
+    if response is not None:
+        body.headers.raw.extend(response.headers.raw)
+        if response.status_code:
+            body.status_code = response.status_code
+    return body
+
+
+def rows_response(adapter: TypeAdapter, rows: Sequence[Any], response: Optional[Response] = None) -> Response:
+    """Validate Core rows (or plain dicts) against ``adapter`` and encode them in one pass.
+
+    Skips ORM hydration and response_model's second validation: pydantic
+    validates the row dicts and writes the JSON bytes itself. Rows are
+    turned into dicts first; validating them by attribute is several
+    times slower.
+    """
+    items = [row if isinstance(row, dict) else row._asdict() for row in rows]
+    body = adapter.dump_json(adapter.validate_python(items))
+    return _with_headers(Response(body, media_type="application/json"), response)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """Encode content that is already in its response shape (e.g. cached model dumps)."""
+    return _with_headers(DefaultJSONResponse(content), response)
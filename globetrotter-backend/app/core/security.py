@@ -1,11 +1,27 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+try:
+    import jwt as pyjwt
+except ImportError:  # optional faster backend
+    pyjwt = None
+
 # Use argon2 instead of bcrypt (more reliable)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 # If argon2 doesn't work, fallback to this:
 # pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -19,6 +35,35 @@ def get_password_hash(password: str) -> str:
         password = password[:72]
     return pwd_context.hash(password)
 
+class PasswordHashingBusy(Exception):
+    """Raised when the password-hashing pool and its queue are both full."""
+
+
+# argon2 is slow and memory-hard by design, so it runs on its own small pool.
+# Callers block on the result, which means at most workers + queue limit
+# request threads can ever be tied up in hashing; the rest fail fast.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+)
+
+def _run_on_hash_pool(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        return _hash_executor.submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
+def verify_password_bounded(plain_password: str, hashed_password: str) -> bool:
+    return _run_on_hash_pool(verify_password, plain_password, hashed_password)
+
+def get_password_hash_bounded(password: str) -> str:
+    return _run_on_hash_pool(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -29,9 +74,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def decode_access_token(token: str):
+# Verified claims keyed by the token's SHA-256 digest. Entries never outlive
+# the token's own ``exp``, so a cached token stops validating when it expires.
+_token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+def _verify_token(token: str):
+    if settings.JWT_BACKEND == "pyjwt" and pyjwt is not None:
+        try:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except pyjwt.PyJWTError:
+            return None
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+
+def decode_access_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = _verify_token(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    ttl = _token_cache.ttl if exp is None else min(exp - time.time(), _token_cache.ttl)
+    if ttl > 0:
+        _token_cache.set(key, payload, ttl=ttl)
+    return payload
@@ -4,4 +4,4 @@ from app.models.trip import Trip
 from app.models.city import City
 from app.models.activity import Activity
 from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
-from app.models.budget import Budget
+from app.models.budget import Budget, TripBudgetRollup
@@ -1,8 +1,32 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import auth, users, trips, cities, activities, itinerary, budget
+from sqlalchemy.exc import SQLAlchemyError
+from app.api.endpoints import auth, users, trips, cities, activities, itinerary, budget, health, shared
+from app.core.instrumentation import InstrumentationMiddleware, configure_logging, instrument_engine
+from app.core.metrics import registry
+from app.core.responses import DefaultJSONResponse
+from app.db.database import SessionLocal, engine, async_engine
+from app.services import autocomplete, cost_estimate, trip_versions
 
-app = FastAPI(title="GlobeTrotter API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the typeahead indexes before serving traffic. A database that
+    # isn't migrated yet shouldn't stop the app from starting; the indexes
+    # are then built on first use instead
+    db = SessionLocal()
+    try:
+        autocomplete.build_indexes(db)
+    except SQLAlchemyError as exc:
+        logging.getLogger(__name__).warning("Autocomplete indexes not built at startup: %s", exc)
+    finally:
+        db.close()
+    yield
+
+# orjson encodes response_model output several times faster than the stdlib
+app = FastAPI(title="GlobeTrotter API", version="1.0.0", lifespan=lifespan, default_response_class=DefaultJSONResponse)
 
 # CORS
 app.add_middleware(
@@ -11,7 +35,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Next-Cursor"],
 )
+# Outermost, so its timings cover the whole stack
+app.add_middleware(InstrumentationMiddleware)
+configure_logging()
+for _engine in (engine, async_engine.sync_engine):
+    instrument_engine(_engine)
+cost_estimate.check_dialect(async_engine.dialect.name)
+
+@app.exception_handler(trip_versions.PreconditionFailed)
+async def precondition_failed(request: Request, exc: trip_versions.PreconditionFailed):
+    # If-Match named a version of the trip that is no longer current
+    return JSONResponse(status_code=412, content={"detail": "Trip has been modified"})
 
 # Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -21,6 +57,13 @@ app.include_router(cities.router, prefix="/api/cities", tags=["Cities"])
 app.include_router(activities.router, prefix="/api/activities", tags=["Activities"])
 app.include_router(itinerary.router, prefix="/api/itinerary", tags=["Itinerary"])
 app.include_router(budget.router, prefix="/api/budget", tags=["Budget"])
+app.include_router(shared.router, prefix="/api/shared", tags=["Shared trips"])
+app.include_router(health.router, prefix="/api/health", tags=["Health"])
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Prometheus text format; per worker process, see app/core/metrics.py
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, Integer, String, Float, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -9,9 +9,17 @@ class Activity(Base):
     name = Column(String, nullable=False, index=True)
     category = Column(String, nullable=False)  # sightseeing, food, adventure, etc.
     description = Column(Text, nullable=True)
-    estimated_cost = Column(Float, default=0.0)
+    # NOT NULL: activity search pages on (estimated_cost, id)
+    estimated_cost = Column(Float, nullable=False, default=0.0)
     duration_hours = Column(Float, default=1.0)
     image_url = Column(String, nullable=True)
     
     # Relationships
     itinerary_activities = relationship("ItineraryActivity", back_populates="activity")
+
+    __table_args__ = (
+        # Keyset pagination for activity search sorts on (estimated_cost, id),
+        # optionally within one category
+        Index("ix_activities_category_cost_id", "category", "estimated_cost", "id"),
+        Index("ix_activities_cost_id", "estimated_cost", "id"),
+    )
@@ -1,15 +1,122 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from collections import defaultdict
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, event, inspect, update, delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import relationship, Session, column_property
 from app.db.database import Base
+from app.models.trip import Trip
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        Index("ix_budgets_trip_id_category", "trip_id", "category"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)
-    category = Column(String, nullable=False)  # transport, stay, activities, meals
-    amount = Column(Float, default=0.0)
+    # active_history: the rollup hook needs the old values of these on update,
+    # even when they were expired before being changed
+    trip_id = column_property(Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False), active_history=True)
+    category = column_property(Column(String, nullable=False), active_history=True)  # transport, stay, activities, meals
+    amount = column_property(Column(Float, default=0.0), active_history=True)
     description = Column(String, nullable=True)
     
     # Relationships
     trip = relationship("Trip", back_populates="budgets")
+
+
+class TripBudgetRollup(Base):
+    """Per-trip, per-category budget totals maintained on every Budget write.
+
+    Kept in the same transaction as the budget rows by the after_flush hook
+    below, so summary reads never have to touch ``budgets``. Use
+    ``python -m app.services.budget_rollups check|rebuild`` to reconcile.
+    """
+    __tablename__ = "trip_budget_rollups"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    line_count = Column(Integer, nullable=False, default=0)
+
+    trip = relationship("Trip", back_populates="budget_rollups")
+
+
+def _budget_deltas(session: Session):
+    deltas = defaultdict(lambda: [0.0, 0])
+
+    def apply(trip_id, category, amount, sign):
+        delta = deltas[(trip_id, category)]
+        delta[0] += sign * (amount or 0.0)
+        delta[1] += sign
+
+    for obj in session.new:
+        if isinstance(obj, Budget):
+            apply(obj.trip_id, obj.category, obj.amount, 1)
+    for obj in session.deleted:
+        if isinstance(obj, Budget):
+            state = inspect(obj)
+            # Use the committed values in case the row was edited before delete
+            old = {
+                key: (state.attrs[key].history.deleted or [getattr(obj, key)])[0]
+                for key in ("trip_id", "category", "amount")
+            }
+            apply(old["trip_id"], old["category"], old["amount"], -1)
+    for obj in session.dirty:
+        if not isinstance(obj, Budget) or not session.is_modified(obj):
+            continue
+        state = inspect(obj)
+        histories = {key: state.attrs[key].history for key in ("trip_id", "category", "amount")}
+        if not any(h.has_changes() for h in histories.values()):
+            continue
+        old = {key: (h.deleted or h.unchanged or [None])[0] for key, h in histories.items()}
+        apply(old["trip_id"], old["category"], old["amount"], -1)
+        apply(obj.trip_id, obj.category, obj.amount, 1)
+
+    # Trips deleted in this flush take their rollups with them
+    deleted_trips = {obj.id for obj in session.deleted if isinstance(obj, Trip)}
+    return {
+        key: delta for key, delta in deltas.items()
+        if key[0] not in deleted_trips and (delta[0] or delta[1])
+    }
+
+
+def apply_rollup_deltas(connection, deltas) -> None:
+    """Add ``{(trip_id, category): [amount, line_count]}`` deltas to the rollups."""
+    table = TripBudgetRollup.__table__
+    dialect = connection.dialect.name
+    for (trip_id, category), (amount, count) in deltas.items():
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(table).values(
+                trip_id=trip_id, category=category, total=amount, line_count=count
+            )
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.trip_id, table.c.category],
+                set_={
+                    "total": table.c.total + stmt.excluded.total,
+                    "line_count": table.c.line_count + stmt.excluded.line_count,
+                },
+            ))
+        else:
+            result = connection.execute(
+                update(table)
+                .where(table.c.trip_id == trip_id, table.c.category == category)
+                .values(total=table.c.total + amount, line_count=table.c.line_count + count)
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(
+                    trip_id=trip_id, category=category, total=amount, line_count=count
+                ))
+    # Categories with no lines left disappear, like they would from a GROUP BY
+    connection.execute(
+        delete(table).where(
+            table.c.line_count <= 0,
+            table.c.trip_id.in_({trip_id for trip_id, _ in deltas}),
+        )
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_budget_rollups(session, flush_context):
+    deltas = _budget_deltas(session)
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
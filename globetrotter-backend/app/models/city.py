@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, Integer, String, Float, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -16,3 +16,20 @@ class City(Base):
     
     # Relationships
     itinerary_stops = relationship("ItineraryStop", back_populates="city")
+
+    __table_args__ = (
+        # Trigram index so ILIKE '%q%' city search can use an index (Postgres only)
+        Index(
+            "ix_cities_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    City.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -1,30 +1,37 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, Integer, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
 class ItineraryStop(Base):
     __tablename__ = "itinerary_stops"
+    # The (trip_id, order_key) index also serves every lookup by trip_id
+    __table_args__ = (
+        Index("uq_itinerary_stops_trip_order_key", "trip_id", "order_key", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)
-    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False, index=True)
     arrival_date = Column(DateTime, nullable=False)
     departure_date = Column(DateTime, nullable=False)
-    order_index = Column(Integer, default=0)
+    # Sparse sort key, see app/services/stop_order.py
+    order_key = Column(BigInteger, nullable=False)
     notes = Column(Text, nullable=True)
     
     # Relationships
     trip = relationship("Trip", back_populates="itinerary_stops")
     city = relationship("City", back_populates="itinerary_stops")
-    activities = relationship("ItineraryActivity", back_populates="stop", cascade="all, delete-orphan")
+    activities = relationship(
+        "ItineraryActivity", back_populates="stop", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class ItineraryActivity(Base):
     __tablename__ = "itinerary_activities"
     
     id = Column(Integer, primary_key=True, index=True)
-    stop_id = Column(Integer, ForeignKey("itinerary_stops.id"), nullable=False)
-    activity_id = Column(Integer, ForeignKey("activities.id"), nullable=False)
+    stop_id = Column(Integer, ForeignKey("itinerary_stops.id", ondelete="CASCADE"), nullable=False, index=True)
+    activity_id = Column(Integer, ForeignKey("activities.id"), nullable=False, index=True)
     scheduled_time = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
     
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
 
 class Trip(Base):
     __tablename__ = "trips"
+    # Keyset pagination of a user's trips; also serve plain user_id lookups
+    __table_args__ = (
+        Index("ix_trips_user_start_date_id", "user_id", "start_date", "id"),
+        Index("ix_trips_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -15,9 +20,19 @@ class Trip(Base):
     cover_photo = Column(String, nullable=True)
     is_public = Column(Integer, default=0)  # 0=private, 1=public
     public_url = Column(String, unique=True, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: trip listing can page on (created_at, id)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Bumped by every write to the trip or its stops, activities and budget
+    # (see app/services/trip_versions.py); the basis of its ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
-    # Relationships
+    # Relationships. Children are removed by ON DELETE CASCADE in the
+    # database; passive_deletes keeps the ORM from loading them first.
     user = relationship("User", back_populates="trips")
-    itinerary_stops = relationship("ItineraryStop", back_populates="trip", cascade="all, delete-orphan")
-    budgets = relationship("Budget", back_populates="trip", cascade="all, delete-orphan")
+    itinerary_stops = relationship(
+        "ItineraryStop", back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
+    )
+    budgets = relationship("Budget", back_populates="trip", cascade="all, delete-orphan", passive_deletes=True)
+    budget_rollups = relationship(
+        "TripBudgetRollup", back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
+    )
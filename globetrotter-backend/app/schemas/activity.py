@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class ActivityBase(BaseModel):
     name: str
@@ -19,3 +19,14 @@ class Activity(ActivityBase):
     
     class Config:
         from_attributes = True
+
+class ActivitySuggestion(BaseModel):
+    id: int
+    name: str
+    category: str
+
+class ActivitySearchPage(BaseModel):
+    items: List[Activity]
+    next_cursor: Optional[str] = None
+    # Matches per category for the current filters, ignoring the category filter
+    facets: Dict[str, int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class BudgetCreate(BaseModel):
     category: str
@@ -27,3 +27,26 @@ class BudgetSummary(BaseModel):
     activities: float
     meals: float
     other: float
+    # Totals for every category present, including ones folded into "other"
+    breakdown: Dict[str, float] = {}
+
+class TripBudgetSummary(BudgetSummary):
+    trip_id: int
+
+class UserBudgetSummary(BudgetSummary):
+    trips: List[TripBudgetSummary]
+
+class TripCostEstimate(BaseModel):
+    trip_id: int
+    stops: int
+    nights: float
+    scheduled_activities: int
+    estimated_stay: float
+    estimated_activities: float
+    estimated_total: float
+    budget_total: float
+    budget_stay: float
+    budget_activities: float
+    # budget_total - estimated_total; negative means the plan is over budget
+    remaining: float
+    over_budget: bool
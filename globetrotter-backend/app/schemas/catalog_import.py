@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    line: int
+    message: str
+
+class CatalogImportReport(BaseModel):
+    rows: int
+    inserted: int
+    updated: int
+    invalid: int
+    seconds: float
+    rows_per_second: float
+    # Only the first few invalid rows are listed
+    errors: List[ImportRowError]
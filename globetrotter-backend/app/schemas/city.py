@@ -21,3 +21,8 @@ class City(CityBase):
     
     class Config:
         from_attributes = True
+
+class CitySuggestion(BaseModel):
+    id: int
+    name: str
+    country: str
@@ -29,6 +29,7 @@ class ItineraryStopCreate(BaseModel):
 class ItineraryStopUpdate(BaseModel):
     arrival_date: Optional[datetime] = None
     departure_date: Optional[datetime] = None
+    # 0-based position to move the stop to
     order_index: Optional[int] = None
     notes: Optional[str] = None
 
@@ -38,10 +39,30 @@ class ItineraryStop(BaseModel):
     city_id: int
     arrival_date: datetime
     departure_date: datetime
-    order_index: int
+    order_key: int
     notes: Optional[str] = None
     city: Optional[City] = None
     activities: List[ItineraryActivity] = []
     
     class Config:
         from_attributes = True
+
+class ItineraryBatchStop(ItineraryStopCreate):
+    activities: List[ItineraryActivityCreate] = []
+
+class ItineraryBatchActivity(ItineraryActivityCreate):
+    stop_id: int
+
+class StopReorder(BaseModel):
+    # Moves are applied one after another; order_index is the 0-based
+    # position the stop moves to
+    stop_id: int
+    order_index: int
+
+class ItineraryBatch(BaseModel):
+    # Applied in this order: deletes, moves, new stops (appended after the
+    # current last stop), then activities for existing stops
+    delete_stop_ids: List[int] = []
+    reorder: List[StopReorder] = []
+    stops: List[ItineraryBatchStop] = []
+    activities: List[ItineraryBatchActivity] = []
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+from app.schemas.itinerary import ItineraryStop
+from app.schemas.budget import BudgetSummary
 
 class TripBase(BaseModel):
     name: str
@@ -26,6 +28,26 @@ class Trip(TripBase):
     is_public: int
     public_url: Optional[str] = None
     created_at: datetime
+    # Bumped by every write to the trip, its stops or its budget; echoed as the ETag
+    version: int
     
     class Config:
         from_attributes = True
+
+class TripPage(BaseModel):
+    # Each item holds only the columns asked for with fields=
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class PublicTrip(TripBase):
+    id: int
+    cover_photo: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SharedTrip(BaseModel):
+    trip: PublicTrip
+    stops: List[ItineraryStop]
+    budget: BudgetSummary
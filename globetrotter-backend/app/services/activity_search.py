@@ -0,0 +1,92 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+from app.models.activity import Activity
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class ActivityFilters:
+    q: str = ""
+    category: str = ""
+    min_cost: Optional[float] = None
+    max_cost: Optional[float] = None
+    min_duration: Optional[float] = None
+    max_duration: Optional[float] = None
+
+
+def encode_cursor(activity: Activity, descending: bool) -> str:
+    raw = json.dumps([activity.estimated_cost, activity.id, descending]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, int, bool]:
+    try:
+        cost, activity_id, descending = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(cost), int(activity_id), bool(descending)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _apply_filters(query, filters: ActivityFilters, include_category: bool = True):
+    if filters.q:
+        query = query.filter(Activity.name.ilike(f"%{filters.q}%"))
+    if include_category and filters.category:
+        query = query.filter(Activity.category == filters.category)
+    if filters.min_cost is not None:
+        query = query.filter(Activity.estimated_cost >= filters.min_cost)
+    if filters.max_cost is not None:
+        query = query.filter(Activity.estimated_cost <= filters.max_cost)
+    if filters.min_duration is not None:
+        query = query.filter(Activity.duration_hours >= filters.min_duration)
+    if filters.max_duration is not None:
+        query = query.filter(Activity.duration_hours <= filters.max_duration)
+    return query
+
+
+def search_activities(
+    db: Session,
+    filters: ActivityFilters,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[List[Activity], Optional[str]]:
+    """One page of activities ordered by (estimated_cost, id).
+
+    Pages are addressed by a keyset cursor rather than an offset, so deep
+    pages cost the same as the first one. The cursor remembers the sort
+    direction it was issued for.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = _apply_filters(db.query(Activity), filters)
+
+    key = tuple_(Activity.estimated_cost, Activity.id)
+    if cursor:
+        cost, activity_id, descending = decode_cursor(cursor)
+        boundary = tuple_(cost, activity_id)
+        query = query.filter(key < boundary if descending else key > boundary)
+
+    if descending:
+        query = query.order_by(Activity.estimated_cost.desc(), Activity.id.desc())
+    else:
+        query = query.order_by(Activity.estimated_cost, Activity.id)
+
+    # Fetch one extra row to know whether there is a next page
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1], descending) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def category_facets(db: Session, filters: ActivityFilters) -> Dict[str, int]:
+    # Counted without the category filter so the UI can show the other options
+    query = _apply_filters(
+        db.query(Activity.category, func.count(Activity.id)), filters, include_category=False
+    )
+    return dict(query.group_by(Activity.category).order_by(Activity.category).all())
@@ -0,0 +1,171 @@
+import bisect
+import heapq
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy.orm import Session
+from app.models.city import City
+from app.models.activity import Activity
+from app.services.catalog_cache import CITIES, ACTIVITIES, IndexRefresher, free_gradually
+from app.services.city_search import normalize
+
+# Prefixes matching at least this many keys get their top results memoized,
+# so short, unselective prefixes ("s", "sa") don't walk thousands of entries
+MEMO_MIN_MATCHES = 200
+MEMO_LIMIT = 50
+
+class PrefixIndex:
+    """Sorted-array prefix index for typeahead.
+
+    Every entry is stored under its full normalized label and under each
+    later word ("new york" is also found by "york"), so a lookup is two
+    bisects plus a walk over the matching slice. Results rank full-label
+    prefix matches ahead of word matches, then by popularity, then by label.
+    Inserts keep the arrays sorted, which is cheap for catalogs that change
+    as rarely as cities and activities do. Top results for unselective
+    prefixes are precomputed at build time and recomputed lazily after
+    inserts touch them.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: List[str] = []
+        self._entries: List[Tuple[tuple, int]] = []
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._memo: Dict[str, List[Dict[str, Any]]] = {}
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    @staticmethod
+    def _keyed_entries(item_id: int, label: str, popularity: int):
+        label = normalize(label)
+        words = label.replace("-", " ").split()
+        yield label, ((0, -(popularity or 0), label, item_id), item_id)
+        for i in range(1, len(words)):
+            yield " ".join(words[i:]), ((1, -(popularity or 0), label, item_id), item_id)
+
+    def add(self, item_id: int, label: str, popularity: int, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._payloads[item_id] = payload
+            for key, entry in self._keyed_entries(item_id, label, popularity):
+                position = bisect.bisect_right(self._keys, key)
+                self._keys.insert(position, key)
+                self._entries.insert(position, entry)
+                for i in range(1, len(key) + 1):
+                    self._memo.pop(key[:i], None)
+
+    def build(self, items: Iterable[Tuple[int, str, int, Dict[str, Any]]]) -> None:
+        pairs = []
+        payloads = {}
+        for item_id, label, popularity, payload in items:
+            payloads[item_id] = payload
+            pairs.extend(self._keyed_entries(item_id, label, popularity))
+        pairs.sort(key=lambda pair: pair[0])
+        # Everything, memo included, is computed on a fresh index and only
+        # swapped in under the lock, so searches aren't held up by a rebuild
+        fresh = PrefixIndex()
+        fresh._keys = [key for key, _ in pairs]
+        fresh._entries = [entry for _, entry in pairs]
+        fresh._payloads = payloads
+        memo = fresh._precompute_memo()
+        with self._lock:
+            previous = self._keys, self._entries, self._payloads
+            self._keys, self._entries, self._payloads, self._memo = fresh._keys, fresh._entries, payloads, memo
+            self.built = True
+        free_gradually(*previous)
+
+    def _top(self, lo: int, hi: int, limit: int) -> List[Dict[str, Any]]:
+        best: Dict[int, tuple] = {}
+        for rank, item_id in self._entries[lo:hi]:
+            current = best.get(item_id)
+            if current is None or rank < current:
+                best[item_id] = rank
+        return [self._payloads[rank[-1]] for rank in heapq.nsmallest(limit, best.values())]
+
+    def _range(self, q: str, lo: int = 0) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._keys, q, lo)
+        return lo, bisect.bisect_left(self._keys, q + "\U0010ffff", lo)
+
+    def _precompute_memo(self) -> Dict[str, List[Dict[str, Any]]]:
+        memo = {}
+        length = 1
+        found = True
+        while found:
+            found = False
+            i = 0
+            while i < len(self._keys):
+                prefix = self._keys[i][:length]
+                lo, hi = self._range(prefix, i)
+                if len(prefix) == length and hi - lo >= MEMO_MIN_MATCHES:
+                    memo[prefix] = self._top(lo, hi, MEMO_LIMIT)
+                    found = True
+                i = hi
+            length += 1
+        return memo
+
+    def search(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        q = normalize(q)
+        if not q:
+            return []
+        with self._lock:
+            if limit <= MEMO_LIMIT and q in self._memo:
+                return self._memo[q][:limit]
+            lo, hi = self._range(q)
+            if limit <= MEMO_LIMIT and hi - lo >= MEMO_MIN_MATCHES:
+                self._memo[q] = self._top(lo, hi, MEMO_LIMIT)
+                return self._memo[q][:limit]
+            return self._top(lo, hi, limit)
+
+
+city_autocomplete = PrefixIndex()
+activity_autocomplete = PrefixIndex()
+
+
+def _city_payload(city_id, name, country):
+    return {"id": city_id, "name": name, "country": country}
+
+def _activity_payload(activity_id, name, category):
+    return {"id": activity_id, "name": name, "category": category}
+
+
+def _build_cities(db: Session) -> None:
+    city_autocomplete.build(
+        (row.id, row.name, row.popularity, _city_payload(row.id, row.name, row.country))
+        for row in db.query(City.id, City.name, City.country, City.popularity).yield_per(10000)
+    )
+
+def _build_activities(db: Session) -> None:
+    activity_autocomplete.build(
+        (row.id, row.name, 0, _activity_payload(row.id, row.name, row.category))
+        for row in db.query(Activity.id, Activity.name, Activity.category).yield_per(10000)
+    )
+
+
+# Rebuilt on use once their catalog's generation moves; see IndexRefresher
+city_refresh = IndexRefresher(CITIES, _build_cities)
+activity_refresh = IndexRefresher(ACTIVITIES, _build_activities)
+
+
+def build_indexes(db: Session) -> None:
+    city_refresh.rebuild(db)
+    activity_refresh.rebuild(db)
+
+
+def ensure_current(db: Session) -> None:
+    # Built at startup, and again whenever a catalog has changed since
+    city_refresh.ensure_current(db)
+    activity_refresh.ensure_current(db)
+
+
+def index_city(city: City, generation: int) -> None:
+    """Add a city this worker just created; ``generation`` is what catalog.invalidate() returned."""
+    city_refresh.apply_local(generation, lambda: city_autocomplete.add(
+        city.id, city.name, city.popularity, _city_payload(city.id, city.name, city.country)
+    ))
+
+def index_activity(activity: Activity, generation: int) -> None:
+    """Add an activity this worker just created; ``generation`` is what catalog.invalidate() returned."""
+    activity_refresh.apply_local(generation, lambda: activity_autocomplete.add(
+        activity.id, activity.name, 0, _activity_payload(activity.id, activity.name, activity.category)
+    ))
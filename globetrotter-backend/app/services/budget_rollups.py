@@ -0,0 +1,94 @@
+"""Consistency checks for the trip_budget_rollups table.
+
+    python -m app.services.budget_rollups check     # exit 1 on any mismatch
+    python -m app.services.budget_rollups rebuild [--trip-id ID ...]
+"""
+import argparse
+import math
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.models.budget import Budget, TripBudgetRollup
+
+Key = Tuple[int, str]
+
+
+def raw_totals(db: Session, trip_ids: Optional[Iterable[int]] = None) -> Dict[Key, Tuple[float, int]]:
+    query = select(
+        Budget.trip_id, Budget.category, func.coalesce(func.sum(Budget.amount), 0.0), func.count()
+    ).group_by(Budget.trip_id, Budget.category)
+    if trip_ids is not None:
+        query = query.where(Budget.trip_id.in_(list(trip_ids)))
+    return {(trip_id, category): (total, count) for trip_id, category, total, count in db.execute(query)}
+
+
+def rollup_totals(db: Session, trip_ids: Optional[Iterable[int]] = None) -> Dict[Key, Tuple[float, int]]:
+    query = select(
+        TripBudgetRollup.trip_id, TripBudgetRollup.category, TripBudgetRollup.total, TripBudgetRollup.line_count
+    )
+    if trip_ids is not None:
+        query = query.where(TripBudgetRollup.trip_id.in_(list(trip_ids)))
+    return {(trip_id, category): (total, count) for trip_id, category, total, count in db.execute(query)}
+
+
+def find_mismatches(db: Session, trip_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    trip_ids = None if trip_ids is None else list(trip_ids)
+    raw = raw_totals(db, trip_ids)
+    rollups = rollup_totals(db, trip_ids)
+    mismatches = []
+    for key in sorted(raw.keys() | rollups.keys()):
+        expected = raw.get(key, (0.0, 0))
+        actual = rollups.get(key, (0.0, 0))
+        # Rollup totals are accumulated incrementally, so allow float drift
+        if expected[1] != actual[1] or not math.isclose(expected[0], actual[0], rel_tol=1e-9, abs_tol=1e-6):
+            mismatches.append({"trip_id": key[0], "category": key[1], "expected": expected, "actual": actual})
+    return mismatches
+
+
+def rebuild(db: Session, trip_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute rollups from raw budget rows (all trips, or just ``trip_ids``)."""
+    trip_ids = None if trip_ids is None else list(trip_ids)
+    clear = delete(TripBudgetRollup)
+    totals = select(
+        Budget.trip_id, Budget.category, func.coalesce(func.sum(Budget.amount), 0.0), func.count()
+    ).group_by(Budget.trip_id, Budget.category)
+    if trip_ids is not None:
+        clear = clear.where(TripBudgetRollup.trip_id.in_(trip_ids))
+        totals = totals.where(Budget.trip_id.in_(trip_ids))
+    db.execute(clear)
+    db.execute(
+        insert(TripBudgetRollup).from_select(
+            ["trip_id", "category", "total", "line_count"], totals
+        )
+    )
+    db.commit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--trip-id", type=int, action="append", dest="trip_ids")
+    args = parser.parse_args(argv)
+
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild(db, args.trip_ids)
+            print("Rollups rebuilt")
+            return 0
+        mismatches = find_mismatches(db, args.trip_ids)
+        for mismatch in mismatches:
+            print(
+                f"trip {mismatch['trip_id']} {mismatch['category']!r}: "
+                f"rows={mismatch['expected']} rollup={mismatch['actual']}"
+            )
+        print(f"{len(mismatches)} mismatched rollups")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
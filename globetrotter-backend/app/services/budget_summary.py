@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.trip import Trip
+from app.models.budget import TripBudgetRollup
+
+# Categories with their own field in BudgetSummary; anything else is "other"
+NAMED_CATEGORIES = ("transport", "stay", "activities", "meals")
+
+
+def summary_from_breakdown(breakdown: Dict[str, float]) -> dict:
+    summary = {category: breakdown.get(category, 0.0) for category in NAMED_CATEGORIES}
+    summary["total_budget"] = sum(breakdown.values())
+    summary["other"] = sum(
+        amount for category, amount in breakdown.items() if category not in NAMED_CATEGORIES
+    )
+    summary["breakdown"] = breakdown
+    return summary
+
+
+# Both readers go through trip_budget_rollups, which the Budget flush hook
+# keeps in step with the raw rows, so their cost doesn't depend on how many
+# budget lines a trip has.
+
+async def trip_breakdown(db: AsyncSession, trip_id: int) -> Dict[str, float]:
+    rows = await db.execute(
+        select(TripBudgetRollup.category, TripBudgetRollup.total)
+        .where(TripBudgetRollup.trip_id == trip_id)
+    )
+    return {category: amount for category, amount in rows}
+
+
+async def user_breakdowns(db: AsyncSession, user_id: int) -> Dict[int, Dict[str, float]]:
+    """Per-trip category totals for every trip the user owns, in one query."""
+    rows: Iterable[Tuple[int, str, float]] = await db.execute(
+        select(Trip.id, TripBudgetRollup.category, TripBudgetRollup.total)
+        .outerjoin(TripBudgetRollup, TripBudgetRollup.trip_id == Trip.id)
+        .where(Trip.user_id == user_id)
+        .order_by(Trip.id)
+    )
+    breakdowns: Dict[int, Dict[str, float]] = {}
+    for trip_id, category, amount in rows:
+        trip = breakdowns.setdefault(trip_id, {})
+        if category is not None:
+            trip[category] = amount
+    return breakdowns
+
+
+def user_summary(breakdowns: Dict[int, Dict[str, float]]) -> dict:
+    overall: Dict[str, float] = {}
+    trips: List[dict] = []
+    for trip_id, breakdown in breakdowns.items():
+        for category, amount in breakdown.items():
+            overall[category] = overall.get(category, 0.0) + amount
+        trips.append({"trip_id": trip_id, **summary_from_breakdown(breakdown)})
+    return {**summary_from_breakdown(overall), "trips": trips}
@@ -0,0 +1,331 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional shared backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CITIES = "cities"
+ACTIVITIES = "activities"
+
+# How long a worker trusts its copy of a catalog's generation before asking
+# the shared backend again, i.e. how late it can notice another worker's
+# invalidation
+GENERATION_TTL_SECONDS = 1.0
+# Entries freed per step when a rebuilt index replaces the old one
+FREE_CHUNK = 10000
+
+
+class CacheBackend(ABC):
+    """Interface for the cache shared between worker processes.
+
+    Values are opaque bytes. ``incr`` must be atomic across processes.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    """Dict-backed stand-in for Redis, for benchmarks and tests.
+
+    Give several CatalogCache instances the same MemoryBackend to simulate
+    workers sharing one Redis.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.gets = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self.gets += 1
+            entry = self._data.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._data.get(key)
+            value = int(entry[1]) + 1 if entry else 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("CATALOG_CACHE_REDIS_URL is set but the redis package isn't installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(key)
+
+
+class CatalogCache:
+    """Read-through cache for city and activity reads and searches.
+
+    Lookups try this worker's LRU, then the shared backend (if any), then
+    call the loader and fill both. Values must be JSON-serializable.
+
+    The catalogs only change by whole-catalog invalidation (see
+    invalidate()): every key is stored under the catalog's current
+    generation, and bumping the generation makes all older entries
+    unreachable, locally at once and in other workers within
+    GENERATION_TTL_SECONDS. That is coarse, but creates are rare next to
+    reads, and it also covers searches whose results a new row would change.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, shared: Optional[CacheBackend] = None):
+        self.ttl = ttl
+        self.shared = shared
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+        # Local generations count up from the process's start time rather
+        # than 0, so a restarted worker never reuses a generation (or an
+        # ETag built from one) for different catalog data
+        self._first_generation = int(time.time())
+        self._shared_generations = TTLCache(maxsize=16, ttl=GENERATION_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self._counts = {"local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def generation(self, kind: str) -> int:
+        """The catalog's current generation, as last seen from the shared backend."""
+        if self.shared is None:
+            return self._generations.get(kind, self._first_generation)
+        generation = self._shared_generations.get(kind)
+        if generation is None:
+            generation = int(self.shared.get(f"catalog:{kind}:generation") or 0)
+            self._shared_generations.set(kind, generation)
+        return generation
+
+    def get_or_load(self, kind: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, or ``load()``'s result. None results aren't cached."""
+        generation = self.generation(kind)
+        local_key = (kind, generation, key)
+        value = self._local.get(local_key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+
+        shared_key = f"catalog:{kind}:{generation}:{json.dumps(key)}"
+        if self.shared is not None:
+            raw = self.shared.get(shared_key)
+            if raw is not None:
+                self._count("shared_hits")
+                value = json.loads(raw)
+                self._local.set(local_key, value)
+                return value
+
+        self._count("misses")
+        value = load()
+        if value is not None:
+            self._local.set(local_key, value)
+            if self.shared is not None:
+                self.shared.set(shared_key, json.dumps(value).encode(), self.ttl)
+        return value
+
+    def put(self, kind: str, key: Hashable, value: Any) -> None:
+        # Write-through for a row that was just created
+        generation = self.generation(kind)
+        self._local.set((kind, generation, key), value)
+        if self.shared is not None:
+            self.shared.set(f"catalog:{kind}:{generation}:{json.dumps(key)}", json.dumps(value).encode(), self.ttl)
+
+    def invalidate(self, kind: str) -> int:
+        """Drop everything cached for ``kind``, in every worker sharing the backend.
+
+        Returns the new generation.
+        """
+        self._count("invalidations")
+        if self.shared is None:
+            with self._lock:
+                generation = self._generations[kind] = self._generations.get(kind, self._first_generation) + 1
+        else:
+            generation = self.shared.incr(f"catalog:{kind}:generation")
+            self._shared_generations.set(kind, generation)
+        return generation
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "evictions": self._local.evictions, "size": len(self._local)}
+
+
+class IndexRefresher:
+    """Keeps an in-process index (autocomplete, city search) in step with its catalog.
+
+    The index remembers the catalog generation it was built at.
+    ensure_current() rebuilds it once the catalog has been invalidated
+    since: by a create or import in this worker, in another worker sharing
+    the backend, or by the import CLI. Without a shared backend other
+    processes' changes are invisible, so an index is also rebuilt once it is
+    CATALOG_INDEX_MAX_AGE_SECONDS old.
+
+    Only the first build runs in the request that needs it. Later rebuilds
+    run on a background thread with their own session, one at a time, and
+    requests keep being served from the previous index until the new one
+    is swapped in.
+    """
+
+    def __init__(self, kind: str, build: Callable[[Any], None], cache: Optional["CatalogCache"] = None,
+                 max_age: Optional[float] = None):
+        self.kind = kind
+        self._build = build
+        self._cache = cache
+        self.max_age = settings.CATALOG_INDEX_MAX_AGE_SECONDS if max_age is None else max_age
+        self.generation: Optional[int] = None
+        self.built_at = 0.0
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def cache(self) -> "CatalogCache":
+        return self._cache or catalog
+
+    def _stale(self) -> bool:
+        return (
+            self.generation is None
+            or self.generation != self.cache.generation(self.kind)
+            or time.monotonic() - self.built_at >= self.max_age
+        )
+
+    def _rebuild(self, db) -> None:
+        # Read the generation first: an invalidation that lands during the
+        # load leaves the index marked stale rather than looking current
+        generation = self.cache.generation(self.kind)
+        self._build(db)
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.rebuilds += 1
+
+    def _rebuild_in_background(self, bind) -> None:
+        # Runs with self._lock held by the request that started it
+        try:
+            with Session(bind=bind) as db:
+                self._rebuild(db)
+        except Exception:
+            logger.exception("Rebuilding the %s index failed; still serving the previous one", self.kind)
+        finally:
+            self._lock.release()
+
+    def ensure_current(self, db) -> bool:
+        """Build the index if it never was, or start a background rebuild if it is stale.
+
+        Returns False while results still come from a stale index, so
+        callers can avoid caching them under the catalog's new generation.
+        """
+        if not self._stale():
+            return True
+        if self.generation is None:
+            with self._lock:
+                if self.generation is None:
+                    self._rebuild(db)
+            return True
+        if self._lock.acquire(blocking=False):
+            self._thread = threading.Thread(
+                target=self._rebuild_in_background, args=(db.get_bind(),), name=f"rebuild-{self.kind}-index",
+                daemon=True,
+            )
+            self._thread.start()
+        return False
+
+    def rebuild(self, db) -> None:
+        with self._lock:
+            self._rebuild(db)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background rebuild in progress, if any."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def apply_local(self, generation: int, change: Callable[[], None]) -> None:
+        """Apply a create made by this worker in place, if it is the catalog's only change since the build.
+
+        ``generation`` is what invalidate() returned for the create. If
+        anything else changed the catalog in between, the index hasn't been
+        built, or a rebuild is running (which will come out stale and be
+        redone), the change is left to the next rebuild.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if self.generation is not None and self.generation == generation - 1:
+                change()
+                self.generation = generation
+        finally:
+            self._lock.release()
+
+
+def free_gradually(*containers) -> None:
+    """Empty the lists and dicts of an index that a rebuild replaced, a slice at a time.
+
+    Dropping a whole catalog's worth of objects in one go is a single long
+    C call that holds the GIL, stalling every request in the process.
+    """
+    for container in containers:
+        if isinstance(container, dict):
+            while container:
+                for key in list(islice(container, FREE_CHUNK)):
+                    del container[key]
+        else:
+            while container:
+                del container[-FREE_CHUNK:]
+
+
+def generations() -> Tuple[int, int]:
+    """The (cities, activities) generations.
+
+    Part of the validators of responses that embed catalog rows (itinerary
+    stops, shared trips), since an import can change those rows without
+    touching any trip's version.
+    """
+    return catalog.generation(CITIES), catalog.generation(ACTIVITIES)
+
+
+def _shared_backend() -> Optional[CacheBackend]:
+    if settings.CATALOG_CACHE_REDIS_URL:
+        return RedisBackend(settings.CATALOG_CACHE_REDIS_URL)
+    return None
+
+
+catalog = CatalogCache(
+    maxsize=settings.CATALOG_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS, shared=_shared_backend()
+)
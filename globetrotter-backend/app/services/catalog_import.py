@@ -0,0 +1,277 @@
+"""Bulk import of cities and activities from CSV or JSONL.
+
+Rows are read and validated (with CityCreate/ActivityCreate) one chunk at a
+time, so memory stays flat however large the file is. Each chunk is loaded
+into a temporary staging table, with COPY on Postgres and executemany
+elsewhere, and merged into the catalog with two set-based statements:
+rows whose natural key already exists are updated, the rest inserted.
+Each chunk commits on its own, so a failed import keeps the chunks before
+it.
+
+    python -m app.services.catalog_import cities cities.csv
+
+A finished import invalidates the catalog, which also makes every
+worker's search and autocomplete indexes rebuild on next use. The CLI
+runs in its own process, so servers only see that invalidation through
+the shared backend (CATALOG_CACHE_REDIS_URL); without one they pick the
+rows up within CATALOG_CACHE_TTL_SECONDS (cached reads) and
+CATALOG_INDEX_MAX_AGE_SECONDS (indexes).
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Column, MetaData, Table, and_, delete, exists, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from app.models.city import City
+from app.models.activity import Activity
+from app.schemas.city import CityCreate
+from app.schemas.activity import ActivityCreate
+from app.services import catalog_cache
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("csv", "jsonl")
+
+
+class InvalidImport(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CatalogKind:
+    model: Any
+    schema: Type[BaseModel]
+    # Natural key: a row matching an existing entry on these columns replaces it
+    key: Tuple[str, ...]
+    cache_kind: str
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.schema.model_fields)
+
+
+KINDS = {
+    "cities": CatalogKind(City, CityCreate, ("name", "country"), catalog_cache.CITIES),
+    "activities": CatalogKind(Activity, ActivityCreate, ("name", "category"), catalog_cache.ACTIVITIES),
+}
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    # (line number, message) for the first MAX_REPORTED_ERRORS invalid rows
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "invalid": self.invalid,
+            "seconds": self.seconds,
+            "rows_per_second": self.rows_per_second,
+            "errors": [{"line": line, "message": message} for line, message in self.errors],
+        }
+
+
+def read_rows(stream: io.TextIOBase, format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, raw row) pairs.
+
+    Empty CSV cells and JSON nulls are dropped, so they count as not given:
+    an update keeps the column's current value, an insert gets the default.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+    elif format == "jsonl":
+        for line_num, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_num, exc
+                    continue
+                if isinstance(row, dict):
+                    row = {k: v for k, v in row.items() if v is not None}
+                yield line_num, row
+    else:
+        raise InvalidImport(f"Unknown format {format!r}, expected one of {', '.join(FORMATS)}")
+
+
+def _validated(kind: CatalogKind, rows: Iterable, report: ImportReport) -> Iterator[Dict[str, Any]]:
+    for line_num, row in rows:
+        report.rows += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            # Only the fields the row gives; see _merge_chunk
+            yield kind.schema.model_validate(row).model_dump(exclude_unset=True)
+        except (ValidationError, ValueError, TypeError) as exc:
+            report.invalid += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                if isinstance(exc, ValidationError):
+                    error = exc.errors()[0]
+                    message = f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                else:
+                    message = str(exc)
+                report.errors.append((line_num, message))
+
+
+def _staging_table(kind: CatalogKind) -> Table:
+    target = kind.model.__table__
+    return Table(
+        f"staging_{target.name}",
+        MetaData(),
+        *(Column(name, target.c[name].type) for name in kind.columns),
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _copy_field(value: Any) -> str:
+    # COPY's CSV format reads an unquoted empty field as NULL and a quoted
+    # one as an empty string, so strings are always quoted
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _load_staging(conn: Connection, staging: Table, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+    if conn.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(_copy_field(row.get(c)) for c in columns) + "\n")
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        conn.execute(insert(staging), [{c: row.get(c) for c in columns} for row in rows])
+
+
+def _with_default(kind: CatalogKind, column: Column):
+    field = kind.schema.model_fields[column.name]
+    if field.is_required() or field.default is None:
+        return column
+    return func.coalesce(column, field.default)
+
+
+def _merge_chunk(conn: Connection, kind: CatalogKind, staging: Table, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    # A NULL in staging means the row didn't give that column: updates keep
+    # the current value and inserts take the schema default, so a file with
+    # only some columns never blanks out the rest
+    target = kind.model.__table__
+    # Last row wins when a key repeats within the chunk
+    rows = list({tuple(row[c] for c in kind.key): row for row in rows}.values())
+    conn.execute(delete(staging))
+    _load_staging(conn, staging, kind.columns, rows)
+
+    matches = and_(*(target.c[c] == staging.c[c] for c in kind.key))
+    updated = conn.execute(
+        update(target)
+        .where(matches)
+        .values({c: func.coalesce(staging.c[c], target.c[c]) for c in kind.columns if c not in kind.key})
+    ).rowcount
+    inserted = conn.execute(
+        insert(target).from_select(
+            kind.columns,
+            select(*(_with_default(kind, staging.c[c]) for c in kind.columns)).where(~exists().where(matches)),
+        )
+    ).rowcount
+    return inserted, updated
+
+
+def import_catalog(
+    bind: Engine,
+    kind_name: str,
+    stream: io.TextIOBase,
+    format: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportReport:
+    """Validate and upsert every row of ``stream`` into the ``kind_name`` catalog."""
+    kind = KINDS.get(kind_name)
+    if kind is None:
+        raise InvalidImport(f"Unknown catalog {kind_name!r}, expected one of {', '.join(KINDS)}")
+    if format not in FORMATS:
+        raise InvalidImport(f"Unknown format {format!r}, expected one of {', '.join(FORMATS)}")
+
+    report = ImportReport()
+    start = time.perf_counter()
+    staging = _staging_table(kind)
+    valid = _validated(kind, read_rows(stream, format), report)
+    # Temporary tables belong to one connection, so the whole import uses one
+    with bind.connect() as conn:
+        staging.create(conn, checkfirst=True)
+        conn.commit()
+        try:
+            while True:
+                chunk = list(islice(valid, chunk_size))
+                if not chunk:
+                    break
+                inserted, updated = _merge_chunk(conn, kind, staging, chunk)
+                conn.commit()
+                report.inserted += inserted
+                report.updated += updated
+        finally:
+            # The connection goes back to the pool, so don't leave the table behind
+            conn.rollback()
+            staging.drop(conn, checkfirst=True)
+            conn.commit()
+    report.seconds = time.perf_counter() - start
+
+    if report.inserted or report.updated:
+        # Bulk statements skip the per-row hooks create_city/create_activity
+        # call; bumping the generation drops cached reads and has every
+        # worker's indexes rebuild on next use, this one's included
+        catalog_cache.catalog.invalidate(kind.cache_kind)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import cities or activities")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path", help="CSV or JSONL file, - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.db.database import engine
+
+    format = args.format or format_from_filename(args.path)
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8-sig")
+    with stream:
+        report = import_catalog(engine, args.kind, stream, format, args.chunk_size)
+    for line_num, message in report.errors:
+        print(f"line {line_num}: {message}", file=sys.stderr)
+    print(
+        f"{report.rows} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s): "
+        f"{report.inserted} inserted, {report.updated} updated, {report.invalid} invalid"
+    )
+    return 1 if report.invalid else 0
+
+
+def format_from_filename(filename: str) -> str:
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
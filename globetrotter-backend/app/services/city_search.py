@@ -0,0 +1,175 @@
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models.city import City
+from app.services.catalog_cache import CITIES, IndexRefresher, free_gradually
+
+# Match-quality tiers, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+def normalize(text: str) -> str:
+    # Case- and accent-insensitive form used for both indexing and queries
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+def match_tier(name: str, q: str) -> int:
+    if name == q:
+        return EXACT
+    if name.startswith(q):
+        return PREFIX
+    if f" {q}" in name or f"-{q}" in name:
+        return WORD_PREFIX
+    return SUBSTRING
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _word_prefixes(text: str) -> Set[str]:
+    prefixes = set()
+    for word in text.replace("-", " ").split():
+        prefixes.add(word[:1])
+        prefixes.add(word[:2])
+    return prefixes
+
+
+class NgramCityIndex:
+    """In-process trigram index over city names.
+
+    Used when the database has no trigram support (SQLite in development and
+    benchmarks). Queries of three or more characters intersect trigram
+    posting lists and then confirm the substring; shorter queries match word
+    prefixes only, since one- and two-letter substrings match most of the
+    catalog and aren't useful to rank.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cities: Dict[int, Tuple[str, str, int]] = {}
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    @staticmethod
+    def _insert(cities, grams, prefixes, city_id: int, name: str, country: str, popularity: int) -> None:
+        name = normalize(name)
+        cities[city_id] = (name, normalize(country), popularity or 0)
+        for gram in _trigrams(name):
+            grams[gram].add(city_id)
+        for prefix in _word_prefixes(name):
+            prefixes[prefix].add(city_id)
+
+    def add(self, city_id: int, name: str, country: str, popularity: int) -> None:
+        with self._lock:
+            self._insert(self._cities, self._grams, self._prefixes, city_id, name, country, popularity)
+
+    def build(self, rows: Iterable[Tuple[int, str, str, int]]) -> None:
+        # Built off to the side and swapped in, so searches keep being served
+        # from the previous index meanwhile
+        cities, grams, prefixes = {}, defaultdict(set), defaultdict(set)
+        for row in rows:
+            self._insert(cities, grams, prefixes, *row)
+        with self._lock:
+            previous = self._cities, self._grams, self._prefixes
+            self._cities, self._grams, self._prefixes = cities, grams, prefixes
+            self.built = True
+        free_gradually(*previous)
+
+    def build_from_db(self, db: Session) -> None:
+        self.build(db.query(City.id, City.name, City.country, City.popularity).yield_per(10000))
+
+    def _candidates(self, q: str) -> Set[int]:
+        if len(q) < 3:
+            return set(self._prefixes.get(q, ()))
+        postings = sorted((self._grams.get(gram, set()) for gram in _trigrams(q)), key=len)
+        if not postings[0]:
+            return set()
+        return set(postings[0]).intersection(*postings[1:])
+
+    def search(self, q: str, country: str = "", limit: int = 50) -> List[int]:
+        q = normalize(q)
+        country = normalize(country)
+        with self._lock:
+            ranked = []
+            for city_id in self._candidates(q):
+                name, city_country, popularity = self._cities[city_id]
+                if q not in name or (country and country not in city_country):
+                    continue
+                ranked.append((match_tier(name, q), -popularity, name, city_id))
+        return [entry[-1] for entry in heapq.nsmallest(limit, ranked)]
+
+
+city_index = NgramCityIndex()
+# Rebuilt on use once the city catalog's generation moves; see IndexRefresher
+city_index_refresh = IndexRefresher(CITIES, city_index.build_from_db)
+
+
+def build_index(db: Session) -> None:
+    city_index_refresh.rebuild(db)
+
+
+def index_is_current(db: Session) -> bool:
+    """False while searches are served from an index that is being rebuilt (see IndexRefresher)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return True
+    return city_index_refresh.ensure_current(db)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_postgres(db: Session, q: str, country: str, limit: int) -> List[City]:
+    # ILIKE '%q%' is served by the ix_cities_name_trgm GIN index; similarity()
+    # breaks ties between matches of the same tier
+    q_lower = q.lower()
+    name = func.lower(City.name)
+    tier = case(
+        (name == q_lower, EXACT),
+        (name.startswith(q_lower, autoescape=True), PREFIX),
+        (name.contains(f" {q_lower}", autoescape=True), WORD_PREFIX),
+        else_=SUBSTRING,
+    )
+    query = db.query(City).filter(City.name.ilike(f"%{_escape_like(q)}%", escape="\\"))
+    if country:
+        query = query.filter(City.country.ilike(f"%{_escape_like(country)}%", escape="\\"))
+    return (
+        query.order_by(tier, func.similarity(City.name, q).desc(), City.popularity.desc(), City.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_index(db: Session, q: str, country: str, limit: int) -> List[City]:
+    city_index_refresh.ensure_current(db)
+    ids = city_index.search(q, country, limit)
+    if not ids:
+        return []
+    cities = {city.id: city for city in db.query(City).filter(City.id.in_(ids))}
+    return [cities[city_id] for city_id in ids if city_id in cities]
+
+
+def search_cities(db: Session, q: str = "", country: str = "", limit: int = 50) -> List[City]:
+    """Cities matching ``q`` (and ``country``), best match first, then most popular."""
+    if not q.strip():
+        query = db.query(City)
+        if country:
+            query = query.filter(City.country.ilike(f"%{_escape_like(country)}%", escape="\\"))
+        return query.order_by(City.popularity.desc(), City.id).limit(limit).all()
+
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, q, country, limit)
+    return _search_index(db, q, country, limit)
+
+
+def index_city(city: City, generation: int) -> None:
+    """Add a city this worker just created; ``generation`` is what catalog.invalidate() returned."""
+    city_index_refresh.apply_local(
+        generation, lambda: city_index.add(city.id, city.name, city.country, city.popularity)
+    )
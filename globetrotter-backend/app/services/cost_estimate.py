@@ -0,0 +1,103 @@
+from sqlalchemy import select, func, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.services import budget_summary
+
+# trip id -> (version, estimate). Entries are only served for the trip
+# version they were computed at, so an itinerary or budget write made
+# through another worker process still re-computes; invalidate() just frees
+# the entry early in this one. The TTL only covers catalog changes
+# (City.cost_index, Activity.estimated_cost), which aren't tied to a trip.
+_estimates = TTLCache(maxsize=settings.ESTIMATE_CACHE_SIZE, ttl=settings.ESTIMATE_CACHE_TTL_SECONDS)
+
+
+def invalidate(trip_id: int) -> None:
+    _estimates.invalidate(trip_id)
+
+
+# Fractional days between arrival and departure, never negative. There is
+# no portable datetime difference in SQL, so each supported dialect gets
+# its own expression.
+_STOP_NIGHTS = {
+    "sqlite": lambda start, end: func.max(func.julianday(end) - func.julianday(start), 0),
+    "postgresql": lambda start, end: func.greatest(func.extract("epoch", end - start) / 86400.0, 0),
+}
+
+
+def check_dialect(dialect: str) -> None:
+    """Fail at startup, rather than on every estimate request, on a database we can't estimate on."""
+    if dialect not in _STOP_NIGHTS:
+        raise RuntimeError(
+            f"Trip cost estimates are not supported on {dialect}; supported: {', '.join(sorted(_STOP_NIGHTS))}"
+        )
+
+
+def _estimate_statement(dialect: str, trip_id: int):
+    nights = _STOP_NIGHTS[dialect](ItineraryStop.arrival_date, ItineraryStop.departure_date)
+
+    stays = (
+        select(
+            func.count(ItineraryStop.id).label("stops"),
+            func.coalesce(func.sum(nights), 0.0).label("nights"),
+            func.coalesce(func.sum(nights * City.cost_index), 0.0).label("weighted_nights"),
+        )
+        .join(City, City.id == ItineraryStop.city_id)
+        .where(ItineraryStop.trip_id == trip_id)
+        .subquery()
+    )
+    activities = (
+        select(
+            func.count(ItineraryActivity.id).label("scheduled"),
+            func.coalesce(func.sum(Activity.estimated_cost), 0.0).label("cost"),
+        )
+        .join(ItineraryStop, ItineraryStop.id == ItineraryActivity.stop_id)
+        .join(Activity, Activity.id == ItineraryActivity.activity_id)
+        .where(ItineraryStop.trip_id == trip_id)
+        .subquery()
+    )
+    # Both aggregates are single-row, so the cross join yields one row
+    return select(
+        stays.c.stops, stays.c.nights, stays.c.weighted_nights, activities.c.scheduled, activities.c.cost
+    ).select_from(stays).join(activities, true())
+
+
+async def estimate_trip_cost(db: AsyncSession, trip_id: int, version: int) -> dict:
+    """Projected spend for a trip next to its entered budget.
+
+    Stay cost is nights x City.cost_index (100 = ESTIMATE_BASE_NIGHTLY_COST
+    per night) summed over every stop; activity cost is the sum of
+    Activity.estimated_cost over every scheduled activity. Both come from one
+    aggregate query, so the cost doesn't grow with per-stop Python work.
+    Cached per ``version`` of the trip.
+    """
+    cached = _estimates.get(trip_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    dialect = db.get_bind().dialect.name
+    row = (await db.execute(_estimate_statement(dialect, trip_id))).one()
+    breakdown = await budget_summary.trip_breakdown(db, trip_id)
+
+    estimated_stay = row.weighted_nights * settings.ESTIMATE_BASE_NIGHTLY_COST / 100.0
+    estimated_total = estimated_stay + row.cost
+    budget_total = sum(breakdown.values())
+    estimate = {
+        "trip_id": trip_id,
+        "stops": row.stops,
+        "nights": row.nights,
+        "scheduled_activities": row.scheduled,
+        "estimated_stay": estimated_stay,
+        "estimated_activities": row.cost,
+        "estimated_total": estimated_total,
+        "budget_total": budget_total,
+        "budget_stay": breakdown.get("stay", 0.0),
+        "budget_activities": breakdown.get("activities", 0.0),
+        "remaining": budget_total - estimated_total,
+        "over_budget": estimated_total > budget_total,
+    }
+    _estimates.set(trip_id, (version, estimate))
+    return estimate
@@ -0,0 +1,108 @@
+from typing import Iterable, Set
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.schemas.itinerary import ItineraryBatch
+from app.services import stop_order
+
+MAX_BATCH_OPERATIONS = 1000
+
+
+class InvalidBatch(ValueError):
+    pass
+
+
+def operation_count(batch: ItineraryBatch) -> int:
+    return (
+        len(batch.delete_stop_ids)
+        + len(batch.reorder)
+        + len(batch.activities)
+        + sum(1 + len(stop.activities) for stop in batch.stops)
+    )
+
+
+async def _missing(db: AsyncSession, column, ids: Iterable[int], *criteria) -> Set[int]:
+    ids = set(ids)
+    if not ids:
+        return set()
+    found = await db.scalars(select(column).where(column.in_(ids), *criteria))
+    return ids - set(found)
+
+
+async def apply_batch(db: AsyncSession, trip_id: int, batch: ItineraryBatch) -> None:
+    """Apply a batch of itinerary changes to a trip without committing.
+
+    Every referenced stop, city and activity is checked up front with one
+    query per table, then deletes, new stops and new activities are each
+    written with a single executemany statement; moves touch one row each.
+    The caller owns the transaction, so a batch that fails validation
+    leaves nothing behind.
+    """
+    if operation_count(batch) > MAX_BATCH_OPERATIONS:
+        raise InvalidBatch(f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    deleted = set(batch.delete_stop_ids)
+    referenced = deleted | {op.stop_id for op in batch.reorder} | {op.stop_id for op in batch.activities}
+    unknown = await _missing(db, ItineraryStop.id, referenced, ItineraryStop.trip_id == trip_id)
+    if unknown:
+        raise InvalidBatch(f"Unknown stop ids: {sorted(unknown)}")
+    if deleted & ({op.stop_id for op in batch.reorder} | {op.stop_id for op in batch.activities}):
+        raise InvalidBatch("Cannot modify a stop deleted in the same batch")
+
+    unknown = await _missing(db, City.id, (stop.city_id for stop in batch.stops))
+    if unknown:
+        raise InvalidBatch(f"Unknown city ids: {sorted(unknown)}")
+    activity_ids = [op.activity_id for op in batch.activities]
+    activity_ids += [op.activity_id for stop in batch.stops for op in stop.activities]
+    unknown = await _missing(db, Activity.id, activity_ids)
+    if unknown:
+        raise InvalidBatch(f"Unknown activity ids: {sorted(unknown)}")
+
+    if deleted:
+        # Their activities go with them (ON DELETE CASCADE)
+        await db.execute(delete(ItineraryStop).where(ItineraryStop.id.in_(deleted)))
+
+    for op in batch.reorder:
+        # Each move rewrites only the moved stop's key (see stop_order)
+        key = await stop_order.key_at(db, trip_id, op.order_index, exclude_id=op.stop_id)
+        await db.execute(
+            update(ItineraryStop)
+            .where(ItineraryStop.id == op.stop_id)
+            .values(order_key=key)
+            .execution_options(synchronize_session=False)
+        )
+
+    activity_rows = [
+        {"stop_id": op.stop_id, "activity_id": op.activity_id, "scheduled_time": op.scheduled_time, "notes": op.notes}
+        for op in batch.activities
+    ]
+    if batch.stops:
+        keys = await stop_order.append_keys(db, trip_id, len(batch.stops))
+        stops_by_key = dict(zip(keys, batch.stops))
+        # RETURNING order isn't guaranteed for a multi-row insert (and asking
+        # for it makes SQLite fall back to one statement per row), so new
+        # stops are matched back up through their unique order_key
+        inserted = await db.execute(
+            insert(ItineraryStop).returning(ItineraryStop.id, ItineraryStop.order_key),
+            [
+                {
+                    "trip_id": trip_id,
+                    "city_id": stop.city_id,
+                    "arrival_date": stop.arrival_date,
+                    "departure_date": stop.departure_date,
+                    "notes": stop.notes,
+                    "order_key": key,
+                }
+                for key, stop in stops_by_key.items()
+            ],
+        )
+        for stop_id, key in inserted.all():
+            activity_rows.extend(
+                {"stop_id": stop_id, "activity_id": op.activity_id, "scheduled_time": op.scheduled_time, "notes": op.notes}
+                for op in stops_by_key[key].activities
+            )
+
+    if activity_rows:
+        await db.execute(insert(ItineraryActivity), activity_rows)
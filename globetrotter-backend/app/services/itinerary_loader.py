@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.city import City
+from app.models.activity import Activity
+from app.schemas.itinerary import ItineraryStop as ItineraryStopSchema, ItineraryActivity as ItineraryActivitySchema
+from app.schemas.city import City as CitySchema
+from app.schemas.activity import Activity as ActivitySchema
+
+# Loads the whole stop -> city / activities -> activity tree up front so that
+# serializing ItineraryStopSchema never triggers lazy loads. Stops and their
+# city come back in one joined query, activities (with their catalog row) in
+# one selectin query, regardless of how many stops the trip has.
+def itinerary_tree_options():
+    return (
+        joinedload(ItineraryStop.city),
+        selectinload(ItineraryStop.activities).joinedload(ItineraryActivity.activity),
+    )
+
+def trip_stops_statement(trip_id: int):
+    return (
+        select(ItineraryStop)
+        .options(*itinerary_tree_options())
+        .where(ItineraryStop.trip_id == trip_id)
+        .order_by(ItineraryStop.order_key)
+    )
+
+def stop_statement(stop_id: int):
+    return (
+        select(ItineraryStop)
+        .options(*itinerary_tree_options())
+        .where(ItineraryStop.id == stop_id)
+        # The stop may already be in the session (e.g. just inserted) with
+        # its relationships unloaded; make sure they get populated
+        .execution_options(populate_existing=True)
+    )
+
+def load_trip_stops(db: Session, trip_id: int) -> List[ItineraryStop]:
+    return db.scalars(trip_stops_statement(trip_id)).all()
+
+def load_stop(db: Session, stop_id: int) -> Optional[ItineraryStop]:
+    return db.scalars(stop_statement(stop_id)).first()
+
+async def load_trip_stops_async(db: AsyncSession, trip_id: int) -> List[ItineraryStop]:
+    return (await db.scalars(trip_stops_statement(trip_id))).all()
+
+async def load_stop_async(db: AsyncSession, stop_id: int) -> Optional[ItineraryStop]:
+    return (await db.scalars(stop_statement(stop_id))).first()
+
+# The same tree for read-only responses, from two Core selects straight
+# into plain dicts: no ORM identity map or relationship bookkeeping, and
+# only the columns the response schemas show.
+def _columns(model, schema, prefix=""):
+    table = model.__table__
+    return [table.c[name].label(prefix + name) for name in schema.model_fields if name in table.c]
+
+_stop_columns = _columns(ItineraryStop, ItineraryStopSchema)
+_city_columns = _columns(City, CitySchema, "city.")
+_activity_columns = _columns(ItineraryActivity, ItineraryActivitySchema)
+_catalog_columns = _columns(Activity, ActivitySchema, "activity.")
+
+def trip_stop_rows_statement(trip_id: int):
+    return (
+        select(*_stop_columns, *_city_columns)
+        .outerjoin(City, ItineraryStop.city_id == City.id)
+        .where(ItineraryStop.trip_id == trip_id)
+        .order_by(ItineraryStop.order_key)
+    )
+
+def trip_activity_rows_statement(trip_id: int):
+    return (
+        select(*_activity_columns, *_catalog_columns)
+        .join(ItineraryStop, ItineraryActivity.stop_id == ItineraryStop.id)
+        .outerjoin(Activity, ItineraryActivity.activity_id == Activity.id)
+        .where(ItineraryStop.trip_id == trip_id)
+        .order_by(ItineraryActivity.stop_id, ItineraryActivity.id)
+    )
+
+def _nest(row, columns, prefix) -> Optional[Dict[str, Any]]:
+    # An outer join with no match leaves every prefixed column NULL
+    nested = {column.name[len(prefix):]: row[column.name] for column in columns}
+    return nested if nested["id"] is not None else None
+
+async def load_trip_stop_rows_async(db: AsyncSession, trip_id: int) -> List[Dict[str, Any]]:
+    """The trip's stops as ItineraryStopSchema-shaped dicts, in itinerary order."""
+    stops = []
+    by_id = {}
+    for row in (await db.execute(trip_stop_rows_statement(trip_id))).mappings():
+        stop = {column.name: row[column.name] for column in _stop_columns}
+        stop["city"] = _nest(row, _city_columns, "city.")
+        stop["activities"] = []
+        stops.append(stop)
+        by_id[stop["id"]] = stop
+    if stops:
+        for row in (await db.execute(trip_activity_rows_statement(trip_id))).mappings():
+            activity = {column.name: row[column.name] for column in _activity_columns}
+            activity["activity"] = _nest(row, _catalog_columns, "activity.")
+            by_id[activity["stop_id"]]["activities"].append(activity)
+    return stops
@@ -0,0 +1,49 @@
+from typing import Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.trip import Trip
+from app.schemas.trip import SharedTrip
+from app.services import budget_summary
+from app.services.itinerary_loader import load_trip_stops_async
+
+# trip id -> (validators, serialized body), where validators are the trip
+# version and the catalog generations. Entries are only served for the
+# validators they were rendered at, so a write made through another worker
+# process (which can't invalidate this cache) is still picked up: it bumps
+# the version, and the next request re-renders. Catalog imports bump a
+# generation the same way.
+_responses = TTLCache(maxsize=settings.SHARED_TRIP_CACHE_SIZE, ttl=settings.SHARED_TRIP_CACHE_TTL_SECONDS)
+
+
+def invalidate(trip_id: int) -> None:
+    _responses.invalidate(trip_id)
+
+
+async def resolve(db: AsyncSession, public_url: str) -> Optional[Tuple[int, int]]:
+    """(trip id, version) of the public trip shared as ``public_url``."""
+    row = (
+        await db.execute(
+            select(Trip.id, Trip.version).where(Trip.public_url == public_url, Trip.is_public == 1)
+        )
+    ).first()
+    return tuple(row) if row else None
+
+
+async def render(db: AsyncSession, trip_id: int, validators: Tuple[int, ...]) -> bytes:
+    """The trip, its itinerary and budget summary as JSON, cached per ``validators``."""
+    cached = _responses.get(trip_id)
+    if cached is not None and cached[0] == validators:
+        return cached[1]
+
+    trip = await db.get(Trip, trip_id)
+    stops = await load_trip_stops_async(db, trip_id)
+    breakdown = await budget_summary.trip_breakdown(db, trip_id)
+    body = SharedTrip.model_validate({
+        "trip": trip,
+        "stops": stops,
+        "budget": budget_summary.summary_from_breakdown(breakdown),
+    }).model_dump_json().encode()
+    _responses.set(trip_id, (validators, body))
+    return body
@@ -0,0 +1,134 @@
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.itinerary_stop import ItineraryStop
+
+# Stops are ordered by a sparse integer key, unique per trip. Appending or
+# moving a stop writes only that stop: the new key is placed after the last
+# one or halfway between its new neighbours. When two neighbours end up with
+# no key between them the trip's keys are spread out again (rebalance),
+# which with this gap happens at most once every ~16 inserts into the same
+# spot.
+KEY_GAP = 1 << 16
+MAX_ATTEMPTS = 5
+# The unique index behind (trip_id, order_key)
+ORDER_KEY_INDEX = "uq_itinerary_stops_trip_order_key"
+# Keys are parked below this during a rebalance so the unique index never
+# sees two rows with the same key mid-update
+_PARK_OFFSET = 1 << 40
+
+T = TypeVar("T")
+
+
+def key_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """A key strictly between two neighbouring keys, or None if there is no room."""
+    if before is None and after is None:
+        return KEY_GAP
+    if before is None:
+        return after - KEY_GAP
+    if after is None:
+        return before + KEY_GAP
+    if after - before > 1:
+        return (before + after) // 2
+    return None
+
+
+def _siblings(trip_id: int, exclude_id: Optional[int]):
+    criteria = [ItineraryStop.trip_id == trip_id]
+    if exclude_id is not None:
+        criteria.append(ItineraryStop.id != exclude_id)
+    return criteria
+
+
+async def _neighbours(
+    db: AsyncSession, trip_id: int, position: Optional[int], exclude_id: Optional[int]
+) -> Tuple[Optional[int], Optional[int]]:
+    criteria = _siblings(trip_id, exclude_id)
+    if position is None:
+        return await db.scalar(select(func.max(ItineraryStop.order_key)).where(*criteria)), None
+    if position <= 0:
+        return None, await db.scalar(select(func.min(ItineraryStop.order_key)).where(*criteria))
+    keys = (
+        await db.scalars(
+            select(ItineraryStop.order_key)
+            .where(*criteria)
+            .order_by(ItineraryStop.order_key)
+            .offset(position - 1)
+            .limit(2)
+        )
+    ).all()
+    if not keys:
+        # Past the end of the list: append
+        return await db.scalar(select(func.max(ItineraryStop.order_key)).where(*criteria)), None
+    return keys[0], keys[1] if len(keys) > 1 else None
+
+
+async def key_at(
+    db: AsyncSession, trip_id: int, position: Optional[int] = None, exclude_id: Optional[int] = None
+) -> int:
+    """The order key for a stop placed at ``position`` (0-based; None appends).
+
+    ``exclude_id`` is the stop being moved, which doesn't count as a neighbour.
+    """
+    key = key_between(*await _neighbours(db, trip_id, position, exclude_id))
+    if key is None:
+        await rebalance(db, trip_id)
+        key = key_between(*await _neighbours(db, trip_id, position, exclude_id))
+    return key
+
+
+async def append_keys(db: AsyncSession, trip_id: int, count: int) -> List[int]:
+    first = key_between(*await _neighbours(db, trip_id, None, None))
+    return [first + i * KEY_GAP for i in range(count)]
+
+
+async def rebalance(db: AsyncSession, trip_id: int) -> None:
+    """Respace every key of the trip to KEY_GAP apart, keeping the order."""
+    ids = (
+        await db.scalars(
+            select(ItineraryStop.id).where(ItineraryStop.trip_id == trip_id).order_by(ItineraryStop.order_key)
+        )
+    ).all()
+    await db.execute(
+        update(ItineraryStop)
+        .where(ItineraryStop.trip_id == trip_id)
+        .values(order_key=-ItineraryStop.id - _PARK_OFFSET)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(ItineraryStop),
+        [{"id": stop_id, "order_key": (i + 1) * KEY_GAP} for i, stop_id in enumerate(ids)],
+    )
+
+
+def is_order_key_clash(exc: IntegrityError) -> bool:
+    """True if ``exc`` is a duplicate (trip_id, order_key), not some other constraint.
+
+    PostgreSQL names the index in the message; SQLite names the columns.
+    """
+    message = str(exc.orig)
+    return ORDER_KEY_INDEX in message or (
+        "UNIQUE constraint failed" in message
+        and "itinerary_stops.trip_id, itinerary_stops.order_key" in message
+    )
+
+
+async def commit_with_retry(db: AsyncSession, write: Callable[[], Awaitable[T]]) -> T:
+    """Run ``write`` and commit, retrying if a concurrent writer took the same key.
+
+    Writers lock the trip row before picking a key, so this is a safety net
+    rather than the normal path. ``write`` runs again from scratch after a
+    rollback and must not rely on previously loaded objects. Any other
+    integrity error (a missing city, say) is raised at once: retrying
+    can't fix it.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            result = await write()
+            await db.commit()
+            return result
+        except IntegrityError as exc:
+            await db.rollback()
+            if attempt == MAX_ATTEMPTS - 1 or not is_order_key_clash(exc):
+                raise
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from sqlalchemy import select
+from app.db.database import AsyncSessionLocal
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget
+
+# Rows fetched per round trip, and so the most that is held in memory at once
+YIELD_PER = 2000
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _record_statements(user_id: int) -> List[Tuple[str, Any]]:
+    """(record type, statement) for each part of the user's trip graph.
+
+    Each part is a flat Core select joined back to the user's trips, so
+    rows stream straight off the cursor without building ORM objects, and
+    children reference their parents by id.
+    """
+    owned = Trip.user_id == user_id
+    return [
+        ("trip", select(
+            Trip.id, Trip.name, Trip.description, Trip.start_date, Trip.end_date, Trip.cover_photo,
+            Trip.is_public, Trip.public_url, Trip.created_at, Trip.version,
+        ).where(owned).order_by(Trip.id)),
+        ("stop", select(
+            ItineraryStop.id, ItineraryStop.trip_id, ItineraryStop.city_id, City.name.label("city_name"),
+            City.country, ItineraryStop.arrival_date, ItineraryStop.departure_date, ItineraryStop.order_key,
+            ItineraryStop.notes,
+        ).join(Trip, ItineraryStop.trip_id == Trip.id).join(City, ItineraryStop.city_id == City.id)
+         .where(owned).order_by(ItineraryStop.trip_id, ItineraryStop.order_key)),
+        ("activity", select(
+            ItineraryActivity.id, ItineraryStop.trip_id, ItineraryActivity.stop_id, ItineraryActivity.activity_id,
+            Activity.name.label("activity_name"), Activity.category, ItineraryActivity.scheduled_time,
+            ItineraryActivity.notes,
+        ).join(ItineraryStop, ItineraryActivity.stop_id == ItineraryStop.id)
+         .join(Trip, ItineraryStop.trip_id == Trip.id)
+         .join(Activity, ItineraryActivity.activity_id == Activity.id)
+         .where(owned).order_by(ItineraryActivity.stop_id, ItineraryActivity.id)),
+        ("budget", select(
+            Budget.id, Budget.trip_id, Budget.category, Budget.amount, Budget.description,
+        ).join(Trip, Budget.trip_id == Trip.id).where(owned).order_by(Budget.trip_id, Budget.id)),
+    ]
+
+
+def csv_columns() -> List[str]:
+    # One sparse table for every record type: "record" says which columns apply
+    columns = ["record"]
+    for _, statement in _record_statements(0):
+        columns += [name for name in statement.selected_columns.keys() if name not in columns]
+    return columns
+
+
+async def _partitions(user_id: int) -> AsyncIterator[Tuple[str, List[str], list]]:
+    # Own session: the request's dependencies are torn down before the body
+    # is streamed. stream() runs each query on a server-side cursor
+    async with AsyncSessionLocal() as db:
+        for record, statement in _record_statements(user_id):
+            result = await db.stream(statement.execution_options(yield_per=YIELD_PER))
+            columns = list(result.keys())
+            async for rows in result.partitions():
+                yield record, columns, rows
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def ndjson(user_id: int) -> AsyncIterator[bytes]:
+    """One JSON object per line, each with a "record" type: trips, then stops, activities and budgets."""
+    async for record, columns, rows in _partitions(user_id):
+        lines = []
+        for row in rows:
+            item: Dict[str, Any] = {"record": record}
+            item.update(zip(columns, row))
+            lines.append(json.dumps(item, default=_json_default))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def csv_rows(user_id: int) -> AsyncIterator[bytes]:
+    header = csv_columns()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, header)
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    async for record, columns, rows in _partitions(user_id):
+        for row in rows:
+            item: Dict[str, Any] = {"record": record}
+            item.update((column, value.isoformat() if isinstance(value, datetime) else value)
+                        for column, value in zip(columns, row))
+            writer.writerow(item)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export(user_id: int, format: str) -> AsyncIterator[bytes]:
+    return ndjson(user_id) if format == "ndjson" else csv_rows(user_id)
@@ -0,0 +1,114 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.trip import Trip
+
+MAX_PAGE_SIZE = 100
+SORTS = ("start_date", "-start_date", "created_at", "-created_at")
+FIELDS = (
+    "id", "user_id", "name", "description", "start_date", "end_date",
+    "cover_photo", "is_public", "public_url", "created_at",
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+@dataclass
+class TripFilters:
+    # "upcoming": not over yet (ends today or later), "past": already over
+    when: Optional[str] = None
+    starts_after: Optional[datetime] = None
+    starts_before: Optional[datetime] = None
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Columns to select for ``fields=name,start_date,...``; ``id`` is always included."""
+    if not fields:
+        return FIELDS
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(FIELDS))
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(field for field in FIELDS if field == "id" or field in requested)
+
+
+def encode_cursor(sort: str, value: datetime, trip_id: int) -> str:
+    raw = json.dumps([sort, value.isoformat(), trip_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime, int]:
+    try:
+        sort, value, trip_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort not in SORTS:
+            raise ValueError(sort)
+        return sort, datetime.fromisoformat(value), int(trip_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _apply_filters(statement, filters: TripFilters, now: datetime):
+    if filters.when == "upcoming":
+        statement = statement.where(Trip.end_date >= now)
+    elif filters.when == "past":
+        statement = statement.where(Trip.end_date < now)
+    if filters.starts_after is not None:
+        statement = statement.where(Trip.start_date >= filters.starts_after)
+    if filters.starts_before is not None:
+        statement = statement.where(Trip.start_date < filters.starts_before)
+    return statement
+
+
+async def list_trips(
+    db: AsyncSession,
+    user_id: int,
+    filters: TripFilters,
+    fields: Sequence[str] = FIELDS,
+    sort: str = "start_date",
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of a user's trips as plain dicts holding only ``fields``.
+
+    Ordered by ``sort`` (a column, "-" for descending) then id, and paged
+    with a keyset cursor like activity search, served by the
+    (user_id, start_date, id) and (user_id, created_at, id) indexes. Only
+    the requested columns are selected, so no ORM objects are built.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        sort, after_value, after_id = decode_cursor(cursor)
+    descending = sort.startswith("-")
+    sort_column = getattr(Trip, sort.lstrip("-"))
+
+    # The sort column is selected even when not requested: the cursor needs it
+    columns = [getattr(Trip, field) for field in fields]
+    if sort_column.key not in fields:
+        columns.append(sort_column)
+    statement = _apply_filters(select(*columns).where(Trip.user_id == user_id), filters, datetime.utcnow())
+
+    key = tuple_(sort_column, Trip.id)
+    if cursor:
+        boundary = tuple_(after_value, after_id)
+        statement = statement.where(key < boundary if descending else key > boundary)
+    if descending:
+        statement = statement.order_by(sort_column.desc(), Trip.id.desc())
+    else:
+        statement = statement.order_by(sort_column, Trip.id)
+
+    # Fetch one extra row to know whether there is a next page
+    rows = (await db.execute(statement.limit(limit + 1))).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(sort, last[sort_column.key], last["id"])
+    return [{field: row[field] for field in fields} for row in rows[:limit]], next_cursor
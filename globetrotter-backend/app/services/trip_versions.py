@@ -0,0 +1,64 @@
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import parse_if_match
+from app.models.trip import Trip
+from app.services import cost_estimate, shared_trip
+
+# Every write to a trip, its itinerary or its budget goes through bump() in
+# the same transaction and calls changed() after commit. The version is (the
+# leading part of) the ETag of everything read from the trip, so GETs can
+# answer If-None-Match with a 304 and writes can honour If-Match.
+
+
+class PreconditionFailed(Exception):
+    """The trip has changed since the version named in If-Match (HTTP 412)."""
+
+
+def lock_and_bump(trip_id: int, user_id: int):
+    """UPDATE that bumps the trip's version if ``user_id`` owns it, returning the new version.
+
+    Writing the trip row first also takes its row lock (or SQLite's write
+    lock), so concurrent writers on the same trip queue up here; see
+    stop_order for why that matters. SELECT ... FOR UPDATE would be a no-op
+    on SQLite.
+    """
+    return (
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.user_id == user_id)
+        .values(version=Trip.version + 1)
+        .returning(Trip.version)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def current(db: AsyncSession, trip_id: int, user_id: int) -> Optional[int]:
+    """The trip's version, or None if ``user_id`` doesn't own it."""
+    return await db.scalar(select(Trip.version).where(Trip.id == trip_id, Trip.user_id == user_id))
+
+
+async def bump(db: AsyncSession, trip_id: int, user_id: int, if_match: Optional[str] = None) -> Optional[int]:
+    """Lock and bump the trip (see lock_and_bump); None if ``user_id`` doesn't own it.
+
+    With an If-Match header the version must also match one of its ETags,
+    checked in the same UPDATE so two writers holding the same ETag can't
+    both succeed. Raises PreconditionFailed if it doesn't. ETags that also
+    carry catalog generations (GET .../stops) match on their leading trip
+    version.
+    """
+    statement = lock_and_bump(trip_id, user_id)
+    tags = parse_if_match(if_match)
+    if tags is not None:
+        leading = (tag.strip('"').split("-", 1)[0] for tag in tags)
+        versions = [int(version) for version in leading if version.isdigit()]
+        statement = statement.where(Trip.version.in_(versions))
+    version = await db.scalar(statement)
+    if version is None and tags is not None and await current(db, trip_id, user_id) is not None:
+        raise PreconditionFailed()
+    return version
+
+
+def changed(trip_id: int) -> None:
+    """Drop this process's cached views of the trip after a committed write."""
+    cost_estimate.invalidate(trip_id)
+    shared_trip.invalidate(trip_id)
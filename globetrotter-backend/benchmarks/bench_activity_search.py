@@ -0,0 +1,93 @@
+"""Activity search page cost vs page depth on a 200k-activity catalog.
+
+Compares OFFSET pagination with the keyset cursor used by
+``GET /api/activities/search``, plus the category facet query. Then walks
+``GET /api/activities/`` page by page through its X-Next-Cursor header
+and exits non-zero unless that visits every match once, in order.
+"""
+import random
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, reset_schema, measure, print_row
+from app.main import app
+from app.models.activity import Activity
+from app.services.activity_search import ActivityFilters, search_activities, category_facets
+
+ACTIVITIES = 200_000
+PAGE = 20
+DEPTHS = [1, 100, 1000, 5000]
+CATEGORIES = ["sightseeing", "food", "adventure", "culture", "nightlife", "shopping", "nature"]
+
+
+def offset_page(db, filters, page):
+    query = db.query(Activity)
+    if filters.category:
+        query = query.filter(Activity.category == filters.category)
+    return query.order_by(Activity.estimated_cost, Activity.id).offset((page - 1) * PAGE).limit(PAGE).all()
+
+
+def check_list_cursor(db):
+    # Few enough matches to walk to the last page
+    expected = [
+        activity.id for activity in db.query(Activity)
+        .filter(Activity.category == "food", Activity.estimated_cost <= 10)
+        .order_by(Activity.estimated_cost, Activity.id)
+    ]
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        params = {"category": "food", "max_cost": 10, "limit": PAGE, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/activities/", params=params)
+        seen += [activity["id"] for activity in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor or len(seen) > len(expected):
+            break
+    ok = seen == expected and len(expected) > PAGE
+    print(f"GET /api/activities/ pages through X-Next-Cursor ({len(expected)} matches): {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    rng = random.Random(3)
+    rows = [
+        {
+            "name": f"Activity {i}",
+            "category": rng.choice(CATEGORIES),
+            "estimated_cost": round(rng.uniform(0, 500), 2),
+            "duration_hours": rng.choice([0.5, 1, 2, 3, 4, 6, 8]),
+        }
+        for i in range(ACTIVITIES)
+    ]
+    for start in range(0, len(rows), 20_000):
+        db.execute(insert(Activity), rows[start:start + 20_000])
+    db.commit()
+
+    for filters in (ActivityFilters(), ActivityFilters(category="food")):
+        print(f"filters: category={filters.category or '*'}")
+        # Walk to each depth once to get the keyset cursor for that page
+        cursors, cursor = {1: None}, None
+        for page in range(1, max(DEPTHS)):
+            _, cursor = search_activities(db, filters, limit=PAGE, cursor=cursor)
+            cursors[page + 1] = cursor
+        for page in DEPTHS:
+            print_row(f"  page {page:<5} OFFSET (before)", measure(lambda: offset_page(db, filters, page), iterations=20))
+            print_row(
+                f"  page {page:<5} keyset (after)",
+                measure(lambda: search_activities(db, filters, limit=PAGE, cursor=cursors[page]), iterations=20),
+            )
+        print_row("  category facets", measure(lambda: category_facets(db, filters), iterations=20))
+    ok = check_list_cursor(db)
+    db.close()
+    if not ok:
+        print("FAIL: activity list pagination")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
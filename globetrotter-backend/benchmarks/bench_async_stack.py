@@ -0,0 +1,114 @@
+"""Requests/sec and p99 for the sync vs async database stacks.
+
+The async routes are the real ``/api/trips/`` and ``/api/itinerary/.../stops``
+endpoints. The sync side is a reference router mounted only for this run,
+implementing the same queries the way they were written before the port
+(``def`` endpoints on ``get_db``, run in Starlette's threadpool).
+
+Point ``DATABASE_URL`` at a local Postgres to compare asyncpg with psycopg2;
+by default it runs on SQLite (aiosqlite vs pysqlite). Errors are counted
+rather than raised: once concurrency exceeds the sync connection pool, sync
+requests can hold a connection while waiting for a threadpool slot and
+time out on ``QueuePool limit``.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, summarize, print_row
+from app.main import app
+from app.db.database import get_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.itinerary_stop import ItineraryStop
+from app.schemas.trip import Trip as TripSchema
+from app.schemas.itinerary import ItineraryStop as ItineraryStopSchema
+from app.services.itinerary_loader import load_trip_stops
+
+CONCURRENCY = [1, 16, 64]
+REQUESTS = 1000
+
+sync_router = APIRouter()
+
+
+@sync_router.get("/trips", response_model=List[TripSchema])
+def sync_get_my_trips(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return db.query(Trip).filter(Trip.user_id == current_user.id).all()
+
+
+@sync_router.get("/itinerary/{trip_id}/stops", response_model=List[ItineraryStopSchema])
+def sync_get_trip_stops(trip_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+    return load_trip_stops(db, trip_id)
+
+
+app.include_router(sync_router, prefix="/bench/sync")
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    start = datetime(2026, 1, 1)
+    city = City(name="Lisbon", country="Portugal")
+    db.add(city)
+    db.flush()
+    trip_id = None
+    for i in range(20):
+        trip = Trip(user_id=user.id, name=f"Trip {i}", start_date=start, end_date=start + timedelta(days=7))
+        db.add(trip)
+        db.flush()
+        trip_id = trip.id
+        for j in range(10):
+            db.add(ItineraryStop(
+                trip_id=trip.id, city_id=city.id, order_key=j,
+                arrival_date=start + timedelta(days=j), departure_date=start + timedelta(days=j + 1),
+            ))
+    db.commit()
+    headers = auth_headers(user)
+    db.close()
+    return headers, trip_id
+
+
+async def run(client, url, headers, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    samples, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    return (REQUESTS - errors) / (time.perf_counter() - start), errors, summarize(samples)
+
+
+async def main():
+    headers, trip_id = seed()
+    routes = [
+        ("get_my_trips", "/bench/sync/trips", "/api/trips/"),
+        ("get_trip_stops", f"/bench/sync/itinerary/{trip_id}/stops", f"/api/itinerary/{trip_id}/stops"),
+    ]
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, sync_url, async_url in routes:
+            print(name)
+            for concurrency in CONCURRENCY:
+                for stack, url in (("sync", sync_url), ("async", async_url)):
+                    rps, errors, stats = await run(client, url, headers, concurrency)
+                    print_row(f"  c={concurrency:<4} {stack:<5} {rps:7.1f} ok/s err={errors:<4}", stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Cost of authenticating a request.
+
+Compares JWT verification on the cold path (python-jose and, if installed,
+PyJWT) with the verified-claims cache, then the end-to-end overhead of a
+protected route with the token and principal caches cold vs warm.
+"""
+from benchmarks.common import (
+    SessionLocal, reset_schema, create_user, auth_headers, measure, print_row,
+)
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import security
+from app.core.config import settings
+from app.core.deps import principal_cache
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    db.close()
+    headers = auth_headers(user)
+    token = headers["Authorization"].split()[1]
+
+    print("JWT decode")
+    settings.JWT_BACKEND = "jose"
+    print_row("  cold, python-jose", measure(lambda: security._verify_token(token), iterations=2000))
+    if security.pyjwt is not None:
+        settings.JWT_BACKEND = "pyjwt"
+        print_row("  cold, PyJWT", measure(lambda: security._verify_token(token), iterations=2000))
+        settings.JWT_BACKEND = "jose"
+    else:
+        print("  cold, PyJWT                              skipped (PyJWT not installed)")
+    security._token_cache.clear()
+    print_row("  cached", measure(lambda: security.decode_access_token(token), iterations=2000))
+
+    client = TestClient(app)
+
+    def cold_request():
+        security._token_cache.clear()
+        principal_cache.clear()
+        client.get("/api/auth/me", headers=headers)
+
+    def warm_request():
+        client.get("/api/auth/me", headers=headers)
+
+    def anonymous_request():
+        client.get("/")
+
+    print("GET /api/auth/me")
+    baseline = measure(anonymous_request, iterations=500)
+    cold = measure(cold_request, iterations=500)
+    warm = measure(warm_request, iterations=500)
+    print_row("  unauthenticated GET / (floor)", baseline)
+    print_row("  caches cold (before)", cold)
+    print_row("  caches warm (after)", warm)
+    print(
+        f"  auth overhead over floor: before {cold['p50_ms'] - baseline['p50_ms']:.3f}ms, "
+        f"after {warm['p50_ms'] - baseline['p50_ms']:.3f}ms (p50)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Autocomplete latency over 20k cities and 20k activities.
+
+Measures the prefix-index lookup itself (the budget is < 1ms p99) and the
+full ``GET /api/cities/autocomplete`` round trip. Then checks that the
+indexes follow catalog changes made by other worker processes, without
+the request that notices the change waiting for the rebuild, and that
+the app starts against a database that hasn't been migrated yet. Exits
+non-zero if the index lookup p99 goes over budget or a check fails.
+"""
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+from fastapi.testclient import TestClient
+
+from benchmarks.common import (
+    SessionLocal, engine, reset_schema, summarize, measure, print_row, settle_indexes,
+)
+from benchmarks.bench_city_search import city_rows
+from app.main import app
+from app.models.city import City
+from app.models.activity import Activity
+from app.db.base import Base
+from app.services import autocomplete, catalog_cache
+
+ENTRIES = 20_000
+P99_BUDGET_MS = 1.0
+# The request that finds the index stale only starts the rebuild
+STALE_REQUEST_BUDGET_MS = 50.0
+CATEGORIES = ["sightseeing", "food", "adventure", "culture", "nightlife"]
+
+
+def prefixes(names, n, seed=11):
+    rng = random.Random(seed)
+    for _ in range(n):
+        word = rng.choice(rng.choice(names).split())
+        yield word[:rng.randint(1, min(6, len(word)))]
+
+
+def suggested(client, kind, q):
+    return [s["name"] for s in client.get(f"/api/{kind}/autocomplete", params={"q": q}).json()]
+
+
+def check_other_workers(client):
+    # Another worker's create reaches this one only as a bumped catalog
+    # generation (through the shared backend); the row itself is never
+    # added to this worker's index
+    searched = lambda: [c["name"] for c in client.get("/api/cities/", params={"q": "zanzibar"}).json()]
+    ok = searched() == []
+    db = SessionLocal()
+    db.execute(insert(City), [{"name": "Zanzibar Town", "country": "Tanzania", "popularity": 1}])
+    db.execute(insert(Activity), [{"name": "Zanzibar spice tour", "category": "food"}])
+    db.commit()
+    db.close()
+    catalog_cache.catalog.invalidate(catalog_cache.CITIES)
+    catalog_cache.catalog.invalidate(catalog_cache.ACTIVITIES)
+    # The requests that notice are answered from the old indexes while the
+    # new ones build in the background
+    start = time.perf_counter()
+    ok &= suggested(client, "cities", "zanzibar") == []
+    stale_ms = (time.perf_counter() - start) * 1000
+    ok &= suggested(client, "activities", "zanzibar") == [] and stale_ms < STALE_REQUEST_BUDGET_MS
+    print(f"request that starts a rebuild: {stale_ms:.1f}ms")
+    # Served from the old city index too, and so not cached
+    ok &= searched() == []
+    settle_indexes()
+    ok &= searched() == ["Zanzibar Town"]
+    ok &= suggested(client, "cities", "zanzibar") == ["Zanzibar Town"]
+    ok &= suggested(client, "activities", "zanzibar") == ["Zanzibar spice tour"]
+
+    # This worker's own create goes into its indexes in place, no rebuild
+    rebuilds = autocomplete.city_refresh.rebuilds
+    client.post("/api/cities/", json={"name": "Zanzibar City", "country": "Tanzania"})
+    ok &= "Zanzibar City" in suggested(client, "cities", "zanzibar")
+    ok &= autocomplete.city_refresh.rebuilds == rebuilds
+    print(f"indexes follow other workers' creates: {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def check_unmigrated_startup():
+    Base.metadata.drop_all(bind=engine)
+    try:
+        with TestClient(app):
+            pass
+        ok = True
+    except Exception as exc:
+        print(f"startup failed: {exc!r}")
+        ok = False
+    reset_schema()
+    print(f"app starts without a migrated schema: {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    cities = list(city_rows(ENTRIES))
+    db.execute(insert(City), cities)
+    db.execute(insert(Activity), [
+        {"name": f"{c['name']} walking tour", "category": CATEGORIES[i % len(CATEGORIES)]}
+        for i, c in enumerate(cities)
+    ])
+    db.commit()
+
+    start = time.perf_counter()
+    autocomplete.build_indexes(db)
+    print(f"indexes built in {time.perf_counter() - start:.2f}s "
+          f"({len(autocomplete.city_autocomplete)} cities, {len(autocomplete.activity_autocomplete)} activities)")
+    db.close()
+
+    names = [c["name"] for c in cities]
+    queries = list(prefixes(names, 5000))
+    over_budget = False
+    for label, index in (("cities", autocomplete.city_autocomplete), ("activities", autocomplete.activity_autocomplete)):
+        samples = []
+        for q in queries:
+            t0 = time.perf_counter()
+            index.search(q, 10)
+            samples.append(time.perf_counter() - t0)
+        stats = summarize(samples)
+        print_row(f"index lookup, {label}", stats)
+        over_budget |= stats["p99_ms"] > P99_BUDGET_MS
+
+    client = TestClient(app)
+    sample = iter(queries * 2)
+    print_row(
+        "GET /api/cities/autocomplete",
+        measure(lambda: client.get("/api/cities/autocomplete", params={"q": next(sample)}), iterations=1000),
+    )
+
+    ok = check_other_workers(client) and check_unmigrated_startup()
+    if over_budget:
+        print(f"FAIL: index lookup p99 above {P99_BUDGET_MS}ms")
+        return 1
+    if not ok:
+        print("FAIL: autocomplete index refresh")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Budget summary cost for trips with thousands of budget lines.
+
+Three generations of get_budget_summary: loading every Budget row and
+summing in Python (six passes), a GROUP BY over the raw rows, and the
+current read of the maintained trip_budget_rollups table, which should be
+flat regardless of line count. Also times the cross-trip summary for a
+user with many trips.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, summarize, print_row
+from app.db.database import AsyncSessionLocal
+from app.models.trip import Trip
+from app.models.budget import Budget
+from app.services import budget_summary, budget_rollups
+
+LINES = [100, 1_000, 10_000, 50_000]
+CATEGORIES = ["transport", "stay", "activities", "meals", "insurance", "visa", "souvenirs"]
+
+
+async def python_summary(db, trip_id):
+    budgets = (await db.scalars(select(Budget).where(Budget.trip_id == trip_id))).all()
+    return {
+        "total_budget": sum(b.amount for b in budgets),
+        "transport": sum(b.amount for b in budgets if b.category == "transport"),
+        "stay": sum(b.amount for b in budgets if b.category == "stay"),
+        "activities": sum(b.amount for b in budgets if b.category == "activities"),
+        "meals": sum(b.amount for b in budgets if b.category == "meals"),
+        "other": sum(b.amount for b in budgets if b.category not in ["transport", "stay", "activities", "meals"]),
+    }
+
+
+async def group_by_summary(db, trip_id):
+    rows = await db.execute(
+        select(Budget.category, func.sum(Budget.amount)).where(Budget.trip_id == trip_id).group_by(Budget.category)
+    )
+    return budget_summary.summary_from_breakdown(dict(rows.all()))
+
+
+async def sql_summary(db, trip_id):
+    return budget_summary.summary_from_breakdown(await budget_summary.trip_breakdown(db, trip_id))
+
+
+async def timed(fn, *args, iterations=20):
+    samples = []
+    for _ in range(iterations):
+        # Fresh session each time so the identity map doesn't hide load cost
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db, *args)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    rng = random.Random(5)
+    trips = {}
+    for lines in LINES:
+        trip = Trip(user_id=user.id, name=f"{lines} lines", start_date=datetime(2026, 1, 1), end_date=datetime(2026, 1, 9))
+        db.add(trip)
+        db.flush()
+        trips[lines] = trip.id
+        db.execute(insert(Budget), [
+            {"trip_id": trip.id, "category": rng.choice(CATEGORIES), "amount": round(rng.uniform(1, 300), 2)}
+            for _ in range(lines)
+        ])
+    for i in range(200):
+        trip = Trip(user_id=user.id, name=f"small {i}", start_date=datetime(2026, 1, 1), end_date=datetime(2026, 1, 2))
+        db.add(trip)
+        db.flush()
+        db.execute(insert(Budget), [
+            {"trip_id": trip.id, "category": rng.choice(CATEGORIES), "amount": 10.0} for _ in range(20)
+        ])
+    db.commit()
+    # Bulk Core inserts bypass the ORM flush hook, so build the rollups here
+    budget_rollups.rebuild(db)
+    assert not budget_rollups.find_mismatches(db)
+    user_id = user.id
+    db.close()
+    return user_id, trips
+
+
+async def main():
+    user_id, trips = seed()
+    for lines, trip_id in trips.items():
+        async with AsyncSessionLocal() as db:
+            before, after = await python_summary(db, trip_id), await sql_summary(db, trip_id)
+        assert all(abs(before[k] - after[k]) < 1e-6 for k in before), (before, after)
+        print(f"trip with {lines} budget lines")
+        print_row("  ORM rows + 6 Python passes (before)", await timed(python_summary, trip_id))
+        print_row("  GROUP BY category", await timed(group_by_summary, trip_id))
+        print_row("  rollup table (current)", await timed(sql_summary, trip_id))
+
+    async def all_trips(db, user_id):
+        return budget_summary.user_summary(await budget_summary.user_breakdowns(db, user_id))
+
+    async def per_trip_loop(db, user_id):
+        trip_ids = (await db.scalars(select(Trip.id).where(Trip.user_id == user_id))).all()
+        return [await sql_summary(db, trip_id) for trip_id in trip_ids]
+
+    print(f"all {len(trips) + 200} trips of one user")
+    print_row("  one summary request per trip", await timed(per_trip_loop, user_id, iterations=5))
+    print_row("  cross-trip rollup read", await timed(all_trips, user_id, iterations=5))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
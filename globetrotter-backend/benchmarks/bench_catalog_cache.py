@@ -0,0 +1,151 @@
+"""Catalog cache: city/activity reads and searches with and without it.
+
+Replays the same skewed read mix (a few popular cities and activities,
+repeated searches) through the API with the cache disabled and enabled,
+and reports SQL statements and latency per request. Then simulates two
+workers sharing one backend (MemoryBackend standing in for Redis) and
+checks that one worker's fills are hits in the other, and that a create
+in either is visible to searches in both. Exits non-zero on stale reads.
+"""
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, reset_schema, count_statements, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.city import City
+from app.models.activity import Activity
+from app.services import catalog_cache
+from app.services.catalog_cache import CatalogCache, MemoryBackend, GENERATION_TTL_SECONDS
+
+CITIES = 5000
+ACTIVITIES = 5000
+REQUESTS = 2000
+CATEGORIES = ["sightseeing", "food", "adventure", "culture", "nightlife"]
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    db.execute(insert(City), [
+        {"name": f"City {i}", "country": f"Country {i % 50}", "popularity": i % 997} for i in range(CITIES)
+    ])
+    db.execute(insert(Activity), [
+        {"name": f"Activity {i}", "category": CATEGORIES[i % len(CATEGORIES)],
+         "estimated_cost": float(i % 300), "duration_hours": 1.0 + i % 6}
+        for i in range(ACTIVITIES)
+    ])
+    db.commit()
+    db.close()
+
+
+def workload(seed_value=7):
+    # Popular items are read far more often than the long tail
+    rng = random.Random(seed_value)
+    urls = []
+    for _ in range(REQUESTS):
+        pick = rng.random()
+        if pick < 0.4:
+            urls.append(f"/api/cities/{1 + int(rng.paretovariate(1.2)) % CITIES}")
+        elif pick < 0.7:
+            urls.append(f"/api/activities/{1 + int(rng.paretovariate(1.2)) % ACTIVITIES}")
+        elif pick < 0.85:
+            urls.append(f"/api/cities/?q=city {rng.randint(1, 30)}")
+        else:
+            urls.append(f"/api/activities/search?category={rng.choice(CATEGORIES)}&max_cost={rng.choice([50, 100, 200])}")
+    return urls
+
+
+def run(client, cache, urls):
+    catalog_cache.catalog = cache
+    with count_statements() as statements:
+        start = time.perf_counter()
+        for url in urls:
+            client.get(url).raise_for_status()
+        elapsed = time.perf_counter() - start
+    return len(statements), elapsed
+
+
+def check_shared(client):
+    ok = True
+    shared = MemoryBackend()
+    worker_a = CatalogCache(maxsize=1000, ttl=600, shared=shared)
+    worker_b = CatalogCache(maxsize=1000, ttl=600, shared=shared)
+
+    catalog_cache.catalog = worker_a
+    before = client.get("/api/cities/?q=brand new").json()
+    client.get("/api/cities/1")
+    catalog_cache.catalog = worker_b
+    with count_statements() as statements:
+        client.get("/api/cities/1")
+        client.get("/api/cities/?q=brand new")
+    ok &= not statements and worker_b.stats()["shared_hits"] == 2
+
+    # Created through worker A; worker B notices once its generation expires
+    catalog_cache.catalog = worker_a
+    created = client.post("/api/cities/", json={"name": "Brand New Town", "country": "Nowhere"}).json()
+    ok &= not before and [c["id"] for c in client.get("/api/cities/?q=brand new").json()] == [created["id"]]
+    time.sleep(GENERATION_TTL_SECONDS)
+    catalog_cache.catalog = worker_b
+    ok &= [c["id"] for c in client.get("/api/cities/?q=brand new").json()] == [created["id"]]
+    ok &= client.get(f"/api/cities/{created['id']}").json()["name"] == "Brand New Town"
+    print(f"shared backend: two workers, fills and invalidations: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_local(client):
+    catalog_cache.catalog = CatalogCache(maxsize=1000, ttl=600)
+    client.get("/api/activities/search?category=food")
+    created = client.post("/api/activities/", json={"name": "Cheap eats", "category": "food"}).json()
+    items = client.get("/api/activities/search?category=food&limit=100").json()
+    page = client.get("/api/activities/search?category=food").json()
+    ok = page["facets"]["food"] == ACTIVITIES // len(CATEGORIES) + 1 and created["id"] in [a["id"] for a in items["items"]]
+    ok &= client.get("/api/cities/999999").status_code == 404
+    print(f"local cache: create invalidates searches: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    seed()
+    client = TestClient(app)
+    urls = workload()
+    settings_cache = catalog_cache.catalog
+
+    print(f"{CITIES} cities, {ACTIVITIES} activities, {REQUESTS} reads")
+    uncached = CatalogCache(maxsize=0, ttl=0)
+    for label, cache in (
+        ("no cache", uncached),
+        ("local LRU", CatalogCache(maxsize=20000, ttl=600)),
+        ("local LRU, 100 entries", CatalogCache(maxsize=100, ttl=600)),
+        ("shared only (fresh worker)", None),
+    ):
+        if cache is None:
+            # A worker whose LRU is empty but whose peers already filled the shared backend
+            shared = MemoryBackend()
+            run(client, CatalogCache(maxsize=20000, ttl=600, shared=shared), urls)
+            cache = CatalogCache(maxsize=20000, ttl=600, shared=shared)
+        statements, elapsed = run(client, cache, urls)
+        stats = cache.stats()
+        print(f"  {label:<28} {statements:>6} statements  {elapsed / REQUESTS * 1000:7.3f}ms/request  "
+              f"local={stats['local_hits']} shared={stats['shared_hits']} miss={stats['misses']} "
+              f"evicted={stats['evictions']}")
+
+    catalog_cache.catalog = uncached
+    print_row("  GET /api/cities/{id}, no cache", measure(lambda: client.get("/api/cities/42")))
+    catalog_cache.catalog = CatalogCache(maxsize=100, ttl=600)
+    print_row("  GET /api/cities/{id}, cached", measure(lambda: client.get("/api/cities/42")))
+
+    ok = check_local(client)
+    ok &= check_shared(client)
+    catalog_cache.catalog = settings_cache
+    if not ok:
+        print("FAIL: catalog cache served stale results")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
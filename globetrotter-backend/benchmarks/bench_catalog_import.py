@@ -0,0 +1,190 @@
+"""Bulk catalog import: rows/sec and memory against one POST per row.
+
+Imports generated city files of increasing size through
+catalog_import.import_catalog and reports throughput and peak Python
+memory (which should not grow with the file), next to the per-row
+POST /api/cities/ path the importer replaces. Then checks upsert and
+hook behaviour: re-importing updates rather than duplicates, bad rows
+are counted and skipped, and imported rows show up in search,
+autocomplete and cached reads, including when the import ran in another
+process (the CLI) that shares only the cache backend with the server.
+Exits non-zero if any check fails.
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+
+from benchmarks.common import (
+    SessionLocal, engine, reset_schema, create_user, auth_headers, measure, print_row, settle_indexes,
+)
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.models.city import City
+from app.models.activity import Activity
+from app.services import autocomplete, catalog_cache, catalog_import, city_search
+
+SIZES = [20_000, 100_000]
+POST_SAMPLES = 200
+
+
+def write_cities(path, rows, cost=100.0):
+    with open(path, "w", newline="") as f:
+        f.write("name,country,region,cost_index,popularity,description\n")
+        for i in range(rows):
+            f.write(f'City {i},Country {i % 200},,{cost + i % 50},{i % 1000},"Founded in {i}, ""they"" say"\n')
+
+
+def timed_import(path, kind="cities", format="csv"):
+    tracemalloc.start()
+    with open(path, newline="") as f:
+        report = catalog_import.import_catalog(engine, kind, f, format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return report, peak
+
+
+def count(model):
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(model))
+    finally:
+        db.close()
+
+
+def check_upserts(client, directory):
+    ok = True
+    path = os.path.join(directory, "cities.csv")
+    write_cities(path, 1000)
+    first, _ = timed_import(path)
+    ok &= first.inserted == 1000 and first.updated == 0 and count(City) == 1000
+
+    # Warm the in-process search index, autocomplete and the read cache, then
+    # re-import with new prices plus new rows: reads must see both
+    db = SessionLocal()
+    autocomplete.build_indexes(db)
+    city_search.build_index(db)
+    db.close()
+    client.get("/api/cities/1")
+    client.get("/api/cities/?q=city 1500")
+    write_cities(path, 1500, cost=500.0)
+    second, _ = timed_import(path)
+    settle_indexes()
+    ok &= second.inserted == 500 and second.updated == 1000 and count(City) == 1500
+    ok &= client.get("/api/cities/1").json()["cost_index"] == 500.0
+    ok &= [c["name"] for c in client.get("/api/cities/?q=city 1499").json()][:1] == ["City 1499"]
+    ok &= [c["name"] for c in client.get("/api/cities/autocomplete?q=city 1499").json()][:1] == ["City 1499"]
+
+    # A file with only some columns updates those and leaves the rest as they were
+    partial = catalog_import.import_catalog(engine, "cities", io.StringIO("name,country,region\nCity 7,Country 7,North\n"))
+    city = client.get("/api/cities/8").json()
+    ok &= partial.updated == 1 and city["region"] == "North" and city["cost_index"] == 507.0
+    ok &= city["popularity"] == 7 and city["description"] == 'Founded in 7, "they" say'
+
+    # A key repeated within one file keeps its last row
+    jsonl = io.StringIO("\n".join(json.dumps(row) for row in [
+        {"name": "Dup", "category": "food", "estimated_cost": 1},
+        {"name": "Dup", "category": "food", "estimated_cost": 2},
+        {"name": "No category"},
+        {"name": "Bad cost", "category": "food", "estimated_cost": "lots"},
+    ]) + "\n{not json\n")
+    report = catalog_import.import_catalog(engine, "activities", jsonl, "jsonl")
+    ok &= report.rows == 5 and report.inserted == 1 and report.invalid == 3
+    ok &= [line for line, _ in report.errors] == [3, 4, 5] and count(Activity) == 1
+    ok &= client.get("/api/activities/?q=Dup").json()[0]["estimated_cost"] == 2.0
+
+    # Uploads overwrite shared rows, so only CATALOG_ADMIN_EMAILS may make them
+    db = SessionLocal()
+    admin, other = create_user(db), create_user(db, "other@example.com", "other")
+    settings.CATALOG_ADMIN_EMAILS = admin.email
+    admin, other = auth_headers(admin), auth_headers(other)
+    db.close()
+    files = {"file": ("more.csv", b"name,category,estimated_cost\nMuseum,culture,12\nDup,food,3\n", "text/csv")}
+    ok &= client.post("/api/activities/import", files=files).status_code in (401, 403)
+    ok &= client.post("/api/cities/import", files=files, headers=other).status_code == 403
+    ok &= client.post("/api/activities/import", files=files, headers=other).status_code == 403
+    upload = client.post("/api/activities/import", files=files, headers=admin).json()
+    ok &= upload["inserted"] == 1 and upload["updated"] == 1 and upload["invalid"] == 0
+    ok &= client.get("/api/activities/?q=Dup").json()[0]["estimated_cost"] == 3.0
+
+    # JSON nulls count as not given: the update keeps the cost, the insert gets the default
+    nulls = catalog_import.import_catalog(engine, "activities", io.StringIO(
+        '{"name": "Dup", "category": "food", "estimated_cost": null}\n'
+        '{"name": "Free", "category": "food", "estimated_cost": null, "duration_hours": null}\n'
+    ), "jsonl")
+    listing = client.get("/api/activities/?category=food")
+    ok &= nulls.updated == 1 and nulls.inserted == 1 and listing.status_code == 200
+    ok &= {a["name"]: a["estimated_cost"] for a in listing.json()} == {"Dup": 3.0, "Free": 0.0}
+    print(f"upsert / validation / index hook checks: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_other_process(client, directory):
+    # The CLI's process has its own CatalogCache and indexes; all it shares
+    # with the server is the backend, where the import bumps the generation
+    backend = catalog_cache.MemoryBackend()
+    server = catalog_cache.CatalogCache(maxsize=1000, ttl=600, shared=backend)
+    cli = catalog_cache.CatalogCache(maxsize=1000, ttl=600, shared=backend)
+    catalog_cache.catalog = server
+    ok = client.get("/api/cities/autocomplete?q=harbour").json() == []
+    ok &= client.get("/api/cities/?q=harbour").json() == []
+
+    path = os.path.join(directory, "harbour.csv")
+    with open(path, "w", newline="") as f:
+        f.write("name,country\nHarbour Town,Xland\n")
+    catalog_cache.catalog = cli
+    timed_import(path)
+    catalog_cache.catalog = server
+
+    # The server trusts its copy of the generation for this long
+    time.sleep(catalog_cache.GENERATION_TTL_SECONDS)
+    settle_indexes()
+    ok &= [c["name"] for c in client.get("/api/cities/autocomplete?q=harbour").json()] == ["Harbour Town"]
+    ok &= [c["name"] for c in client.get("/api/cities/?q=harbour").json()] == ["Harbour Town"]
+    print(f"import from another process reaches the server: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    client = TestClient(app)
+    directory = tempfile.mkdtemp(prefix="globetrotter-import-")
+
+    reset_schema()
+    counter = iter(range(10**9))
+    post = measure(
+        lambda: client.post("/api/cities/", json={"name": f"Posted {next(counter)}", "country": "X"}),
+        iterations=POST_SAMPLES,
+    )
+    print_row("  POST /api/cities/ per row", post)
+    print(f"  -> {1000 / post['mean_ms']:,.0f} rows/s, 200k rows in ~{200_000 * post['mean_ms'] / 60000:.0f} min")
+
+    for rows in SIZES:
+        reset_schema()
+        path = os.path.join(directory, f"cities-{rows}.csv")
+        write_cities(path, rows)
+        report, peak = timed_import(path)
+        print(f"  import {rows:>7} rows (csv)   {report.seconds:6.2f}s  {report.rows_per_second:>9,.0f} rows/s  "
+              f"peak {peak / 2**20:5.1f} MiB")
+        start = time.perf_counter()
+        report, _ = timed_import(path)
+        print(f"  re-import (all updates)      {time.perf_counter() - start:6.2f}s  "
+              f"{report.rows_per_second:>9,.0f} rows/s  updated={report.updated}")
+
+    reset_schema()
+    catalog_cache.catalog = catalog_cache.CatalogCache(maxsize=1000, ttl=600)
+    ok = check_upserts(client, directory)
+    ok &= check_other_process(client, directory)
+    if not ok:
+        print("FAIL: catalog import")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
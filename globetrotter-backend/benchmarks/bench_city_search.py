@@ -0,0 +1,74 @@
+"""City search over a synthetic 100k-city catalog.
+
+Compares the old unranked ``ILIKE '%q%'`` scan with the ranked search used by
+``GET /api/cities/`` (pg_trgm on Postgres, the in-process trigram index
+elsewhere).
+"""
+import random
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, reset_schema, measure, print_row
+from app.models.city import City
+from app.services import city_search
+
+CITIES = 100_000
+QUERIES = ["par", "san", "lo", "new york", "ber", "ville", "x", "qzq"]
+SYLLABLES = ["par", "is", "lon", "don", "ber", "lin", "san", "to", "ma", "dri", "ro", "me", "ville",
+             "burg", "new", "york", "ka", "tha", "po", "ri", "el", "ha", "mi", "lan", "os", "lo"]
+COUNTRIES = ["France", "Germany", "Spain", "Italy", "Japan", "Brazil", "Kenya", "Canada", "India", "Peru"]
+
+
+def city_rows(n, seed=7):
+    rng = random.Random(seed)
+    for i in range(n):
+        words = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+            for _ in range(rng.choice([1, 1, 1, 2]))
+        ]
+        yield {
+            "name": " ".join(words),
+            "country": rng.choice(COUNTRIES),
+            "popularity": int(rng.paretovariate(1.2) * 10),
+            "cost_index": 100.0,
+        }
+
+
+def ilike_scan(db, q):
+    return db.query(City).filter(City.name.ilike(f"%{q}%")).limit(50).all()
+
+
+def ilike_ranked(db, q):
+    # What ranking costs without an index: every match has to be sorted
+    return (
+        db.query(City).filter(City.name.ilike(f"%{q}%"))
+        .order_by(City.popularity.desc()).limit(50).all()
+    )
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    rows = list(city_rows(CITIES))
+    for start in range(0, len(rows), 10_000):
+        db.execute(insert(City), rows[start:start + 10_000])
+    db.commit()
+    print(f"{CITIES} cities on {db.get_bind().dialect.name}")
+
+    if db.get_bind().dialect.name != "postgresql":
+        start = time.perf_counter()
+        city_search.build_index(db)
+        print(f"in-process index built in {time.perf_counter() - start:.2f}s")
+
+    for q in QUERIES:
+        top = [c.name for c in city_search.search_cities(db, q)[:3]]
+        print(f"q={q!r} top={top}")
+        print_row("  ILIKE scan, unranked (before)", measure(lambda: ilike_scan(db, q), iterations=30))
+        print_row("  ILIKE + ORDER BY popularity", measure(lambda: ilike_ranked(db, q), iterations=30))
+        print_row("  ranked search (after)", measure(lambda: city_search.search_cities(db, q), iterations=30))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
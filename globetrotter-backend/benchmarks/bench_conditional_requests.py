@@ -0,0 +1,150 @@
+"""Conditional requests on the trip, itinerary and budget endpoints.
+
+Times a full 200 against a 304 revalidation for a trip with 50 stops, then
+checks the version semantics: every child write changes the ETag, a stale
+If-Match gets 412 and leaves the trip alone, and of several concurrent
+updates holding the same ETag exactly one wins. Exits non-zero if any
+check fails.
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget
+from app.services import budget_rollups
+
+STOPS = 50
+ACTIVITIES = 5
+CONCURRENT_EDITS = 8
+START = datetime(2026, 1, 1)
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    headers = auth_headers(user)
+    db.execute(insert(City), [{"name": f"City {i}", "country": "X"} for i in range(STOPS)])
+    db.execute(insert(Activity), [{"name": f"Activity {i}", "category": "sightseeing"} for i in range(100)])
+    trip = Trip(user_id=user.id, name="Trip", start_date=START, end_date=START + timedelta(days=STOPS))
+    db.add(trip)
+    db.flush()
+    trip_id = trip.id
+    db.execute(insert(ItineraryStop), [
+        dict(trip_id=trip_id, city_id=1 + i, order_key=i << 16, arrival_date=START + timedelta(days=i),
+             departure_date=START + timedelta(days=i + 1))
+        for i in range(STOPS)
+    ])
+    stop_ids = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip_id)).all()
+    db.execute(insert(ItineraryActivity), [
+        dict(stop_id=stop_id, activity_id=1 + (stop_id + j) % 100) for stop_id in stop_ids for j in range(ACTIVITIES)
+    ])
+    db.execute(insert(Budget), [dict(trip_id=trip_id, category="stay", amount=80.0) for _ in range(STOPS)])
+    db.commit()
+    budget_rollups.rebuild(db, [trip_id])
+    db.close()
+    return headers, trip_id, stop_ids
+
+
+def check_versions(client, headers, trip_id, stop_ids):
+    ok = True
+    trip_url = f"/api/trips/{trip_id}"
+    reads = [trip_url, f"/api/itinerary/{trip_id}/stops", f"/api/budget/{trip_id}", f"/api/budget/{trip_id}/summary"]
+
+    def etag():
+        response = client.get(trip_url, headers=headers)
+        return response.headers["etag"]
+
+    for url in reads:
+        first = client.get(url, headers=headers)
+        repeat = client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]})
+        ok &= first.status_code == 200 and repeat.status_code == 304 and not repeat.content
+
+    # Every kind of child write moves the version, and the write's own
+    # response carries the new ETag
+    writes = [
+        lambda: client.post(f"/api/itinerary/{trip_id}/stops", headers=headers,
+                            json={"city_id": 1, "arrival_date": START.isoformat(), "departure_date": START.isoformat()}),
+        lambda: client.put(f"/api/itinerary/stops/{stop_ids[0]}", headers=headers, json={"order_index": 3}),
+        lambda: client.post(f"/api/itinerary/stops/{stop_ids[1]}/activities", headers=headers, json={"activity_id": 1}),
+        lambda: client.post(f"/api/itinerary/{trip_id}/batch", headers=headers, json={"delete_stop_ids": [stop_ids[2]]}),
+        lambda: client.delete(f"/api/itinerary/stops/{stop_ids[3]}", headers=headers),
+        lambda: client.post(f"/api/budget/{trip_id}", headers=headers, json={"category": "meals", "amount": 5.0}),
+        lambda: client.put(trip_url, headers=headers, json={"name": "Renamed"}),
+    ]
+    for write in writes:
+        before = etag()
+        response = write()
+        after = etag()
+        ok &= response.status_code == 200 and after != before and response.headers.get("etag") in (None, after)
+        ok &= client.get(reads[1], headers={**headers, "If-None-Match": before}).status_code == 200
+
+    # A stale If-Match is refused without touching the trip
+    stale = etag()
+    client.put(trip_url, headers={**headers, "If-Match": stale}, json={"name": "First"}).raise_for_status()
+    current = etag()
+    refused = client.put(trip_url, headers={**headers, "If-Match": stale}, json={"name": "Second"})
+    ok &= refused.status_code == 412 and etag() == current
+    ok &= client.get(trip_url, headers=headers).json()["name"] == "First"
+    ok &= client.delete(trip_url, headers={**headers, "If-Match": stale}).status_code == 412
+    ok &= client.post(f"/api/budget/{trip_id}", headers={**headers, "If-Match": stale},
+                      json={"category": "meals", "amount": 5.0}).status_code == 412
+    ok &= client.put(trip_url, headers={**headers, "If-Match": "*"}, json={"name": "Any"}).status_code == 200
+    print(f"version / If-Match checks: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def check_concurrent_edits(headers, trip_id):
+    # Every client read the same version; only one of them may write over it
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        etag = (await client.get(f"/api/trips/{trip_id}", headers=headers)).headers["etag"]
+        responses = await asyncio.gather(*(
+            client.put(f"/api/trips/{trip_id}", headers={**headers, "If-Match": etag}, json={"name": f"Edit {i}"})
+            for i in range(CONCURRENT_EDITS)
+        ))
+        statuses = sorted(response.status_code for response in responses)
+        winners = [response.json()["name"] for response in responses if response.status_code == 200]
+        name = (await client.get(f"/api/trips/{trip_id}", headers=headers)).json()["name"]
+    ok = statuses == [200] + [412] * (CONCURRENT_EDITS - 1) and winners == [name]
+    print(f"{CONCURRENT_EDITS} concurrent If-Match updates: {statuses.count(200)} applied, "
+          f"{statuses.count(412)} refused: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    headers, trip_id, stop_ids = seed()
+    client = TestClient(app)
+
+    print(f"trip with {STOPS} stops x {ACTIVITIES} activities, {STOPS} budget lines")
+    for label, url in (
+        ("trip", f"/api/trips/{trip_id}"),
+        ("stops", f"/api/itinerary/{trip_id}/stops"),
+        ("budget", f"/api/budget/{trip_id}"),
+        ("budget summary", f"/api/budget/{trip_id}/summary"),
+    ):
+        full = client.get(url, headers=headers)
+        conditional = {**headers, "If-None-Match": full.headers["etag"]}
+        print_row(f"  {label}, 200 ({len(full.content)} bytes)", measure(lambda: client.get(url, headers=headers)))
+        print_row(f"  {label}, 304", measure(lambda: client.get(url, headers=conditional)))
+
+    ok = check_versions(client, headers, trip_id, stop_ids)
+    ok &= asyncio.run(check_concurrent_edits(headers, trip_id))
+    if not ok:
+        print("FAIL: conditional request semantics broken")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Trip cost estimate for trips with hundreds of stops.
+
+Compares walking the loaded ORM tree in Python with the single aggregate
+query in app/services/cost_estimate.py, cold and cached. Then checks that
+a write made without invalidate() (as another worker process would) is
+picked up once it bumps the trip version, and exits non-zero if not.
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, summarize, print_row
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.services import cost_estimate
+from app.services.itinerary_loader import load_trip_stops_async
+
+SIZES = [10, 100, 500]
+ACTIVITIES_PER_STOP = 5
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    db.execute(insert(City), [{"name": f"City {i}", "country": "X", "cost_index": 50 + i % 150} for i in range(200)])
+    db.execute(insert(Activity), [
+        {"name": f"Activity {i}", "category": "sightseeing", "estimated_cost": float(i % 80)} for i in range(500)
+    ])
+    start = datetime(2026, 1, 1)
+    trips = {}
+    for size in SIZES:
+        trip = Trip(user_id=user.id, name=f"{size} stops", start_date=start, end_date=start + timedelta(days=size))
+        db.add(trip)
+        db.flush()
+        trips[size] = trip.id
+        db.execute(insert(ItineraryStop), [
+            {"trip_id": trip.id, "city_id": 1 + i % 200, "order_key": i,
+             "arrival_date": start + timedelta(days=i), "departure_date": start + timedelta(days=i + 1)}
+            for i in range(size)
+        ])
+        stop_ids = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip.id)).all()
+        db.execute(insert(ItineraryActivity), [
+            {"stop_id": stop_id, "activity_id": 1 + (stop_id * 7 + j) % 500}
+            for stop_id in stop_ids for j in range(ACTIVITIES_PER_STOP)
+        ])
+    db.commit()
+    db.close()
+    return trips
+
+
+async def python_estimate(db, trip_id):
+    total = 0.0
+    for stop in await load_trip_stops_async(db, trip_id):
+        nights = max((stop.departure_date - stop.arrival_date).total_seconds() / 86400, 0)
+        total += nights * stop.city.cost_index * settings.ESTIMATE_BASE_NIGHTLY_COST / 100
+        for scheduled in stop.activities:
+            total += scheduled.activity.estimated_cost
+    return total
+
+
+async def sql_estimate(db, trip_id, cached=False):
+    if not cached:
+        cost_estimate.invalidate(trip_id)
+    version = await db.scalar(select(Trip.version).where(Trip.id == trip_id))
+    return (await cost_estimate.estimate_trip_cost(db, trip_id, version))["estimated_total"]
+
+
+async def other_worker_write(trip_id):
+    # Add an activity and bump the version straight in the database, without
+    # this process's invalidate(), like a write served by another worker
+    db = SessionLocal()
+    stop_id = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip_id)).first()
+    db.execute(insert(ItineraryActivity), [{"stop_id": stop_id, "activity_id": 1}])
+    db.execute(update(Trip).where(Trip.id == trip_id).values(version=Trip.version + 1))
+    db.commit()
+    db.close()
+    async with AsyncSessionLocal() as session:
+        return await python_estimate(session, trip_id), await sql_estimate(session, trip_id, cached=True)
+
+
+async def timed(fn, *args, iterations=20):
+    samples = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db, *args)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def main():
+    trips = seed()
+    for size, trip_id in trips.items():
+        async with AsyncSessionLocal() as db:
+            expected, actual = await python_estimate(db, trip_id), await sql_estimate(db, trip_id)
+        assert abs(expected - actual) < 1e-6, (expected, actual)
+        print(f"trip with {size} stops x {ACTIVITIES_PER_STOP} activities (estimate {actual:.2f})")
+        print_row("  ORM tree + Python loop", await timed(python_estimate, trip_id))
+        print_row("  aggregate SQL, cold", await timed(sql_estimate, trip_id))
+        print_row("  aggregate SQL, cached", await timed(sql_estimate, trip_id, True))
+
+    expected, actual = await other_worker_write(trips[SIZES[0]])
+    fresh = abs(expected - actual) < 1e-6
+    print(f"write from another worker re-computes the estimate: {'ok' if fresh else 'STALE'}")
+    return 0 if fresh else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
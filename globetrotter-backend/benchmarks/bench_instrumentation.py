@@ -0,0 +1,122 @@
+"""Request instrumentation: correctness of the numbers and what they cost.
+
+Checks that Server-Timing and the request log report the same SQL
+statement count as an independent listener for sync and async routes
+(for a streamed export only the log can, as headers go out first), that
+slow queries are logged with their statement, and that /metrics
+exposes per-route histograms. Then times the engine event hooks per
+statement. Exits non-zero if any check fails.
+"""
+import json
+import logging
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, count_statements, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import instrumentation
+from app.core.config import settings
+
+START = datetime(2026, 1, 1).isoformat()
+SERVER_TIMING = re.compile(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) queries", serialize;dur=([\d.]+)')
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def timing(response):
+    match = SERVER_TIMING.fullmatch(response.headers.get("server-timing", ""))
+    return None if match is None else {
+        "app": float(match[1]), "db": float(match[2]), "queries": int(match[3]), "serialize": float(match[4])
+    }
+
+
+def check(client, headers):
+    ok = True
+    trip = client.post("/api/trips/", headers=headers, json={"name": "T", "start_date": START, "end_date": START}).json()
+    city = client.post("/api/cities/", json={"name": "Porto", "country": "Portugal"}).json()
+    client.post(f"/api/itinerary/{trip['id']}/stops", headers=headers,
+                json={"city_id": city["id"], "arrival_date": START, "departure_date": START})
+
+    requests, slow = Capture(), Capture()
+    loggers = {logger: (logger.handlers, logger.level) for logger in
+               (instrumentation.request_logger, instrumentation.slow_query_logger)}
+    instrumentation.request_logger.handlers = [requests]
+    instrumentation.slow_query_logger.handlers = [slow]
+    instrumentation.request_logger.setLevel(logging.INFO)
+    try:
+        for url in (f"/api/trips/{trip['id']}", f"/api/itinerary/{trip['id']}/stops",  # async routes
+                    f"/api/cities/{city['id'] + 1000}", "/api/activities/search",          # sync routes
+                    "/api/trips/export"):                                                  # streamed
+            with count_statements() as statements:
+                response = client.get(url, headers=headers)
+            reported, logged = timing(response), requests.records[-1]
+            # Server-Timing goes out with the headers, before a streamed body
+            # runs its queries; the log line is written at the end
+            streamed = url.endswith("/export")
+            row_ok = reported is not None and reported["queries"] == (0 if streamed else len(statements))
+            row_ok &= logged["db_statements"] == len(statements) > 0 and logged["path"] == url
+            row_ok &= reported is not None and reported["app"] >= reported["db"]
+            ok &= row_ok
+            print(f"  {url:<40} {len(statements)} statements, Server-Timing: {response.headers.get('server-timing')}"
+                  f"{'' if row_ok else '  <- MISMATCH'}")
+
+        threshold = settings.SLOW_QUERY_MS
+        settings.SLOW_QUERY_MS = 0
+        try:
+            client.get(f"/api/itinerary/{trip['id']}/stops", headers=headers)
+        finally:
+            settings.SLOW_QUERY_MS = threshold
+    finally:
+        for logger, (handlers, level) in loggers.items():
+            logger.handlers = handlers
+            logger.setLevel(level)
+    logged = requests.records[-1]
+    ok &= logged["route"] == "/api/itinerary/{trip_id}/stops" and logged["status"] == 200
+    ok &= len(logged["slow_queries"]) == logged["db_statements"] == len(slow.records)
+    ok &= all(record["statement"].lstrip().upper().startswith("SELECT") for record in slow.records)
+    ok &= all(record["path"] == f"/api/itinerary/{trip['id']}/stops" for record in slow.records)
+    print(f"  slow query log: {len(slow.records)} statements, request log: {logged}")
+
+    metrics = client.get("/metrics").text
+    ok &= 'http_request_duration_seconds_bucket{method="GET",route="/api/trips/{trip_id}",status="200",le="+Inf"}' in metrics
+    ok &= 'http_request_db_statements_count{method="GET",route="/api/itinerary/{trip_id}/stops"}' in metrics
+    ok &= 'db_slow_queries_total{route="/api/itinerary/{trip_id}/stops"}' in metrics
+    ok &= client.get("/api/nowhere/1").status_code == 404 and 'route="unmatched",status="404"' in client.get("/metrics").text
+    print(f"logs / slow queries / metrics checks: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    headers = auth_headers(create_user(db))
+    db.close()
+    client = TestClient(app)
+    ok = check(client, headers)
+
+    # Cost of the engine hooks on a trivial statement
+    for label, hooked in (("SELECT 1, plain engine", False), ("SELECT 1, instrumented engine", True)):
+        probe = create_engine("sqlite://")
+        if hooked:
+            instrumentation.instrument_engine(probe)
+        with probe.connect() as conn:
+            print_row(f"  {label}", measure(lambda: conn.execute(text("SELECT 1")), iterations=2000))
+    if not ok:
+        print("FAIL: instrumentation")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
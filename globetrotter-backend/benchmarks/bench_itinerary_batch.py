@@ -0,0 +1,117 @@
+"""Building a trip itinerary one item per request vs POST /{trip_id}/batch.
+
+Each round creates a fresh trip and adds STOPS stops with ACTIVITIES
+activities each, end to end through the HTTP API.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, count_statements, summarize, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.city import City
+from app.models.activity import Activity
+
+STOPS = 30
+ACTIVITIES = 3
+ROUNDS = 20
+START = datetime(2026, 1, 1)
+
+
+def stop_payload(i):
+    return {
+        "city_id": 1 + i,
+        "arrival_date": (START + timedelta(days=i)).isoformat(),
+        "departure_date": (START + timedelta(days=i + 1)).isoformat(),
+    }
+
+
+def activity_payload(i, j):
+    return {"activity_id": 1 + (i * ACTIVITIES + j) % 100}
+
+
+def new_trip(client, headers):
+    response = client.post(
+        "/api/trips/", headers=headers,
+        json={"name": "Batch bench", "start_date": START.isoformat(), "end_date": START.isoformat()},
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def per_item(client, headers, trip_id):
+    for i in range(STOPS):
+        stop = client.post(f"/api/itinerary/{trip_id}/stops", headers=headers, json=stop_payload(i))
+        stop.raise_for_status()
+        for j in range(ACTIVITIES):
+            client.post(
+                f"/api/itinerary/stops/{stop.json()['id']}/activities", headers=headers, json=activity_payload(i, j)
+            ).raise_for_status()
+
+
+def batched(client, headers, trip_id):
+    stops = [dict(stop_payload(i), activities=[activity_payload(i, j) for j in range(ACTIVITIES)]) for i in range(STOPS)]
+    response = client.post(f"/api/itinerary/{trip_id}/batch", headers=headers, json={"stops": stops})
+    response.raise_for_status()
+    return response.json()
+
+
+def timed(fn, client, headers):
+    samples = []
+    for _ in range(ROUNDS):
+        trip_id = new_trip(client, headers)
+        start = time.perf_counter()
+        fn(client, headers, trip_id)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def check_batch(client, headers):
+    trip_id = new_trip(client, headers)
+    stops = batched(client, headers, trip_id)
+    assert len(stops) == STOPS and all(len(stop["activities"]) == ACTIVITIES for stop in stops)
+
+    # Reverse the order, drop the first stop and add an activity, in one call
+    ids = [stop["id"] for stop in stops]
+    body = {
+        "delete_stop_ids": [ids[0]],
+        "reorder": [{"stop_id": stop_id, "order_index": i} for i, stop_id in enumerate(reversed(ids[1:]))],
+        "activities": [{"stop_id": ids[-1], "activity_id": 1}],
+    }
+    stops = client.post(f"/api/itinerary/{trip_id}/batch", headers=headers, json=body).json()
+    assert [stop["id"] for stop in stops] == ids[:0:-1]
+    assert len(stops[0]["activities"]) == ACTIVITIES + 1
+
+    # A bad reference rejects the whole batch
+    body = {"stops": [stop_payload(0)], "activities": [{"stop_id": ids[0], "activity_id": 1}]}
+    response = client.post(f"/api/itinerary/{trip_id}/batch", headers=headers, json=body)
+    assert response.status_code == 400, response.text
+    assert len(client.get(f"/api/itinerary/{trip_id}/stops", headers=headers).json()) == STOPS - 1
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    headers = auth_headers(create_user(db))
+    db.execute(insert(City), [{"name": f"City {i}", "country": "X"} for i in range(STOPS)])
+    db.execute(insert(Activity), [{"name": f"Activity {i}", "category": "sightseeing"} for i in range(100)])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    check_batch(client, headers)
+
+    for label, fn in (("per-item requests", per_item), ("one batch request", batched)):
+        trip_id = new_trip(client, headers)
+        with count_statements() as statements:
+            fn(client, headers, trip_id)
+        print(f"{label}: {len(statements)} statements")
+        print_row(f"  {STOPS} stops x {ACTIVITIES} activities", timed(fn, client, headers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
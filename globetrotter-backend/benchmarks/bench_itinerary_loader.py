@@ -0,0 +1,77 @@
+"""Statement count and latency of GET /api/itinerary/{trip_id}/stops.
+
+Exits non-zero if the number of SQL statements changes with itinerary size,
+which is how an N+1 regression in the loader shows up.
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import (
+    SessionLocal, reset_schema, create_user, auth_headers, count_statements, measure, print_row,
+)
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+
+SIZES = [(1, 1), (5, 3), (20, 5), (100, 10)]
+
+
+def build_trip(db, user, stops, activities_per_stop):
+    start = datetime(2026, 1, 1)
+    trip = Trip(user_id=user.id, name=f"{stops}x{activities_per_stop}", start_date=start, end_date=start)
+    db.add(trip)
+    db.flush()
+    for i in range(stops):
+        city = City(name=f"City {stops}-{i}", country="Nowhere")
+        db.add(city)
+        db.flush()
+        stop = ItineraryStop(
+            trip_id=trip.id, city_id=city.id, order_key=i,
+            arrival_date=start + timedelta(days=i), departure_date=start + timedelta(days=i + 1),
+        )
+        db.add(stop)
+        db.flush()
+        for j in range(activities_per_stop):
+            activity = Activity(name=f"Activity {i}-{j}", category="sightseeing")
+            db.add(activity)
+            db.flush()
+            db.add(ItineraryActivity(stop_id=stop.id, activity_id=activity.id))
+    db.commit()
+    return trip.id
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    headers = auth_headers(user)
+    trips = [(size, build_trip(db, user, *size)) for size in SIZES]
+    db.close()
+
+    client = TestClient(app)
+    counts = set()
+    for (stops, per_stop), trip_id in trips:
+        url = f"/api/itinerary/{trip_id}/stops"
+        # Warm request first so per-process caches (e.g. the principal
+        # cache) don't show up as a difference between sizes
+        client.get(url, headers=headers)
+        with count_statements() as statements:
+            response = client.get(url, headers=headers)
+        response.raise_for_status()
+        assert len(response.json()) == stops
+        counts.add(len(statements))
+        print(f"{stops:>4} stops x {per_stop:>2} activities: {len(statements)} statements")
+        print_row(f"  GET {stops} stops", measure(lambda: client.get(url, headers=headers), iterations=50))
+
+    if len(counts) != 1:
+        print(f"FAIL: statement count grows with itinerary size: {sorted(counts)}")
+        return 1
+    print("OK: statement count is independent of itinerary size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
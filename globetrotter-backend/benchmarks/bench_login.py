@@ -0,0 +1,75 @@
+"""Login throughput vs concurrency with the bounded password-hashing pool.
+
+Fires ``REQUESTS`` logins per concurrency level through the in-process ASGI
+app and reports throughput, latency and how many were shed with 503.
+Unrelated threadpool-bound requests (GET /api/cities/) are interleaved to show they are not stalled.
+"""
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import SessionLocal, reset_schema, summarize, print_row
+from app.main import app
+from app.models.user import User
+from app.core.security import get_password_hash
+from app.core.config import settings
+
+CONCURRENCY = [1, 4, 16, 64]
+REQUESTS = 64
+PASSWORD = "correct horse battery staple"
+
+
+async def run_level(client, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    login_samples, other_samples, statuses = [], [], {}
+
+    async def login():
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login", data={"username": "bench@example.com", "password": PASSWORD}
+            )
+            login_samples.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def unrelated():
+        for _ in range(20):
+            start = time.perf_counter()
+            await client.get("/api/cities/")
+            other_samples.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    start = time.perf_counter()
+    await asyncio.gather(unrelated(), *(login() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    return elapsed, summarize(login_samples), summarize(other_samples), statuses
+
+
+async def main():
+    reset_schema()
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", username="bench", hashed_password=get_password_hash(PASSWORD)))
+    db.commit()
+    db.close()
+
+    print(
+        f"argon2 t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST}KiB "
+        f"p={settings.ARGON2_PARALLELISM}; pool workers={settings.PASSWORD_HASH_WORKERS} "
+        f"queue={settings.PASSWORD_HASH_QUEUE_LIMIT}"
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in CONCURRENCY:
+            elapsed, logins, others, statuses = await run_level(client, concurrency)
+            ok = statuses.get(200, 0)
+            print(
+                f"concurrency={concurrency:<3} ok/s={ok / elapsed:7.1f} "
+                f"statuses={dict(sorted(statuses.items()))}"
+            )
+            print_row("  login", logins)
+            print_row("  unrelated GET /api/cities/", others)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""Response serialization of the hot list routes.
+
+For each route, times turning the loaded data into response bytes three
+ways: the old path (ORM objects or cached dicts through response_model
+validation, then the stdlib JSONResponse), the same through orjson, and
+the lean path the routes now take (Core rows through a TypeAdapter's
+dump_json, or cached dumps straight to orjson). For the database routes
+it also times load + encode, since skipping ORM hydration is half the
+saving. Then times the whole request, and exits non-zero if any route's
+body differs from what the old response_model path produced.
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.endpoints import trips as trips_endpoints, budget as budget_endpoints, itinerary as itinerary_endpoints
+from app.core.responses import rows_response
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget
+from app.services import catalog_cache
+from app.services.itinerary_loader import load_trip_stops, load_trip_stops_async, load_trip_stop_rows_async
+from app.db.database import AsyncSessionLocal
+
+PAGE = 50
+ACTIVITIES_PER_STOP = 3
+START = datetime(2026, 1, 1)
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    db.execute(insert(City), [
+        dict(name=f"Lisbon {i}", country="Portugal", region="Lisboa", popularity=i, description="Hills " * 20,
+             image_url=f"https://img.example.com/city/{i}.jpg") for i in range(500)
+    ])
+    db.execute(insert(Activity), [
+        dict(name=f"Lisbon walk {i}", category="sightseeing", estimated_cost=12.5 + i, duration_hours=2.0,
+             description="Old town " * 20) for i in range(500)
+    ])
+    db.execute(insert(Trip), [
+        dict(user_id=user.id, name=f"Trip {i}", description="Lorem ipsum " * 20, start_date=START,
+             end_date=START + timedelta(days=7), cover_photo=f"https://img.example.com/{i}.jpg", public_url=f"s-{i}")
+        for i in range(PAGE)
+    ])
+    trip_id = db.scalars(select(Trip.id).order_by(Trip.id)).first()
+    db.execute(insert(ItineraryStop), [
+        dict(trip_id=trip_id, city_id=1 + i, order_key=(i + 1) << 16, arrival_date=START + timedelta(days=i),
+             departure_date=START + timedelta(days=i + 1), notes="Check in after noon") for i in range(PAGE)
+    ])
+    stop_ids = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip_id)).all()
+    db.execute(insert(ItineraryActivity), [
+        dict(stop_id=stop_id, activity_id=1 + (stop_id * ACTIVITIES_PER_STOP + j) % 500,
+             scheduled_time=START + timedelta(hours=j), notes="Book ahead")
+        for stop_id in stop_ids for j in range(ACTIVITIES_PER_STOP)
+    ])
+    db.execute(insert(Budget), [
+        dict(trip_id=trip_id, category=("stay", "meals", "transport")[i % 3], amount=10.0 * i + 0.5,
+             description=f"Line {i}") for i in range(PAGE)
+    ])
+    db.commit()
+    return db, user, trip_id
+
+
+def response_field(path):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def through_response_model(field, content, response_class):
+    # What FastAPI does with a returned value: validate against the
+    # response_model, dump in JSON mode, then render
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return response_class(field.serialize(value, mode="json")).body
+
+
+def main():
+    db, user, trip_id = seed()
+    headers = auth_headers(user)
+    client = TestClient(app)
+    loop = asyncio.new_event_loop()
+
+    def run(statement_or_loader, scalars=False):
+        # One request's worth of loading on the async engine, like the endpoints
+        async def load():
+            async with AsyncSessionLocal() as session:
+                if callable(statement_or_loader):
+                    return await statement_or_loader(session)
+                result = await (session.scalars if scalars else session.execute)(statement_or_loader)
+                return result.all()
+        return loop.run_until_complete(load())
+
+    def execute(statement):
+        return db.execute(statement).all()
+
+    # Fill the catalog cache the way the routes do, then reuse its entries
+    client.get("/api/cities/", params={"q": "lisbon"})
+    client.get("/api/activities/", params={"q": "lisbon"})
+    cities = catalog_cache.catalog.get_or_load(catalog_cache.CITIES, ("search", "lisbon", ""), list)
+    activities = catalog_cache.catalog.get_or_load(
+        catalog_cache.ACTIVITIES, ("page", "lisbon", "", None, 50, None), dict)["items"]
+
+    stops = run(lambda session: load_trip_stop_rows_async(session, trip_id))
+    trip_query = select(*trips_endpoints.trip_columns).where(Trip.user_id == user.id)
+    budget_query = select(*budget_endpoints.budget_columns).where(Budget.trip_id == trip_id)
+    trip_rows, budget_rows = execute(trip_query), execute(budget_query)
+    # name, route, url, loaded data, lean encoding, (ORM load, row load)
+    routes = [
+        ("get_my_trips", "/api/trips/", "/api/trips/",
+         db.scalars(select(Trip).where(Trip.user_id == user.id)).all(),
+         lambda: rows_response(trips_endpoints.trip_list, trip_rows).body,
+         (lambda: run(select(Trip).where(Trip.user_id == user.id), scalars=True),
+          lambda: rows_response(trips_endpoints.trip_list, run(trip_query)))),
+        ("get_trip_budget", "/api/budget/{trip_id}", f"/api/budget/{trip_id}",
+         db.scalars(select(Budget).where(Budget.trip_id == trip_id)).all(),
+         lambda: rows_response(budget_endpoints.budget_list, budget_rows).body,
+         (lambda: run(select(Budget).where(Budget.trip_id == trip_id), scalars=True),
+          lambda: rows_response(budget_endpoints.budget_list, run(budget_query)))),
+        ("get_trip_stops", "/api/itinerary/{trip_id}/stops", f"/api/itinerary/{trip_id}/stops",
+         load_trip_stops(db, trip_id),
+         lambda: rows_response(itinerary_endpoints.stop_list, stops).body,
+         (lambda: run(lambda session: load_trip_stops_async(session, trip_id)),
+          lambda: rows_response(itinerary_endpoints.stop_list,
+                                run(lambda session: load_trip_stop_rows_async(session, trip_id))))),
+        ("search_cities", "/api/cities/", "/api/cities/?q=lisbon", cities,
+         lambda: ORJSONResponse(cities).body, None),
+        ("search_activities", "/api/activities/", "/api/activities/?q=lisbon", activities,
+         lambda: ORJSONResponse(activities).body, None),
+    ]
+
+    ok = True
+    for name, template, url, loaded, lean, loads in routes:
+        field = response_field(template)
+        expected = json.loads(through_response_model(field, loaded, JSONResponse))
+        body = client.get(url, headers=headers)
+        same = body.status_code == 200 and body.json() == expected and json.loads(lean()) == expected
+        ok &= same and len(expected) == PAGE
+        print(f"{name} ({len(expected)} items){'' if same else '  <- BODY DIFFERS FROM response_model PATH'}")
+        print_row("  response_model + JSONResponse", measure(
+            lambda: through_response_model(field, loaded, JSONResponse), iterations=200))
+        print_row("  response_model + ORJSONResponse", measure(
+            lambda: through_response_model(field, loaded, ORJSONResponse), iterations=200))
+        print_row("  lean (rows / cached dumps)", measure(lean, iterations=200))
+        if loads:
+            load_orm, load_rows = loads
+            print_row("  load + encode, ORM + response_model", measure(
+                lambda: through_response_model(field, load_orm(), ORJSONResponse), iterations=200))
+            print_row("  load + encode, rows + lean", measure(load_rows, iterations=200))
+        print_row("  whole request", measure(lambda: client.get(url, headers=headers), iterations=200))
+    loop.close()
+    db.close()
+    if not ok:
+        print("FAIL: serialization")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
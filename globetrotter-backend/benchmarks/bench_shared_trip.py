@@ -0,0 +1,129 @@
+"""Public shared-trip reads: GET /api/shared/{public_url}.
+
+Times a cold render, a cached 200 and a 304 revalidation for a trip with
+50 stops, against what a viewer costs without the endpoint (three
+authenticated requests for trip, stops and budget summary). Also checks
+that writes change the ETag and show up in the body, including a write
+this process's cache never heard about and a catalog import that changes
+the embedded cities; exits non-zero if not.
+"""
+import io
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from benchmarks.common import SessionLocal, engine, reset_schema, create_user, auth_headers, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget
+from app.services import budget_rollups, catalog_import, shared_trip
+
+STOPS = 50
+ACTIVITIES = 5
+START = datetime(2026, 1, 1)
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    headers = auth_headers(user)
+    db.execute(insert(City), [{"name": f"City {i}", "country": "X"} for i in range(STOPS)])
+    db.execute(insert(Activity), [{"name": f"Activity {i}", "category": "sightseeing"} for i in range(100)])
+    trip = Trip(user_id=user.id, name="Viral trip", start_date=START, end_date=START + timedelta(days=STOPS),
+                public_url="viral", is_public=1)
+    db.add(trip)
+    db.flush()
+    trip_id = trip.id
+    db.execute(insert(ItineraryStop), [
+        dict(trip_id=trip_id, city_id=1 + i, order_key=i, arrival_date=START + timedelta(days=i),
+             departure_date=START + timedelta(days=i + 1))
+        for i in range(STOPS)
+    ])
+    stop_ids = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip_id)).all()
+    db.execute(insert(ItineraryActivity), [
+        dict(stop_id=stop_id, activity_id=1 + (stop_id + j) % 100) for stop_id in stop_ids for j in range(ACTIVITIES)
+    ])
+    db.execute(insert(Budget), [dict(trip_id=trip_id, category="stay", amount=80.0) for _ in range(STOPS)])
+    db.commit()
+    budget_rollups.rebuild(db, [trip_id])
+    db.close()
+    return headers, trip_id
+
+
+def check(client, headers, trip_id):
+    ok = True
+    url = "/api/shared/viral"
+    first = client.get(url)
+    etag = first.headers["etag"]
+    ok &= first.status_code == 200 and len(first.json()["stops"]) == STOPS
+    ok &= client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # A write through the API bumps the version and drops the cached body
+    client.post(f"/api/budget/{trip_id}", headers=headers, json={"category": "meals", "amount": 25.0}).raise_for_status()
+    second = client.get(url, headers={"If-None-Match": etag})
+    ok &= second.status_code == 200 and second.headers["etag"] != etag and second.json()["budget"]["meals"] == 25.0
+
+    # A write from another worker can't invalidate this process's cache, but
+    # it bumps the version, so the stale body is never served
+    db = SessionLocal()
+    db.execute(update(Trip).where(Trip.id == trip_id).values(name="Renamed elsewhere", version=Trip.version + 1))
+    db.commit()
+    db.close()
+    third = client.get(url, headers={"If-None-Match": second.headers["etag"]})
+    ok &= third.status_code == 200 and third.json()["trip"]["name"] == "Renamed elsewhere"
+
+    # A catalog import changes cities the trip embeds without touching its
+    # version: both the shared body and the owner's stops must revalidate
+    stops_url = f"/api/itinerary/{trip_id}/stops"
+    stops_etag = client.get(stops_url, headers=headers).headers["etag"]
+    catalog_import.import_catalog(engine, "cities", io.StringIO("name,country,cost_index\nCity 0,X,999\n"))
+    fourth = client.get(url, headers={"If-None-Match": third.headers["etag"]})
+    ok &= fourth.status_code == 200 and fourth.json()["stops"][0]["city"]["cost_index"] == 999.0
+    stops = client.get(stops_url, headers={**headers, "If-None-Match": stops_etag})
+    ok &= stops.status_code == 200 and stops.json()[0]["city"]["cost_index"] == 999.0
+    # That ETag still works as an If-Match precondition for writes
+    ok &= client.put(f"/api/itinerary/stops/{stops.json()[0]['id']}", json={"notes": "Updated"},
+                     headers={**headers, "If-Match": stops.headers["etag"]}).status_code == 200
+
+    client.put(f"/api/trips/{trip_id}", headers=headers, json={"is_public": 0}).raise_for_status()
+    ok &= client.get(url).status_code == 404
+    client.put(f"/api/trips/{trip_id}", headers=headers, json={"is_public": 1}).raise_for_status()
+    print(f"ETag / invalidation checks: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    headers, trip_id = seed()
+    client = TestClient(app)
+    ok = check(client, headers, trip_id)
+
+    url = "/api/shared/viral"
+    etag = client.get(url).headers["etag"]
+
+    def authenticated_views():
+        for path in (f"/api/trips/{trip_id}", f"/api/itinerary/{trip_id}/stops", f"/api/budget/{trip_id}/summary"):
+            client.get(path, headers=headers).raise_for_status()
+
+    def cold():
+        shared_trip.invalidate(trip_id)
+        client.get(url)
+
+    print(f"trip with {STOPS} stops x {ACTIVITIES} activities")
+    print_row("  3 authenticated requests", measure(authenticated_views, iterations=50))
+    print_row("  shared, cold render", measure(cold, iterations=50))
+    print_row("  shared, cached 200", measure(lambda: client.get(url), iterations=200))
+    print_row("  shared, 304", measure(lambda: client.get(url, headers={"If-None-Match": etag}), iterations=200))
+    if not ok:
+        print("FAIL: shared trip served stale content")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
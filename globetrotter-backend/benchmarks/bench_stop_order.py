@@ -0,0 +1,187 @@
+"""Concurrent writers on one itinerary, plus move latency by trip size.
+
+Hammers a single trip with concurrent appends, positional inserts and moves
+through the ASGI app, then checks that every request succeeded, no stop was
+lost and the (trip_id, order_key) keys are still unique, and that only a
+key clash is retried: a stop or activity naming a missing city or activity
+is rejected with 422 after a single attempt. Exits non-zero on any failure. Also times moving a stop to the front of trips of increasing
+size, which should not depend on the size since only one row is written.
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, count_statements, summarize, print_row
+from app.main import app
+from app.models.city import City
+from app.models.itinerary_stop import ItineraryStop
+from app.services import stop_order
+
+CONCURRENCY = 32
+APPENDS = 200
+INSERTS = 100
+MOVES = 200
+SIZES = [10, 100, 1000]
+START = datetime(2026, 1, 1)
+STOP = {"city_id": 1, "arrival_date": START.isoformat(), "departure_date": (START + timedelta(days=1)).isoformat()}
+
+rebalances = 0
+_rebalance = stop_order.rebalance
+
+
+async def counting_rebalance(db, trip_id):
+    global rebalances
+    rebalances += 1
+    await _rebalance(db, trip_id)
+
+stop_order.rebalance = counting_rebalance
+
+
+async def new_trip(client, headers):
+    response = await client.post(
+        "/api/trips/", headers=headers, json={"name": "Order bench", "start_date": STOP["arrival_date"], "end_date": STOP["arrival_date"]}
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def hammer(calls):
+    gate = asyncio.Semaphore(CONCURRENCY)
+    statuses = {}
+
+    async def one(call):
+        async with gate:
+            response = await call()
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in calls))
+    return statuses, time.perf_counter() - start
+
+
+def check(trip_id, expected):
+    db = SessionLocal()
+    keys = db.scalars(select(ItineraryStop.order_key).where(ItineraryStop.trip_id == trip_id)).all()
+    db.close()
+    ok = len(keys) == expected and len(set(keys)) == len(keys)
+    print(f"  {len(keys)} stops (expected {expected}), {len(set(keys))} distinct keys: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def stress(client, headers):
+    ok = True
+    trip_id = await new_trip(client, headers)
+    url = f"/api/itinerary/{trip_id}/stops"
+
+    statuses, elapsed = await hammer([lambda: client.post(url, headers=headers, json=STOP)] * APPENDS)
+    print(f"{APPENDS} concurrent appends: {statuses} in {elapsed:.2f}s")
+    ok &= check(trip_id, APPENDS) and statuses == {200: APPENDS}
+
+    stops = (await client.get(url, headers=headers)).json()
+    rng = random.Random(14)
+    calls = [
+        lambda: client.post(url, headers=headers, json=STOP, params={"position": rng.randrange(APPENDS)})
+        for _ in range(INSERTS)
+    ] + [
+        lambda: client.put(
+            f"/api/itinerary/stops/{rng.choice(stops)['id']}", headers=headers,
+            json={"order_index": rng.randrange(APPENDS)},
+        )
+        for _ in range(MOVES)
+    ]
+    rng.shuffle(calls)
+    statuses, elapsed = await hammer(calls)
+    print(f"{INSERTS} positional inserts + {MOVES} moves, concurrently: {statuses} in {elapsed:.2f}s")
+    ok &= check(trip_id, APPENDS + INSERTS) and statuses == {200: INSERTS + MOVES}
+
+    # Always inserting at the same spot halves the same gap until it runs out
+    before = rebalances
+    for _ in range(100):
+        (await client.post(url, headers=headers, json=STOP, params={"position": 1})).raise_for_status()
+    print(f"100 inserts at position 1: {rebalances - before} rebalances")
+    ok &= check(trip_id, APPENDS + INSERTS + 100)
+    return ok
+
+
+async def unknown_references(client, headers):
+    trip_id = await new_trip(client, headers)
+    with count_statements() as statements:
+        response = await client.post(f"/api/itinerary/{trip_id}/stops", headers=headers, json=dict(STOP, city_id=999))
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    ok = response.status_code == 422 and not inserts
+    stop = (await client.post(f"/api/itinerary/{trip_id}/stops", headers=headers, json=STOP)).json()
+    response = await client.post(f"/api/itinerary/stops/{stop['id']}/activities", headers=headers,
+                                 json={"activity_id": 999})
+    ok &= response.status_code == 422
+
+    # A real (trip_id, order_key) clash is still recognised as retryable
+    db = SessionLocal()
+    row = dict(trip_id=trip_id, city_id=1, arrival_date=START, departure_date=START, order_key=stop["order_key"])
+    try:
+        db.execute(insert(ItineraryStop), [row])
+        clash = False
+    except IntegrityError as exc:
+        clash = stop_order.is_order_key_clash(exc)
+    db.rollback()
+    try:
+        db.execute(insert(ItineraryStop), [dict(row, city_id=999, order_key=stop["order_key"] + 1)])
+        other = True
+    except IntegrityError as exc:
+        other = stop_order.is_order_key_clash(exc)
+    db.rollback()
+    db.close()
+    ok &= clash and not other
+    print(f"missing city / activity rejected without retries, key clashes detected: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def move_latency(client, headers):
+    print("move the last stop to the front")
+    for size in SIZES:
+        trip_id = await new_trip(client, headers)
+        db = SessionLocal()
+        db.execute(insert(ItineraryStop), [
+            dict(trip_id=trip_id, city_id=1, arrival_date=START, departure_date=START, order_key=(i + 1) * stop_order.KEY_GAP)
+            for i in range(size)
+        ])
+        db.commit()
+        db.close()
+        samples = []
+        for _ in range(30):
+            stops = (await client.get(f"/api/itinerary/{trip_id}/stops", headers=headers)).json()
+            start = time.perf_counter()
+            response = await client.put(
+                f"/api/itinerary/stops/{stops[-1]['id']}", headers=headers, json={"order_index": 0}
+            )
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        print_row(f"  {size} stops", summarize(samples))
+
+
+async def main():
+    reset_schema()
+    db = SessionLocal()
+    headers = auth_headers(create_user(db))
+    db.execute(insert(City), [{"name": "Lisbon", "country": "Portugal"}])
+    db.commit()
+    db.close()
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ok = await stress(client, headers)
+        ok &= await unknown_references(client, headers)
+        await move_latency(client, headers)
+    if not ok:
+        print("FAIL: stop order")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
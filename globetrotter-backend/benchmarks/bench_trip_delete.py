@@ -0,0 +1,123 @@
+"""Deleting trips with thousands of children.
+
+Compares the old ORM cascade (every stop, activity and budget row loaded,
+then deleted one statement at a time) with DELETE /api/trips/{id}, which
+leaves the children to ON DELETE CASCADE, and with the bulk
+DELETE /api/trips/?ids=... endpoint. Reports wall time, SQL statements and
+peak Python memory, and exits non-zero if any child row survives.
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, count_statements
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.budget import Budget
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.services import budget_rollups
+
+# (stops, activities per stop, budget lines)
+SIZES = [(100, 10, 500), (500, 10, 2000)]
+BULK_TRIPS = 10
+START = datetime(2026, 1, 1)
+
+
+def build_trip(db, user_id, stops, per_stop, budgets):
+    trip = Trip(user_id=user_id, name="Delete bench", start_date=START, end_date=START)
+    db.add(trip)
+    db.flush()
+    db.execute(insert(ItineraryStop), [
+        dict(trip_id=trip.id, city_id=1, arrival_date=START, departure_date=START, order_key=i) for i in range(stops)
+    ])
+    stop_ids = db.scalars(select(ItineraryStop.id).where(ItineraryStop.trip_id == trip.id)).all()
+    db.execute(insert(ItineraryActivity), [
+        dict(stop_id=stop_id, activity_id=1) for stop_id in stop_ids for _ in range(per_stop)
+    ])
+    db.execute(insert(Budget), [
+        dict(trip_id=trip.id, category=("stay", "meals", "transport")[i % 3], amount=10.0) for i in range(budgets)
+    ])
+    db.commit()
+    budget_rollups.rebuild(db, [trip.id])
+    return trip.id
+
+
+def orm_cascade(trip_id):
+    db = SessionLocal()
+    trip = db.scalars(
+        select(Trip)
+        .where(Trip.id == trip_id)
+        .options(selectinload(Trip.itinerary_stops).selectinload(ItineraryStop.activities), selectinload(Trip.budgets))
+    ).one()
+    db.delete(trip)
+    db.commit()
+    db.close()
+
+
+def leftovers(trip_ids):
+    db = SessionLocal()
+    stops = select(ItineraryStop.id).where(ItineraryStop.trip_id.in_(trip_ids))
+    counts = [
+        db.scalar(select(func.count()).select_from(Trip).where(Trip.id.in_(trip_ids))),
+        db.scalar(select(func.count()).select_from(ItineraryStop).where(ItineraryStop.trip_id.in_(trip_ids))),
+        db.scalar(select(func.count()).select_from(ItineraryActivity).where(ItineraryActivity.stop_id.in_(stops))),
+        db.scalar(select(func.count()).select_from(Budget).where(Budget.trip_id.in_(trip_ids))),
+    ]
+    db.close()
+    return sum(counts)
+
+
+def run(label, fn, trip_ids):
+    tracemalloc.start()
+    with count_statements() as statements:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    left = leftovers(trip_ids)
+    print(f"  {label:<28} {elapsed * 1000:9.1f}ms {len(statements):6} statements {peak / 2**20:7.1f}MiB peak, {left} rows left")
+    return left == 0
+
+
+def main():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    headers = auth_headers(user)
+    db.add_all([City(name="Lisbon", country="Portugal"), Activity(name="Tram 28", category="sightseeing")])
+    db.commit()
+    client = TestClient(app)
+    # Warm the principal cache so it doesn't count against the first delete
+    client.get("/api/trips/", headers=headers).raise_for_status()
+
+    ok = True
+    for stops, per_stop, budgets in SIZES:
+        children = stops + stops * per_stop + budgets
+        print(f"trip with {stops} stops x {per_stop} activities + {budgets} budget lines ({children} child rows)")
+        old = build_trip(db, user.id, stops, per_stop, budgets)
+        ok &= run("ORM cascade", lambda: orm_cascade(old), [old])
+        new = build_trip(db, user.id, stops, per_stop, budgets)
+        ok &= run("DELETE /trips/{id}", lambda: client.delete(f"/api/trips/{new}", headers=headers).raise_for_status(), [new])
+        bulk = [build_trip(db, user.id, stops, per_stop, budgets) for _ in range(BULK_TRIPS)]
+        ok &= run(
+            f"DELETE /trips/ ({BULK_TRIPS} trips)",
+            lambda: client.delete("/api/trips/", params={"ids": bulk}, headers=headers).raise_for_status(),
+            bulk,
+        )
+    db.close()
+    if not ok:
+        print("FAIL: child rows survived their trip")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
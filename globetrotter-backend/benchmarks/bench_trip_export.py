@@ -0,0 +1,203 @@
+"""GET /api/trips/export: streaming a large trip graph under an RSS ceiling.
+
+Seeds one user with 100k stops (plus an activity per stop and a few budget
+lines per trip), then exports it as NDJSON and CSV in a fresh child
+process per run and records how far the export pushed the process's peak
+RSS above where it started. The response body is drained through a bare
+ASGI call, so nothing on the client side buffers it. For comparison the
+same graph is pulled the old way: GET /api/trips/ then stops and budget
+per trip. Exits non-zero if an export is incomplete or goes over the
+ceiling.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers
+
+TRIPS = 200
+STOPS_PER_TRIP = 500
+BUDGETS_PER_TRIP = 5
+RSS_CEILING_MIB = 40
+START = datetime(2026, 1, 1)
+EMAIL = "bench@example.com"
+
+
+def seed():
+    from app.models.trip import Trip
+    from app.models.city import City
+    from app.models.activity import Activity
+    from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+    from app.models.budget import Budget
+
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db, email=EMAIL)
+    db.execute(insert(City), [{"name": f"City {i}", "country": "X"} for i in range(500)])
+    db.execute(insert(Activity), [{"name": f"Activity {i}", "category": "food"} for i in range(500)])
+    db.execute(insert(Trip), [
+        dict(user_id=user.id, name=f"Trip {t}", start_date=START, end_date=START + timedelta(days=30))
+        for t in range(TRIPS)
+    ])
+    trip_ids = db.scalars(select(Trip.id).order_by(Trip.id)).all()
+    for trip_id in trip_ids:
+        db.execute(insert(ItineraryStop), [
+            dict(trip_id=trip_id, city_id=1 + i, order_key=i << 16, arrival_date=START, departure_date=START,
+                 notes="note " * 10)
+            for i in range(STOPS_PER_TRIP)
+        ])
+        db.execute(insert(Budget), [
+            dict(trip_id=trip_id, category="stay", amount=10.0 * i) for i in range(BUDGETS_PER_TRIP)
+        ])
+    stop_ids = db.scalars(select(ItineraryStop.id)).all()
+    db.execute(insert(ItineraryActivity), [dict(stop_id=s, activity_id=1 + s % 500) for s in stop_ids])
+    db.commit()
+    db.close()
+    return TRIPS + len(stop_ids) * 2 + TRIPS * BUDGETS_PER_TRIP
+
+
+def rss_kib(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+async def drain(app, url, headers):
+    """Run one GET through the ASGI app, counting body bytes and lines without keeping them."""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": parts.path, "raw_path": parts.path.encode(), "query_string": parts.query.encode(),
+        "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    state = {"status": None, "bytes": 0, "lines": 0, "chunks": 0, "body": b""}
+
+    requested = asyncio.Event()
+
+    async def receive():
+        # The request has no body; after that, block like a client that
+        # stays connected (StreamingResponse listens for a disconnect)
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            state["bytes"] += len(body)
+            state["lines"] += body.count(b"\n")
+            state["chunks"] += 1
+            if len(state["body"]) < 4096:
+                state["body"] += body[:4096]
+
+    await app(scope, receive, send)
+    return state
+
+
+async def child(mode):
+    from app.main import app
+
+    headers = auth_headers(SimpleNamespace(email=EMAIL))
+    # Warm up imports and connection pools on a tiny request first
+    await drain(app, "/api/trips/page?limit=1", headers)
+    before = rss_kib("VmRSS")
+    start = time.perf_counter()
+    if mode == "legacy":
+        listing = await drain(app, "/api/trips/", headers)
+        totals = {"bytes": listing["bytes"], "lines": 0, "chunks": 1, "status": listing["status"]}
+        from app.db.database import AsyncSessionLocal
+        from app.models.trip import Trip
+        async with AsyncSessionLocal() as db:
+            trip_ids = (await db.scalars(select(Trip.id))).all()
+        for trip_id in trip_ids:
+            for path in (f"/api/itinerary/{trip_id}/stops", f"/api/budget/{trip_id}"):
+                part = await drain(app, path, headers)
+                totals["bytes"] += part["bytes"]
+        result = totals
+    else:
+        result = await drain(app, f"/api/trips/export?format={mode}", headers)
+    result.pop("body", None)
+    result["seconds"] = time.perf_counter() - start
+    result["rss_growth_mib"] = (rss_kib("VmHWM") - before) / 1024
+    print(json.dumps(result))
+
+
+def run_child(mode):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_trip_export", "--child", mode],
+        env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def check_small_export():
+    # Content checks on a small graph, in process
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    reset_schema()
+    db = SessionLocal()
+    headers = auth_headers(create_user(db, email=EMAIL))
+    other = auth_headers(create_user(db, email="other@example.com", username="other"))
+    db.close()
+    client = TestClient(app)
+    trip = client.post("/api/trips/", headers=headers, json={
+        "name": 'Comma, "quoted"', "start_date": START.isoformat(), "end_date": START.isoformat()}).json()
+    city = client.post("/api/cities/", json={"name": "Lisbon", "country": "Portugal"}).json()
+    client.post(f"/api/itinerary/{trip['id']}/stops", headers=headers, json={
+        "city_id": city["id"], "arrival_date": START.isoformat(), "departure_date": START.isoformat()})
+    client.post(f"/api/budget/{trip['id']}", headers=headers, json={"category": "stay", "amount": 5})
+
+    lines = [json.loads(line) for line in client.get("/api/trips/export", headers=headers).text.splitlines()]
+    ok = [line["record"] for line in lines] == ["trip", "stop", "budget"]
+    ok &= lines[0]["name"] == 'Comma, "quoted"' and lines[1]["city_name"] == "Lisbon"
+    exported = client.get("/api/trips/export?format=csv", headers=headers)
+    ok &= exported.headers["content-type"].startswith("text/csv") and len(exported.text.splitlines()) == 4
+    ok &= client.get("/api/trips/export", headers=other).text == ""
+    ok &= client.get("/api/trips/export?format=csv", headers=other).text.startswith("record,")
+    print(f"export content checks: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    ok = check_small_export()
+    expected_lines = seed()
+    print(f"{TRIPS} trips x {STOPS_PER_TRIP} stops = {TRIPS * STOPS_PER_TRIP} stops, "
+          f"{expected_lines} records; RSS ceiling {RSS_CEILING_MIB} MiB")
+    for mode in ("ndjson", "csv", "legacy"):
+        result = run_child(mode)
+        label = "trips + stops + budget per trip" if mode == "legacy" else f"export ({mode})"
+        print(f"  {label:<32} {result['seconds']:6.2f}s  {result['bytes'] / 2**20:6.1f} MiB body  "
+              f"RSS +{result['rss_growth_mib']:6.1f} MiB")
+        if mode == "legacy":
+            continue
+        lines = expected_lines + (1 if mode == "csv" else 0)
+        complete = result["status"] == 200 and result["lines"] == lines and result["chunks"] > 10
+        ok &= complete and result["rss_growth_mib"] < RSS_CEILING_MIB
+        if not complete:
+            print(f"    incomplete: {result['lines']} lines, expected {lines}")
+    if not ok:
+        print("FAIL: trip export")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        asyncio.run(child(sys.argv[2]))
+    else:
+        sys.exit(main())
@@ -0,0 +1,108 @@
+"""Trip listing for a user with 10k trips.
+
+Compares GET /api/trips/ (every trip, full schema) with the paginated
+GET /api/trips/page, with and without a sparse ``fields=`` list and deep
+into the keyset. Walks every page once per sort and filter and exits
+non-zero if a trip is skipped, repeated or out of order.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema, create_user, auth_headers, measure, print_row
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.trip import Trip
+
+TRIPS = 10_000
+DASHBOARD_FIELDS = "name,start_date,end_date,cover_photo"
+NOW = datetime.utcnow()
+
+
+def seed():
+    reset_schema()
+    db = SessionLocal()
+    user = create_user(db)
+    headers = auth_headers(user)
+    rng = random.Random(17)
+    rows = []
+    for i in range(TRIPS):
+        start = NOW + timedelta(days=rng.randint(-1500, 500))
+        rows.append(dict(
+            user_id=user.id, name=f"Trip {i}", description="Lorem ipsum dolor sit amet. " * 20,
+            start_date=start, end_date=start + timedelta(days=rng.randint(1, 21)),
+            cover_photo=f"https://img.example.com/{i}.jpg", public_url=f"bench-{i}",
+            created_at=NOW - timedelta(minutes=rng.randint(0, 10**6)),
+        ))
+    db.execute(insert(Trip), rows)
+    db.commit()
+    expected = {
+        sort: db.scalars(
+            select(Trip.id).where(Trip.user_id == user.id).order_by(*order)
+        ).all()
+        for sort, order in (
+            ("start_date", (Trip.start_date, Trip.id)),
+            ("-created_at", (Trip.created_at.desc(), Trip.id.desc())),
+        )
+    }
+    db.close()
+    return headers, expected
+
+
+def walk(client, headers, **params):
+    ids, cursor = [], None
+    while True:
+        page = client.get("/api/trips/page", headers=headers, params=dict(params, cursor=cursor, limit=100)).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def cursor_at(client, headers, offset, **params):
+    cursor = None
+    for _ in range(offset // 100):
+        cursor = client.get("/api/trips/page", headers=headers, params=dict(params, cursor=cursor, limit=100)).json()["next_cursor"]
+    return cursor
+
+
+def main():
+    headers, expected = seed()
+    client = TestClient(app)
+
+    ok = True
+    for sort, ids in expected.items():
+        walked = walk(client, headers, sort=sort, fields="id")
+        same = walked == ids
+        ok &= same
+        print(f"walk all pages sort={sort}: {len(walked)} trips, {'OK' if same else 'FAIL'}")
+    upcoming = walk(client, headers, when="upcoming", fields="id")
+    past = walk(client, headers, when="past", fields="id")
+    split = sorted(upcoming + past) == sorted(expected["start_date"])
+    ok &= split
+    print(f"upcoming + past: {len(upcoming)} + {len(past)} trips, {'OK' if split else 'FAIL'}")
+
+    deep = cursor_at(client, headers, 5000)
+    cases = [
+        ("GET /trips/ (all, full schema)", "/api/trips/", {}),
+        ("page 1, full schema", "/api/trips/page", {}),
+        ("page 1, dashboard fields", "/api/trips/page", {"fields": DASHBOARD_FIELDS}),
+        ("offset 5000, dashboard fields", "/api/trips/page", {"fields": DASHBOARD_FIELDS, "cursor": deep}),
+        ("upcoming, dashboard fields", "/api/trips/page", {"fields": DASHBOARD_FIELDS, "when": "upcoming"}),
+    ]
+    print(f"{TRIPS} trips, pages of 20")
+    for label, url, params in cases:
+        size = len(client.get(url, headers=headers, params=params).content)
+        stats = measure(lambda: client.get(url, headers=headers, params=params), iterations=20 if url == "/api/trips/" else 100)
+        print_row(f"  {label} {size / 1024:.0f}KiB", stats)
+
+    if not ok:
+        print("FAIL: pagination skipped, repeated or misordered trips")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
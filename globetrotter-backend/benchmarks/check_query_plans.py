@@ -0,0 +1,103 @@
+"""Migrate a fresh database and check that the hot queries use indexes.
+
+Runs ``alembic upgrade head``, checks the migrated schema matches the
+models (``alembic check``), then EXPLAINs the queries behind the trip,
+itinerary and budget endpoints and fails if any of them doesn't use the
+index it is meant to. On PostgreSQL sequential scans are disabled for the
+check so tiny tables don't hide a missing index.
+"""
+import re
+import sys
+
+from alembic import command
+from alembic.config import Config
+from alembic.util import AutogenerateDiffsDetected
+from sqlalchemy import select, text
+
+from benchmarks.common import engine
+from app.models.trip import Trip
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget, TripBudgetRollup
+from app.services.itinerary_loader import trip_stops_statement, trip_stop_rows_statement, trip_activity_rows_statement
+
+HOT_QUERIES = [
+    ("get_my_trips", select(Trip).where(Trip.user_id == 1), ("ix_trips_user_start_date_id", "ix_trips_user_created_at_id")),
+    (
+        "list_my_trips",
+        select(Trip.id, Trip.name).where(Trip.user_id == 1).order_by(Trip.start_date, Trip.id).limit(21),
+        "ix_trips_user_start_date_id",
+    ),
+    (
+        "list_my_trips by created_at",
+        select(Trip.id, Trip.name).where(Trip.user_id == 1).order_by(Trip.created_at.desc(), Trip.id.desc()).limit(21),
+        "ix_trips_user_created_at_id",
+    ),
+    ("get_trip_stops", trip_stops_statement(1), "uq_itinerary_stops_trip_order_key"),
+    (
+        "get_trip_stops activities",
+        select(ItineraryActivity).where(ItineraryActivity.stop_id.in_([1, 2, 3])),
+        "ix_itinerary_activities_stop_id",
+    ),
+    ("get_trip_stops rows", trip_stop_rows_statement(1), "uq_itinerary_stops_trip_order_key"),
+    ("get_trip_stops activity rows", trip_activity_rows_statement(1), "ix_itinerary_activities_stop_id"),
+    ("get_trip_budget", select(Budget).where(Budget.trip_id == 1), "ix_budgets_trip_id_category"),
+    # Served by the primary key: an automatic index on SQLite, "<table>_pkey" on PostgreSQL
+    (
+        "get_trip_budget_summary",
+        select(TripBudgetRollup).where(TripBudgetRollup.trip_id == 1),
+        ("sqlite_autoindex_trip_budget_rollups", "trip_budget_rollups_pkey"),
+    ),
+    ("stops for a city", select(ItineraryStop.id).where(ItineraryStop.city_id == 1), "ix_itinerary_stops_city_id"),
+    (
+        "scheduled uses of an activity",
+        select(ItineraryActivity.id).where(ItineraryActivity.activity_id == 1),
+        "ix_itinerary_activities_activity_id",
+    ),
+]
+
+
+def migrate():
+    config = Config("alembic.ini")
+    command.upgrade(config, "head")
+    try:
+        command.check(config)
+    except AutogenerateDiffsDetected as exc:
+        print(f"FAIL: migrations and models disagree: {exc}")
+        return False
+    print("OK: migrated schema matches the models")
+    return True
+
+
+# A full table scan: "SCAN trips" on SQLite (but not "SCAN trips USING
+# INDEX ..."), "Seq Scan on trips" on PostgreSQL
+FULL_SCAN = re.compile(r"^SCAN \w+$|Seq Scan")
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+
+
+def main():
+    ok = migrate()
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        for label, statement, index in HOT_QUERIES:
+            plan = explain(conn, statement)
+            indexes = (index,) if isinstance(index, str) else index
+            used = any(name in line for name in indexes for line in plan) and not any(
+                FULL_SCAN.search(line.strip()) for line in plan
+            )
+            ok &= used
+            print(f"{'OK  ' if used else 'FAIL'} {label:<32} {' | '.join(plan)}")
+    if not ok:
+        print("FAIL: hot queries are not using their indexes")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Shared setup for the benchmark scripts.
+
+Run the scripts from ``globetrotter-backend/`` as modules, e.g.
+``python -m benchmarks.bench_itinerary_loader``. Unless ``DATABASE_URL`` is
+already set they run against a throwaway SQLite file.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+_bench_dir = tempfile.mkdtemp(prefix="globetrotter-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_bench_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+# One JSON line per request would drown the benchmark output
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import event  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.database import engine, async_engine, SessionLocal  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.services import autocomplete, city_search  # noqa: E402
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def create_user(db, email="bench@example.com", username="bench"):
+    # Skips the password hash on purpose: benchmarks that need it time login
+    # explicitly, everything else only needs a valid bearer token.
+    user = User(email=email, username=username, hashed_password="!")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def auth_headers(user):
+    token = create_access_token(data={"sub": user.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_statements(*binds):
+    """Collect SQL statements run on the sync and async engines (or ``binds``)."""
+    binds = binds or (engine, async_engine.sync_engine)
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        for bind in binds:
+            event.remove(bind, "before_cursor_execute", _record)
+
+
+def measure(fn, iterations=100, warmup=5):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50) * 1000,
+        "p95_ms": pct(95) * 1000,
+        "p99_ms": pct(99) * 1000,
+    }
+
+
+def print_row(label, stats):
+    print(
+        f"{label:<40} n={stats['n']:<6} mean={stats['mean_ms']:8.3f}ms "
+        f"p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms p99={stats['p99_ms']:8.3f}ms"
+    )
+
+
+def settle_indexes():
+    """Bring the in-process catalog indexes up to date and wait for it.
+
+    Requests only start background rebuilds and keep serving the old index,
+    so checks that read right after a catalog change call this first.
+    """
+    db = SessionLocal()
+    try:
+        for refresher in (autocomplete.city_refresh, autocomplete.activity_refresh, city_search.city_index_refresh):
+            refresher.ensure_current(db)
+            refresher.join()
+    finally:
+        db.close()
@@ -0,0 +1,335 @@
+"""Load test of the hot API routes, with stored baselines.
+
+Seeds synthetic data (see ``benchmarks.synthetic``), then fires a fixed,
+seeded sequence of requests at each route in turn with a set number in
+flight, and reports throughput and p50/p95/p99 per route::
+
+    python -m benchmarks.load_test --scale small --concurrency 16
+    python -m benchmarks.load_test --scale small --save-baseline
+    python -m benchmarks.load_test --scale small --compare
+
+By default requests go through the ASGI app in process (lifespan
+included). To load a real server instead, point it and this script at
+the same database, seed, start the server, then run without seeding::
+
+    export DATABASE_URL=postgresql://localhost/globetrotter_load
+    python -m benchmarks.load_test --scale medium --seed-only
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load_test --scale medium --no-seed --base-url http://localhost:8000
+
+Baselines are JSON files under ``benchmarks/baselines/``, named after the
+database dialect, scale and concurrency, so SQLite and Postgres runs keep
+separate baselines. ``--compare`` exits non-zero if any route's p95 rose
+or its throughput fell by more than ``--tolerance``, or it started
+returning errors. Numbers only compare on the machine that recorded them:
+re-save the baseline when the hardware changes.
+"""
+import os
+
+# Seeding writes to DATABASE_URL; a server under test has to read the same
+# one, so HTTP mode won't fall back to common's throwaway SQLite file
+_DATABASE_URL_SET = "DATABASE_URL" in os.environ
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from dataclasses import replace  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+from typing import Callable, Dict, List, Optional, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from benchmarks.common import SessionLocal, engine, auth_headers, summarize, print_row  # noqa: E402
+from benchmarks import synthetic  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.trip import Trip  # noqa: E402
+from app.models.city import City  # noqa: E402
+from app.models.activity import Activity  # noqa: E402
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+# Differences below this are noise whatever the tolerance says
+MIN_LATENCY_DELTA_MS = 1.0
+QUERIES = 200
+
+# (method, url, httpx request kwargs)
+Request = Tuple[str, str, dict]
+
+
+def load_dataset(scale: synthetic.Scale, seed: int) -> synthetic.Dataset:
+    """Rebuild the Dataset of an already seeded database (for ``--no-seed``)."""
+    db = SessionLocal()
+    try:
+        users = db.execute(select(User.id, User.email).order_by(User.id)).all()
+        trip_ids: Dict[int, List[int]] = {user_id: [] for user_id, _ in users}
+        for trip_id, user_id in db.execute(select(Trip.id, Trip.user_id).order_by(Trip.id)):
+            trip_ids[user_id].append(trip_id)
+        return synthetic.Dataset(
+            scale=scale, seed=seed, emails=[email for _, email in users],
+            trip_ids=[trip_ids[user_id] for user_id, _ in users],
+            city_names=db.scalars(select(City.name).order_by(City.id)).all(),
+            activity_names=db.scalars(select(Activity.name).order_by(Activity.id)).all(),
+        )
+    finally:
+        db.close()
+
+
+def route_plans(dataset: synthetic.Dataset, rng: random.Random) -> Dict[str, Callable[[], Request]]:
+    """One request factory per hot route; each call draws the next request from ``rng``."""
+    headers = [auth_headers(SimpleNamespace(email=email)) for email in dataset.emails]
+    owners = [i for i, trips in enumerate(dataset.trip_ids) if trips]
+    # A fixed pool of search terms, so the catalog cache sees repeats the
+    # way it would from real typeahead traffic
+    cities = rng.sample(dataset.city_names, min(QUERIES, len(dataset.city_names)))
+    activities = rng.sample(dataset.activity_names, min(QUERIES, len(dataset.activity_names)))
+    city_terms = [name[:rng.randint(3, 5)].lower() for name in cities]
+    activity_terms = [name.split()[rng.randint(0, 1)].lower() for name in activities]
+
+    def trip_of_some_user():
+        user = rng.choice(owners)
+        return headers[user], rng.choice(dataset.trip_ids[user])
+
+    def login():
+        data = {"username": rng.choice(dataset.emails), "password": synthetic.PASSWORD}
+        return "POST", "/api/auth/login", {"data": data}
+
+    def get_my_trips():
+        return "GET", "/api/trips/", {"headers": rng.choice(headers)}
+
+    def get_trip_stops():
+        user_headers, trip_id = trip_of_some_user()
+        return "GET", f"/api/itinerary/{trip_id}/stops", {"headers": user_headers}
+
+    def get_budget_summary():
+        user_headers, trip_id = trip_of_some_user()
+        return "GET", f"/api/budget/{trip_id}/summary", {"headers": user_headers}
+
+    def search_cities():
+        return "GET", "/api/cities/", {"params": {"q": rng.choice(city_terms)}}
+
+    def search_activities():
+        return "GET", "/api/activities/", {"params": {"q": rng.choice(activity_terms)}}
+
+    return {
+        "login": login,
+        "get_my_trips": get_my_trips,
+        "get_trip_stops": get_trip_stops,
+        "get_budget_summary": get_budget_summary,
+        "search_cities": search_cities,
+        "search_activities": search_activities,
+    }
+
+
+async def run_route(client: httpx.AsyncClient, requests: List[Request], concurrency: int) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    samples, errors = [], 0
+
+    async def one(method, url, kwargs):
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    elapsed = time.perf_counter() - start
+    stats = summarize(samples)
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "rps": (len(requests) - errors) / elapsed,
+        **{key: round(value, 3) for key, value in stats.items() if key.endswith("_ms")},
+    }
+
+
+def median_round(rounds: List[dict]) -> dict:
+    # A single round on a busy machine swings by a third; the median of a
+    # few is steady enough to compare against a baseline
+    result = {key: statistics.median(r[key] for r in rounds) for key in rounds[0] if key != "requests"}
+    result["requests"] = sum(r["requests"] for r in rounds)
+    result["errors"] = sum(r["errors"] for r in rounds)
+    return result
+
+
+async def run_all(args, dataset: synthetic.Dataset) -> Dict[str, dict]:
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    plans = route_plans(dataset, rng)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+        lifespan = None
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://load-test", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+
+    results = {}
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            for name, plan in plans.items():
+                if args.routes and name not in args.routes:
+                    continue
+                count, concurrency = args.requests, args.concurrency
+                if name == "login":
+                    # argon2 is slow by design: fewer requests, and no more in
+                    # flight than the hashing pool admits before it sheds load
+                    count = max(20, count // 20)
+                    concurrency = min(concurrency, settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT)
+                await run_route(client, [plan() for _ in range(args.warmup)], concurrency)
+                rounds = [await run_route(client, [plan() for _ in range(count)], concurrency)
+                          for _ in range(args.rounds)]
+                result = median_round(rounds)
+                result["concurrency"] = concurrency
+                results[name] = result
+                print_row(f"  {name:<20} {result['rps']:8.1f} req/s err={result['errors']:<3}",
+                          {"n": result["requests"], **result})
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline_path(meta: dict) -> Path:
+    return BASELINE_DIR / f"{meta['dialect']}-{meta['scale']}-c{meta['concurrency']}.json"
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for key in ("dialect", "scale", "concurrency", "transport"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"  warning: baseline {key} is {baseline['meta'].get(key)!r}, "
+                  f"this run's is {current['meta'].get(key)!r}")
+    print(f"  {'route':<20} {'p95 base':>10} {'p95 now':>10} {'change':>8} {'req/s base':>11} {'req/s now':>10} {'change':>8}")
+    for name, base in baseline["routes"].items():
+        now = current["routes"].get(name)
+        if now is None:
+            continue
+        p95_change = now["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = now["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        flags = []
+        if p95_change > tolerance and now["p95_ms"] - base["p95_ms"] > MIN_LATENCY_DELTA_MS:
+            flags.append(f"p95 {base['p95_ms']:.1f}ms -> {now['p95_ms']:.1f}ms")
+        if rps_change < -tolerance:
+            flags.append(f"throughput {base['rps']:.0f} -> {now['rps']:.0f} req/s")
+        if now["errors"] > base["errors"]:
+            flags.append(f"errors {base['errors']} -> {now['errors']}")
+        print(f"  {name:<20} {base['p95_ms']:10.2f} {now['p95_ms']:10.2f} {p95_change:+8.0%} "
+              f"{base['rps']:11.1f} {now['rps']:10.1f} {rps_change:+8.0%}{'  <- REGRESSION' if flags else ''}")
+        regressions.extend(f"{name}: {flag}" for flag in flags)
+    return regressions
+
+
+def parse_scale(args) -> synthetic.Scale:
+    scale = synthetic.SCALES[args.scale]
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        if key not in scale.__dataclass_fields__ or not value.isdigit():
+            raise SystemExit(f"--set expects <field>=<int>, one of {', '.join(scale.__dataclass_fields__)}")
+        overrides[key] = int(value)
+    return replace(scale, **overrides)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(synthetic.SCALES), default="small")
+    parser.add_argument("--set", action="append", default=[], metavar="FIELD=N",
+                        help="override one field of the scale, e.g. --set users=50")
+    parser.add_argument("--seed", type=int, default=0, help="seeds both the data and the request mix")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight per route")
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per route (login: a twentieth)")
+    parser.add_argument("--rounds", type=int, default=3, help="measured rounds per route; each figure is the median over rounds")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route first")
+    parser.add_argument("--routes", nargs="+", help="only these routes")
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    seeding = parser.add_mutually_exclusive_group()
+    seeding.add_argument("--seed-only", action="store_true", help="generate the data and exit")
+    seeding.add_argument("--no-seed", action="store_true", help="use the data already in DATABASE_URL")
+    parser.add_argument("--output", help="also write this run's results to this JSON file")
+    parser.add_argument("--save-baseline", nargs="?", const="", metavar="PATH",
+                        help="store the results as the baseline (default: benchmarks/baselines/<dialect>-<scale>-c<N>.json)")
+    parser.add_argument("--compare", nargs="?", const="", metavar="PATH",
+                        help="compare against a stored baseline and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 rise / throughput drop (default 0.25)")
+    args = parser.parse_args(argv)
+
+    if args.base_url and not _DATABASE_URL_SET:
+        parser.error("--base-url needs DATABASE_URL set to the database the server uses")
+    scale = parse_scale(args)
+    dialect = engine.dialect.name
+    if args.no_seed:
+        dataset = load_dataset(scale, args.seed)
+    else:
+        start = time.perf_counter()
+        dataset = synthetic.generate(scale, args.seed)
+        print(f"seeded {scale.users} users, {scale.trips} trips, {scale.stops} stops, {scale.cities} cities, "
+              f"{scale.activities} activities on {dialect} in {time.perf_counter() - start:.1f}s")
+    if args.seed_only:
+        return 0
+    if not any(dataset.trip_ids):
+        parser.error("no trips in the database; seed it first")
+
+    meta = {
+        "dialect": dialect,
+        "scale": args.scale if not args.set else f"{args.scale}+{'+'.join(sorted(args.set))}",
+        "dataset": dataset.describe(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "rounds": args.rounds,
+        "transport": "http" if args.base_url else "asgi",
+        "python": platform.python_version(),
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    print(f"{meta['transport']} on {dialect}, scale {meta['scale']}, concurrency {args.concurrency}")
+    results = {"meta": meta, "routes": asyncio.run(run_all(args, dataset))}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline is not None:
+        path = Path(args.save_baseline) if args.save_baseline else baseline_path(meta)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {path}")
+    if args.compare is not None:
+        path = Path(args.compare) if args.compare else baseline_path(meta)
+        if not path.exists():
+            print(f"no baseline at {path}; run with --save-baseline first")
+            return 1
+        print(f"compared with {path} (tolerance {args.tolerance:.0%})")
+        regressions = compare(json.loads(path.read_text()), results, args.tolerance)
+        if regressions:
+            print("FAIL: load test regressions")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Synthetic data for the load test, at a named or custom scale.
+
+Everything is drawn from a seeded RNG and bulk-inserted with Core
+statements, so the same scale and seed always give the same rows (and
+the same ids on a fresh schema). Every user shares one real argon2 hash
+of ``PASSWORD``, so login does the same work it does in production
+without hashing once per user at seed time.
+"""
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, reset_schema
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.city import City
+from app.models.activity import Activity
+from app.models.itinerary_stop import ItineraryStop, ItineraryActivity
+from app.models.budget import Budget
+from app.services import budget_rollups
+
+PASSWORD = "load-test-password"
+START = datetime(2026, 1, 1)
+CHUNK = 5000
+
+SYLLABLES = ["ba", "cor", "del", "fi", "gra", "ka", "lis", "mon", "na", "por", "ri", "sa", "ta", "ven", "zu", "bon"]
+COUNTRIES = ["Portugal", "Spain", "France", "Italy", "Japan", "Peru", "Kenya", "Canada", "India", "Norway"]
+CATEGORIES = ["sightseeing", "food", "adventure", "culture", "nightlife", "shopping"]
+BUDGET_CATEGORIES = ["transport", "stay", "activities", "meals"]
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    trips_per_user: int
+    stops_per_trip: int
+    activities_per_stop: int
+    budgets_per_trip: int
+    cities: int
+    activities: int
+
+    @property
+    def trips(self) -> int:
+        return self.users * self.trips_per_user
+
+    @property
+    def stops(self) -> int:
+        return self.trips * self.stops_per_trip
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(users=20, trips_per_user=10, stops_per_trip=8, activities_per_stop=2, budgets_per_trip=6,
+                   cities=2000, activities=2000),
+    "medium": Scale(users=200, trips_per_user=20, stops_per_trip=12, activities_per_stop=3, budgets_per_trip=10,
+                    cities=20000, activities=20000),
+    "large": Scale(users=2000, trips_per_user=25, stops_per_trip=15, activities_per_stop=3, budgets_per_trip=12,
+                   cities=100000, activities=100000),
+}
+
+
+@dataclass
+class Dataset:
+    scale: Scale
+    seed: int
+    emails: List[str]
+    # trip ids per user, in the same order as ``emails``
+    trip_ids: List[List[int]]
+    city_names: List[str]
+    activity_names: List[str]
+
+    def describe(self) -> dict:
+        return {"seed": self.seed, **asdict(self.scale)}
+
+
+def _name(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def _insert_chunked(db, model, rows) -> None:
+    for i in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[i:i + CHUNK])
+
+
+def generate(scale: Scale, seed: int = 0) -> Dataset:
+    """Drop and recreate the schema, then fill it at ``scale``."""
+    rng = random.Random(seed)
+    reset_schema()
+    db = SessionLocal()
+    try:
+        hashed = get_password_hash(PASSWORD)
+        emails = [f"user{i}@load.example.com" for i in range(scale.users)]
+        _insert_chunked(db, User, [
+            dict(email=email, username=f"user{i}", hashed_password=hashed, full_name=f"Load User {i}")
+            for i, email in enumerate(emails)
+        ])
+
+        city_names = [_name(rng, rng.randint(2, 4)) for _ in range(scale.cities)]
+        _insert_chunked(db, City, [
+            dict(name=name, country=rng.choice(COUNTRIES), cost_index=rng.uniform(40, 220),
+                 popularity=rng.randint(0, 10000), description=f"{name} is a city")
+            for name in city_names
+        ])
+        activity_names = [f"{_name(rng, rng.randint(2, 3))} {rng.choice(CATEGORIES)} tour"
+                          for _ in range(scale.activities)]
+        _insert_chunked(db, Activity, [
+            dict(name=name, category=rng.choice(CATEGORIES), estimated_cost=round(rng.uniform(0, 300), 2),
+                 duration_hours=rng.choice([1.0, 2.0, 3.5, 8.0]), description=f"{name}, every day")
+            for name in activity_names
+        ])
+
+        user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+        trips = []
+        for user_id in user_ids:
+            for t in range(scale.trips_per_user):
+                start = START + timedelta(days=rng.randint(0, 365))
+                trips.append(dict(user_id=user_id, name=f"{_name(rng, 2)} trip {t}", description="Synthetic",
+                                  start_date=start, end_date=start + timedelta(days=scale.stops_per_trip * 2)))
+        _insert_chunked(db, Trip, trips)
+        rows = db.execute(select(Trip.id, Trip.user_id, Trip.start_date).order_by(Trip.id)).all()
+
+        stops, budgets = [], []
+        trip_ids: Dict[int, List[int]] = {user_id: [] for user_id in user_ids}
+        for trip_id, user_id, start in rows:
+            trip_ids[user_id].append(trip_id)
+            for s in range(scale.stops_per_trip):
+                stops.append(dict(trip_id=trip_id, city_id=rng.randint(1, scale.cities), order_key=(s + 1) << 16,
+                                  arrival_date=start + timedelta(days=2 * s),
+                                  departure_date=start + timedelta(days=2 * s + 2), notes="Synthetic stop"))
+            for _ in range(scale.budgets_per_trip):
+                budgets.append(dict(trip_id=trip_id, category=rng.choice(BUDGET_CATEGORIES),
+                                    amount=round(rng.uniform(10, 2000), 2), description="Synthetic line"))
+        _insert_chunked(db, ItineraryStop, stops)
+        _insert_chunked(db, Budget, budgets)
+        stop_ids = db.scalars(select(ItineraryStop.id).order_by(ItineraryStop.id)).all()
+        _insert_chunked(db, ItineraryActivity, [
+            dict(stop_id=stop_id, activity_id=rng.randint(1, scale.activities))
+            for stop_id in stop_ids for _ in range(scale.activities_per_stop)
+        ])
+        db.commit()
+        # Core inserts skip the flush hook that keeps budget rollups current
+        budget_rollups.rebuild(db)
+    finally:
+        db.close()
+    return Dataset(
+        scale=scale, seed=seed, emails=emails, trip_ids=[trip_ids[user_id] for user_id in user_ids],
+        city_names=city_names, activity_names=activity_names,
+    )